@@ -1,41 +1,145 @@
+"""
+inspect_db.py
+
+Inspect and maintain the smart_sales.db data warehouse.
+
+By default prints the file and free-page summary, row counts and storage per
+table and index, and the query plans of the registered hot queries, with
+full scans of the fact tables flagged. A sharded warehouse is reported shard
+by shard. See utils/maintenance.py.
+
+Usage:
+    py inspect_db.py                              # sizes and query plans
+    py inspect_db.py --schema                     # also list every table's columns
+    py inspect_db.py --maintain                   # ANALYZE, incremental VACUUM, PRAGMA optimize
+    py inspect_db.py --maintain --every-hours 24  # only if the last run is 24 hours old (for cron)
+"""
+
+import argparse
+import pathlib
 import sqlite3
+from typing import List, Optional
+
+from utils.maintenance import (
+    database_report,
+    explain_hot_queries,
+    maintenance_due,
+    run_maintenance,
+    table_report,
+)
+from utils.shards import read_shard_manifest
+from utils.warehouse import DB_PATH, connect_reader
+
+
+def format_bytes(size: Optional[int]) -> str:
+    """Render a byte count as KiB / MiB, or '?' when unknown."""
+    if size is None:
+        return "?"
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MiB"
+    return f"{size / 1024:.1f} KiB"
+
 
-db_path = 'data/dw/smart_sales.db'
-print(f"Inspecting database at: {db_path}\n")
-
-try:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Get all table names
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
-
-    if tables:
-        print("--- Database Schema ---")
-        # For each table, get the schema
-        for table in tables:
-            table_name = table[0]
-            print(f"\n[Table: {table_name}]")
-
-            # PRAGMA table_info() is the command to get column info
-            cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = cursor.fetchall()
-
-            for column in columns:
-                # Column info is returned as: (id, name, type, notnull, default_value, pk)
-                print(f"  - Column: {column[1]} (Type: {column[2]})")
-        print("\n-----------------------")
-    else:
+def print_schema(conn: sqlite3.Connection) -> None:
+    """Print every table in the warehouse with its columns."""
+    tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table';").fetchall()
+    if not tables:
         print("No tables found in this database.")
+        return
+    print("--- Database Schema ---")
+    for (table_name,) in tables:
+        print(f"\n[Table: {table_name}]")
+        # Column info is returned as: (id, name, type, notnull, default_value, pk)
+        for column in conn.execute(f"PRAGMA table_info({table_name});").fetchall():
+            print(f"  - Column: {column[1]} (Type: {column[2]})")
+    print("\n-----------------------")
+
+
+def print_report(conn: sqlite3.Connection, db_path: pathlib.Path, show_plans: bool = True) -> int:
+    """
+    Print sizes and hot query plans for one warehouse file.
+
+    Returns:
+        int: Number of hot queries with a full scan of a fact table.
+    """
+    summary = database_report(conn, db_path)
+    print(f"File: {format_bytes(summary['file_bytes'])} (WAL {format_bytes(summary['wal_bytes'])}), "
+          f"{summary['page_count']} pages of {summary['page_size']} bytes, "
+          f"{summary['freelist_count']} free ({summary['free_percent']:.1f}%)")
+    print(f"auto_vacuum: {summary['auto_vacuum']}; last maintenance: {summary['last_maintenance'] or 'never'}")
+
+    print("\n--- Tables ---")
+    for entry in table_report(conn):
+        print(f"{entry['table']:<24} {entry['rows']:>10} rows {entry['pages'] or '?':>8} pages "
+              f"{format_bytes(entry['bytes']):>12}")
+        for index in entry["indexes"]:
+            print(f"  index {index['index']:<34} {index['pages'] or '?':>8} pages {format_bytes(index['bytes']):>12}")
+
+    if not show_plans:
+        return 0
+    print("\n--- Hot query plans ---")
+    flagged = 0
+    for result in explain_hot_queries(conn):
+        if result["error"]:
+            print(f"\n[{result['name']}] not available: {result['error']}")
+            continue
+        print(f"\n[{result['name']}]")
+        for detail in result["plan"]:
+            marker = "  !! FULL SCAN" if detail in result["full_scans"] else ""
+            print(f"  {detail}{marker}")
+        flagged += bool(result["full_scans"])
+    print(f"\n{flagged} hot queries scan a whole fact table.")
+    return flagged
+
+
+def maintain(db_path: pathlib.Path, every_hours: Optional[float], vacuum_pages: Optional[int]) -> None:
+    """Run maintenance on one warehouse file, unless the schedule says it is not due yet."""
+    if every_hours is not None:
+        conn = connect_reader(db_path)
+        try:
+            due = maintenance_due(conn, every_hours)
+        finally:
+            conn.close()
+        if not due:
+            print(f"Maintenance of {db_path} ran less than {every_hours:g} hours ago; skipped.")
+            return
+    result = run_maintenance(db_path, vacuum_pages=vacuum_pages)
+    vacuum = "full VACUUM (switched to incremental auto_vacuum)" if result["full_vacuum"] else "incremental VACUUM"
+    print(f"Maintained {db_path}: ANALYZE, {vacuum}, PRAGMA optimize. "
+          f"Free pages {result['freelist_before']} -> {result['freelist_after']}, "
+          f"file {format_bytes(result['file_bytes_before'])} -> {format_bytes(result['file_bytes_after'])}")
 
-except sqlite3.Error as e:
-    print(f"An error occurred: {e}")
-finally:
-    if conn:
-        conn.close()
 
+def main(argv: List[str] | None = None) -> None:
+    """Report on the warehouse (and each shard), optionally running maintenance first."""
+    parser = argparse.ArgumentParser(description="Inspect and maintain the SQLite data warehouse.")
+    parser.add_argument("--db", type=pathlib.Path, default=DB_PATH, help="Warehouse file")
+    parser.add_argument("--schema", action="store_true", help="List every table's columns")
+    parser.add_argument("--no-plans", action="store_true", help="Skip the hot query plans")
+    parser.add_argument("--maintain", action="store_true", help="Run ANALYZE, incremental VACUUM and PRAGMA optimize")
+    parser.add_argument("--every-hours", type=float, help="With --maintain: only run if the last run is this old")
+    parser.add_argument("--vacuum-pages", type=int, help="With --maintain: free at most this many pages")
+    args = parser.parse_args(argv)
 
+    shards = read_shard_manifest(args.db)
+    db_paths = [pathlib.Path(shard["path"]) for shard in shards] if shards else [args.db]
+    for db_path in db_paths:
+        print(f"Inspecting database at: {db_path}\n")
+        try:
+            if args.maintain:
+                maintain(db_path, args.every_hours, args.vacuum_pages)
+                print()
+            conn = connect_reader(db_path)
+            try:
+                if args.schema:
+                    print_schema(conn)
+                print_report(conn, db_path, show_plans=not args.no_plans)
+            finally:
+                conn.close()
+        except (sqlite3.Error, FileNotFoundError) as e:
+            print(f"An error occurred: {e}")
+        print()
 
 
-        
\ No newline at end of file
+if __name__ == "__main__":
+    main()
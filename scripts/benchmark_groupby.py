@@ -0,0 +1,130 @@
+# scripts/benchmark_groupby.py
+
+"""
+Benchmark the groupby kernel (utils/groupby_kernel.py) against pandas groupby.
+
+Builds synthetic processed sales shaped like the output of
+scripts/data_prep.py merge_and_process_data(): Year, Quarter, Region,
+ProductCategory and sales_channel keys (text keys as object columns, or
+categoricals with --categorical; a few missing) with revenue, profit and
+units. It times the BI aggregates (aggregate_final_data()) and the metrics
+store batch sums, first with pandas groupby, then on the kernel, checks that
+both give the same rows, and logs the timings.
+
+Usage:
+    python scripts/benchmark_groupby.py --rows 10000000 [--categorical]
+"""
+
+#####################################
+# Import Modules at the Top
+#####################################
+
+# Import from Python Standard Library
+import argparse
+import pathlib
+import sys
+import time
+
+# Import from external packages
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in sys.path for local imports
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
+
+# Import local modules
+from utils.groupby_kernel import GroupIndex, _compiled_sums
+from utils.logger import logger
+from utils.metrics_store import BUCKET_COLUMNS
+
+MAIN_KEYS = ['Year', 'Quarter', 'Region', 'ProductCategory']
+SUMS = {'Total_Revenue': 'Total_Revenue', 'Total_Profit': 'Profit', 'Units_Sold': 'Units_Sold'}
+
+
+def synthetic_sales(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Processed sales rows with realistic key cardinalities and a few missing keys."""
+    rng = np.random.default_rng(seed)
+    regions = np.array(['North', 'South', 'East', 'West', 'Central'], dtype=object)
+    categories = np.array([f'Category {i:02d}' for i in range(40)], dtype=object)
+    channels = np.array(['Online', 'Retail', 'Wholesale', None], dtype=object)
+    revenue = rng.gamma(2.0, 50.0, rows)
+    df = pd.DataFrame({
+        'Year': rng.integers(2019, 2026, rows),
+        'Quarter': rng.integers(1, 5, rows),
+        'Region': regions[rng.integers(0, len(regions), rows)],
+        'ProductCategory': categories[rng.integers(0, len(categories), rows)],
+        'sales_channel': channels[rng.integers(0, len(channels), rows)],
+        'Total_Revenue': revenue,
+        'Profit': revenue * 0.3,
+        'Units_Sold': rng.integers(1, 10, rows),
+    })
+    df.loc[::1000, 'Region'] = None
+    return df
+
+
+def pandas_path(df: pd.DataFrame) -> list[pd.DataFrame]:
+    """The groupby calls the kernel replaced (observed=True only matters for categorical keys)."""
+    main = df.groupby(MAIN_KEYS, observed=True).agg(
+        Total_Revenue=('Total_Revenue', 'sum'), Total_Profit=('Profit', 'sum'), Units_Sold=('Units_Sold', 'sum'),
+    ).reset_index()
+    channel = df.groupby('sales_channel', observed=True).agg(Total_Revenue=('Total_Revenue', 'sum')).reset_index()
+    yearly = df.groupby(['Year', 'ProductCategory'], observed=True)['Total_Revenue'].sum().reset_index()
+    buckets = df.groupby(BUCKET_COLUMNS, observed=True).agg(
+        Total_Revenue=('Total_Revenue', 'sum'), Total_Profit=('Profit', 'sum'), Units_Sold=('Units_Sold', 'sum'),
+        Sale_Count=('Total_Revenue', 'size'),
+    ).reset_index()
+    return [main, channel, yearly, buckets]
+
+
+def kernel_path(df: pd.DataFrame, engine: str) -> list[pd.DataFrame]:
+    """The same results on the kernel: one pass over the rows, then rollups of the cells."""
+    cells = GroupIndex(df, BUCKET_COLUMNS, dropna=False).aggregate(df, SUMS, count='Sale_Count', engine=engine)
+    rollup = {column: column for column in SUMS}
+
+    def roll(keys: list[str], sums: dict) -> pd.DataFrame:
+        return GroupIndex(cells, keys).aggregate(cells, sums, engine='numpy')
+
+    main = roll(MAIN_KEYS, rollup)
+    channel = roll(['sales_channel'], {'Total_Revenue': 'Total_Revenue'})
+    yearly = roll(['Year', 'ProductCategory'], {'Total_Revenue': 'Total_Revenue'})
+    buckets = roll(BUCKET_COLUMNS, dict(rollup, Sale_Count='Sale_Count'))
+    return [main, channel, yearly, buckets]
+
+
+def timed(label: str, func, *args) -> tuple[float, list[pd.DataFrame]]:
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    logger.info(f"{label}: {elapsed:.2f} s")
+    return elapsed, result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the groupby kernel against pandas groupby.")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Synthetic sales rows (default: 10,000,000)")
+    parser.add_argument("--categorical", action="store_true", help="Store the text keys as categoricals")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic sales")
+    args = parser.parse_args(argv)
+
+    logger.info(f"Building {args.rows:,} synthetic sales rows...")
+    df = synthetic_sales(args.rows, args.seed)
+    if args.categorical:
+        for column in ['Region', 'ProductCategory', 'sales_channel']:
+            df[column] = df[column].astype('category')
+
+    engines = ['numpy'] + (['numba'] if _compiled_sums() is not None else [])
+    if 'numba' in engines:
+        kernel_path(df.head(1000), 'numba')  # Compile outside the timing
+    else:
+        logger.info("numba is not installed; timing the NumPy engine only.")
+
+    pandas_seconds, expected = timed("pandas groupby", pandas_path, df)
+    for engine in engines:
+        seconds, got = timed(f"kernel ({engine})", kernel_path, df, engine)
+        for want, have in zip(expected, got):
+            pd.testing.assert_frame_equal(have, want, check_dtype=False, check_exact=False, rtol=1e-9)
+        logger.info(f"kernel ({engine}) is {pandas_seconds / seconds:.1f}x faster; results match pandas.")
+
+
+if __name__ == "__main__":
+    main()
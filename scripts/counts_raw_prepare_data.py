@@ -1,26 +1,55 @@
-import pandas as pd
+"""
+scripts/counts_raw_prepare_data.py
 
-# Paths to your raw and prepared CSV files
-raw_customers_path = 'data/raw/customers_data.csv'
-prepared_customers_path = 'data/prepared/customers_prepared.csv'
+Reconcile raw vs. prepared record counts.
 
-raw_products_path = 'data/raw/products_data.csv'
-prepared_products_path = 'data/prepared/products_prepared.csv'
+Counts come from the sidecar manifests written alongside prepared files
+(see utils/manifest.py). Files without a current manifest, such as the raw
+inputs, are counted with a fast newline scan instead of a full CSV parse.
+"""
 
-raw_sales_path = 'data/raw/sales_data.csv'
-prepared_sales_path = 'data/prepared/sales_prepared.csv'
+#####################################
+# Import Modules at the Top
+#####################################
 
-# Load data
-raw_customers = pd.read_csv(raw_customers_path)
-prepared_customers = pd.read_csv(prepared_customers_path)
+# Import from Python Standard Library
+import pathlib
+import sys
 
-raw_products = pd.read_csv(raw_products_path)
-prepared_products = pd.read_csv(prepared_products_path)
+# Ensure project root is in sys.path for local imports
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
 
-raw_sales = pd.read_csv(raw_sales_path)
-prepared_sales = pd.read_csv(prepared_sales_path)
+# Import local modules
+from utils.manifest import count_rows
 
-# Count records
-print(f"Customers: Raw records = {len(raw_customers)}, Prepared records = {len(prepared_customers)}")
-print(f"Products: Raw records = {len(raw_products)}, Prepared records = {len(prepared_products)}")
-print(f"Sales: Raw records = {len(raw_sales)}, Prepared records = {len(prepared_sales)}")
+# Constants (Paths)
+SCRIPTS_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
+PROJECT_ROOT: pathlib.Path = SCRIPTS_DIR.parent
+DATA_DIR: pathlib.Path = PROJECT_ROOT / "data"
+RAW_DATA_DIR: pathlib.Path = DATA_DIR / "raw"
+PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"
+
+# Paths to the raw and prepared CSV files, by table
+FILES_TO_COUNT = {
+    'Customers': ('customers_data.csv', 'customers_prepared.csv'),
+    'Products': ('products_data.csv', 'products_prepared.csv'),
+    'Sales': ('sales_data.csv', 'sales_prepared.csv'),
+}
+
+#####################################
+# Define Main Function - The main entry point of the script
+#####################################
+
+def main() -> None:
+    """Print raw and prepared record counts for each table."""
+    for table, (raw_name, prepared_name) in FILES_TO_COUNT.items():
+        raw_count, raw_source = count_rows(RAW_DATA_DIR / raw_name)
+        prepared_count, prepared_source = count_rows(PREPARED_DATA_DIR / prepared_name)
+        print(
+            f"{table}: Raw records = {raw_count} ({raw_source}), "
+            f"Prepared records = {prepared_count} ({prepared_source})"
+        )
+
+
+if __name__ == "__main__":
+    main()
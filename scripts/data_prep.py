@@ -12,8 +12,10 @@ and aggregates data for BI analysis.
 #####################################
 
 # Import from Python Standard Library
+import argparse
 import pathlib
 import sys
+from typing import Iterator
 
 # Import from external packages
 import pandas as pd
@@ -23,7 +25,14 @@ import pandas as pd
 sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
 
 # Import local modules (e.g. utils/logger.py)
+from utils.data_scrubber import map_unique_values
+from utils.groupby_kernel import group_sums
 from utils.logger import logger
+from utils.manifest import write_manifest
+from utils.measures import ASSUMED_COST_PERCENTAGE, compute_profit_measures
+from utils.metrics_store import MetricsStore
+from utils.partitions import prune_partitions, read_partition_stats, read_partitioned
+from utils.star_join import DimensionJoin, star_join
 
 # Constants (Paths)
 SCRIPTS_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
@@ -32,20 +41,63 @@ DATA_DIR: pathlib.Path = PROJECT_ROOT / "data"
 # We'll now primarily work with 'prepared' and output to 'processed'
 PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"
 PROCESSED_DATA_DIR: pathlib.Path = DATA_DIR / "processed"
+SALES_PARTITIONS_DIR: pathlib.Path = PREPARED_DATA_DIR / "sales"  # year=/month= partitions of sales_prepared.csv
+METRICS_STORE_DIR: pathlib.Path = PROCESSED_DATA_DIR / "metrics_store"  # running per-bucket sums (utils/metrics_store.py)
 
 # Ensure output data directories exist or create them
 PREPARED_DATA_DIR.mkdir(parents=True, exist_ok=True) # Ensure prepared exists for loading
 PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True) # Ensure processed exists for saving
 logger.info(f"Data directories ensured: {PREPARED_DATA_DIR}, {PROCESSED_DATA_DIR}")
 
+# --- IMPORTANT: ACTUAL COLUMN NAMES FROM YOUR *PREPARED* CSV FILES ---
+# These names are derived from your previous log output and directory structure.
+# sales_prepared.csv columns
+SALES_DATE_COL = 'SaleDate'
+SALES_REVENUE_COL = 'SaleAmount'
+# NOTE: No explicit 'Cost' column found in your sales_prepared.csv head.
+# We will derive a 'Total_Cost' based on an assumption.
+SALES_UNITS_COL = 'Quantity' # If this column exists in sales_prepared.csv
+SALES_CHANNEL_COL = 'sales_channel'
+SALES_CUSTOMER_ID_COL = 'CustomerID'
+SALES_PRODUCT_ID_COL = 'ProductID'
+# No 'Region' column observed in sales_prepared.csv head. Will get from customers.
+
+# products_prepared.csv columns
+PRODUCTS_PRODUCT_ID_COL = 'productid' # Lowercase
+PRODUCTS_CATEGORY_COL = 'category'    # Lowercase
+
+# customers_prepared.csv columns
+CUSTOMERS_CUSTOMER_ID_COL = 'CustomerID'
+CUSTOMERS_REGION_COL = 'Region'
+# -------------------------------------------------------------------
+
 #####################################
 # Define Functions - Reusable blocks of code / instructions
 #####################################
 
-def load_prepared_data() -> dict[str, pd.DataFrame]:
+def load_sales_partitions(start: str | None, end: str | None) -> pd.DataFrame:
+    """
+    Loads only the sales partitions that overlap [start, end].
+    Partitions outside the range are skipped using their min/max date stats,
+    so their files are never opened.
+    Returns:
+        pd.DataFrame: Sales rows dated within the range.
+    """
+    stats = read_partition_stats(SALES_PARTITIONS_DIR)
+    df = read_partitioned(SALES_PARTITIONS_DIR, start=start, end=end)
+    logger.info(f"Sales date range {start or '-'} to {end or '-'}: read {len(df)} of {stats['row_count']} rows "
+                f"from partitions under {SALES_PARTITIONS_DIR}.")
+    return df
+
+def load_prepared_data(start: str | None = None, end: str | None = None) -> dict[str, pd.DataFrame]:
     """
     Loads prepared CSV files (sales, products, customers) into DataFrames.
     Assumes these files are in the 'data/prepared/' directory.
+    When a date range is given and sales partitions exist, only the sales
+    partitions overlapping the range are read.
+    Args:
+        start (str, optional): First sale date to include (e.g. '2025-04-01').
+        end (str, optional): Last sale date to include.
     Returns:
         dict: A dictionary of DataFrames with keys 'sales', 'products', 'customers'.
     """
@@ -55,12 +107,21 @@ def load_prepared_data() -> dict[str, pd.DataFrame]:
         'products': 'products_prepared.csv',
         'customers': 'customers_prepared.csv'
     }
+    use_partitions = (start or end) and read_partition_stats(SALES_PARTITIONS_DIR) is not None
+    if (start or end) and not use_partitions:
+        logger.warning(f"No sales partitions in {SALES_PARTITIONS_DIR}; reading all sales and filtering by date.")
 
     for key, filename in files_to_load.items():
         file_path = PREPARED_DATA_DIR / filename
         try:
+            if key == 'sales' and use_partitions:
+                dataframes[key] = load_sales_partitions(start, end)
+                continue
             logger.info(f"Loading prepared {key} data from: {file_path}")
             df = pd.read_csv(file_path)
+            if key == 'sales' and (start or end):
+                dates = pd.to_datetime(df['SaleDate'], errors='coerce')
+                df = df[dates.between(pd.Timestamp(start or dates.min()), pd.Timestamp(end or dates.max()))]
             dataframes[key] = df
             logger.info(f"Loaded {len(df)} rows for {key}.")
             logger.debug(f"{key} head:\n{df.head()}") # Use debug for verbose output
@@ -94,28 +155,6 @@ def merge_and_process_data(dataframes: dict[str, pd.DataFrame]) -> pd.DataFrame:
 
     logger.info("Starting data merging and final processing...")
 
-    # --- IMPORTANT: ACTUAL COLUMN NAMES FROM YOUR *PREPARED* CSV FILES ---
-    # These names are derived from your previous log output and directory structure.
-    # sales_prepared.csv columns
-    SALES_DATE_COL = 'SaleDate'
-    SALES_REVENUE_COL = 'SaleAmount'
-    # NOTE: No explicit 'Cost' column found in your sales_prepared.csv head.
-    # We will derive a 'Total_Cost' based on an assumption.
-    SALES_UNITS_COL = 'Quantity' # If this column exists in sales_prepared.csv
-    SALES_CHANNEL_COL = 'sales_channel'
-    SALES_CUSTOMER_ID_COL = 'CustomerID'
-    SALES_PRODUCT_ID_COL = 'ProductID'
-    # No 'Region' column observed in sales_prepared.csv head. Will get from customers.
-
-    # products_prepared.csv columns
-    PRODUCTS_PRODUCT_ID_COL = 'productid' # Lowercase
-    PRODUCTS_CATEGORY_COL = 'category'    # Lowercase
-
-    # customers_prepared.csv columns
-    CUSTOMERS_CUSTOMER_ID_COL = 'CustomerID'
-    CUSTOMERS_REGION_COL = 'Region'
-    # -------------------------------------------------------------------
-
     merged_df = sales_df.copy() # Start with sales data
 
     # 3.1 Merge with Products Data
@@ -150,6 +189,17 @@ def merge_and_process_data(dataframes: dict[str, pd.DataFrame]) -> pd.DataFrame:
         logger.warning("Customer data missing or required columns ('CustomerID', 'Region') not found. 'Region' will be 'Unknown'.")
         merged_df['Region'] = 'Unknown'
 
+    return process_merged_data(merged_df)
+
+def process_merged_data(merged_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Performs the final calculations and standardization on sales rows that
+    already carry their 'ProductCategory' and 'Region'.
+    Args:
+        merged_df (pd.DataFrame): Sales joined with product category and customer region.
+    Returns:
+        pd.DataFrame: The processed rows ready for aggregation.
+    """
 
     # 3.3 Date Transformation: Convert to datetime, extract Year and Quarter
     if SALES_DATE_COL in merged_df.columns:
@@ -176,18 +226,13 @@ def merge_and_process_data(dataframes: dict[str, pd.DataFrame]) -> pd.DataFrame:
 
     # 3.4 Profit and Profit Margin Calculation
     if SALES_REVENUE_COL in merged_df.columns:
-        # Ensure SaleAmount is numeric
-        merged_df['Total_Revenue'] = pd.to_numeric(merged_df[SALES_REVENUE_COL], errors='coerce').fillna(0)
-
         # --- Handle Missing Cost Data: ASSUMPTION ---
-        # Since 'Cost' column was not found in your sales_prepared.csv head.
-        # This is a critical assumption for your homework.
-        ASSUMED_COST_PERCENTAGE = 0.70 # Meaning 70% of revenue is cost, 30% is profit
-        merged_df['Total_Cost'] = merged_df['Total_Revenue'] * ASSUMED_COST_PERCENTAGE
+        # No 'Cost' column exists in sales_prepared.csv, so the shared cost model in
+        # utils/measures.py is used (the same one the warehouse load applies).
+        measures_df = compute_profit_measures(merged_df[SALES_REVENUE_COL])
+        for col in ['Total_Revenue', 'Total_Cost', 'Profit', 'Profit_Margin']:
+            merged_df[col] = measures_df[col]
         logger.warning(f"Cost column not found. Assuming Total_Cost = Total_Revenue * {ASSUMED_COST_PERCENTAGE*100:.0f}% for demonstration.")
-
-        merged_df['Profit'] = merged_df['Total_Revenue'] - merged_df['Total_Cost']
-        merged_df['Profit_Margin'] = merged_df.apply(lambda row: (row['Profit'] / row['Total_Revenue'] * 100) if row['Total_Revenue'] > 0 else 0, axis=1)
         logger.info("Calculated 'Profit' and 'Profit_Margin'.")
     else:
         logger.warning(f"Revenue column ('{SALES_REVENUE_COL}') not found. Cannot calculate Profit/Profit Margin. Setting to 0.")
@@ -213,7 +258,8 @@ def merge_and_process_data(dataframes: dict[str, pd.DataFrame]) -> pd.DataFrame:
     for col in categorical_cols_to_process:
         if col in merged_df.columns:
             # Fill NaNs with 'Unknown' BEFORE string operations, then clean and title case
-            merged_df[col] = merged_df[col].fillna('Unknown').astype(str).str.strip().str.title()
+            # The string ops run once per distinct value and are mapped back by code (see DataScrubber)
+            merged_df[col] = map_unique_values(merged_df[col].fillna('Unknown'), lambda s: s.astype(str).str.strip().str.title())
             logger.info(f"Standardized categorical column: '{col}'.")
         else:
             logger.warning(f"Final categorical column '{col}' not found in merged DataFrame. Setting to 'Unknown'. Check merge logic/source columns if unexpected.")
@@ -239,6 +285,42 @@ def merge_and_process_data(dataframes: dict[str, pd.DataFrame]) -> pd.DataFrame:
     logger.info("Final Processed DataFrame head:\n%s", merged_df.head())
     return merged_df
 
+def stream_processed_data(memory_budget_mb: int, start: str | None = None, end: str | None = None,
+                          workers: int | None = None) -> Iterator[pd.DataFrame]:
+    """
+    Joins sales with product categories and customer regions out of core and
+    yields the processed rows one partition at a time.
+    The join spills to local disk (utils/star_join.py), so memory stays within
+    the budget however large the sales files are.
+    Args:
+        memory_budget_mb (int): Memory budget for the join, in MiB.
+        start (str, optional): First sale date to include.
+        end (str, optional): Last sale date to include.
+        workers (int, optional): Join processes; defaults to the CPU count.
+    Yields:
+        pd.DataFrame: Processed rows, as returned by process_merged_data().
+    """
+    stats = read_partition_stats(SALES_PARTITIONS_DIR) if (start or end) else None
+    if stats is not None:
+        sales_paths = [SALES_PARTITIONS_DIR / partition["path"] for partition in prune_partitions(stats, start, end)]
+    else:
+        sales_paths = [PREPARED_DATA_DIR / 'sales_prepared.csv']
+    dimensions = [
+        DimensionJoin(PREPARED_DATA_DIR / 'products_prepared.csv', SALES_PRODUCT_ID_COL,
+                      PRODUCTS_PRODUCT_ID_COL, (PRODUCTS_CATEGORY_COL,)),
+        DimensionJoin(PREPARED_DATA_DIR / 'customers_prepared.csv', SALES_CUSTOMER_ID_COL,
+                      CUSTOMERS_CUSTOMER_ID_COL, (CUSTOMERS_REGION_COL,)),
+    ]
+    logger.info(f"Joining {len(sales_paths)} sales file(s) out of core with a {memory_budget_mb} MiB memory budget.")
+    for joined_df in star_join(sales_paths, dimensions, memory_budget_bytes=memory_budget_mb * 1024 * 1024,
+                               max_workers=workers):
+        joined_df = joined_df.rename(columns={PRODUCTS_CATEGORY_COL: 'ProductCategory', CUSTOMERS_REGION_COL: 'Region'})
+        if start or end:
+            dates = pd.to_datetime(joined_df[SALES_DATE_COL], errors='coerce')
+            joined_df = joined_df[dates.between(pd.Timestamp(start or dates.min()), pd.Timestamp(end or dates.max()))]
+        if not joined_df.empty:
+            yield process_merged_data(joined_df)
+
 def aggregate_final_data(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Aggregates the fully processed sales data into the required formats for BI analysis.
@@ -260,11 +342,14 @@ def aggregate_final_data(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame,
 
     # 4.1 Aggregation for the main goal: Profit by Product Category, Region, Quarter
     # Ensure column names match the final names from merge_and_process_data
-    main_profit_agg_df = df_filtered.groupby(['Year', 'Quarter', 'Region', 'ProductCategory']).agg(
-        Total_Revenue=('Total_Revenue', 'sum'),
-        Total_Profit=('Profit', 'sum'),
-        Units_Sold=('Units_Sold', 'sum')
-    ).reset_index()
+    # The sales are reduced once to (Year, Quarter, Region, ProductCategory, sales_channel) cells on the
+    # integer-coded groupby kernel; the three aggregates below are rollups of those cells, not of the sales.
+    # Missing keys are kept as their own cells here and dropped by each rollup, as groupby() would.
+    cells_df = group_sums(df_filtered, ['Year', 'Quarter', 'Region', 'ProductCategory', 'sales_channel'],
+                          {'Total_Revenue': 'Total_Revenue', 'Total_Profit': 'Profit', 'Units_Sold': 'Units_Sold'},
+                          dropna=False)
+    main_profit_agg_df = group_sums(cells_df, ['Year', 'Quarter', 'Region', 'ProductCategory'],
+                                    {'Total_Revenue': 'Total_Revenue', 'Total_Profit': 'Total_Profit', 'Units_Sold': 'Units_Sold'})
 
     # Calculate Avg_Profit_Margin for the aggregated data (sum of profit / sum of revenue for the group)
     main_profit_agg_df['Avg_Profit_Margin'] = (
@@ -276,15 +361,13 @@ def aggregate_final_data(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame,
     logger.info("Aggregating for Sales Channel Share...")
     # Use the final column name 'sales_channel'
     # Ensure SALES_CHANNEL_COL (which is 'sales_channel') is used consistently
-    sales_channel_share_df = df_filtered.groupby('sales_channel').agg(
-        Total_Revenue=('Total_Revenue', 'sum')
-    ).reset_index()
+    sales_channel_share_df = group_sums(cells_df, ['sales_channel'], {'Total_Revenue': 'Total_Revenue'})
     sales_channel_share_df['Share_Percent'] = (sales_channel_share_df['Total_Revenue'] / sales_channel_share_df['Total_Revenue'].sum()) * 100
     logger.info("Sales Channel Share data:\n%s", sales_channel_share_df)
 
     # 4.3 Year-over-Year Growth (requires data spanning multiple years)
     logger.info("Aggregating for Year-over-Year Growth by Product Category...")
-    yearly_product_revenue_df = df_filtered.groupby(['Year', 'ProductCategory'])['Total_Revenue'].sum().reset_index()
+    yearly_product_revenue_df = group_sums(cells_df, ['Year', 'ProductCategory'], {'Total_Revenue': 'Total_Revenue'})
     yearly_product_revenue_df = yearly_product_revenue_df.sort_values(by=['ProductCategory', 'Year'])
 
     yearly_product_revenue_df['Previous_Year_Revenue'] = yearly_product_revenue_df.groupby('ProductCategory')['Total_Revenue'].shift(1)
@@ -295,48 +378,129 @@ def aggregate_final_data(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame,
 
     return main_profit_agg_df, sales_channel_share_df, yearly_product_revenue_df
 
+def save_aggregates(main_agg_df: pd.DataFrame, channel_share_agg_df: pd.DataFrame,
+                    yoy_growth_agg_df: pd.DataFrame, quarterly_growth_agg_df: pd.DataFrame) -> None:
+    """
+    Saves the aggregated DataFrames, with their manifests, to the data/processed/ directory.
+    Empty aggregates are not saved.
+    """
+    if not main_agg_df.empty:
+        main_agg_path = PROCESSED_DATA_DIR / 'profit_by_category_region_quarter_agg.csv'
+        main_agg_df.to_csv(main_agg_path, index=False)
+        write_manifest(main_agg_df, main_agg_path)
+        logger.info(f"Main aggregated data saved to: {main_agg_path}")
+    else:
+        logger.warning("Main aggregated DataFrame is empty after aggregation. Not saving.")
+
+    if not channel_share_agg_df.empty:
+        channel_share_path = PROCESSED_DATA_DIR / 'sales_channel_share_agg.csv'
+        channel_share_agg_df.to_csv(channel_share_path, index=False)
+        write_manifest(channel_share_agg_df, channel_share_path)
+        logger.info(f"Sales channel share data saved to: {channel_share_path}")
+    else:
+        logger.warning("Sales channel share DataFrame is empty after aggregation. Not saving.")
+
+    if not yoy_growth_agg_df.empty:
+        yoy_growth_path = PROCESSED_DATA_DIR / 'yoy_growth_agg.csv'
+        yoy_growth_agg_df.to_csv(yoy_growth_path, index=False)
+        write_manifest(yoy_growth_agg_df, yoy_growth_path)
+        logger.info(f"Year-over-Year growth data saved to: {yoy_growth_path}")
+    else:
+        logger.warning("Year-over-Year growth DataFrame is empty after aggregation. Not saving.")
+
+    if not quarterly_growth_agg_df.empty:
+        quarterly_growth_path = PROCESSED_DATA_DIR / 'quarterly_growth_agg.csv'
+        quarterly_growth_agg_df.to_csv(quarterly_growth_path, index=False)
+        write_manifest(quarterly_growth_agg_df, quarterly_growth_path)
+        logger.info(f"QoQ, YoY and rolling 4-quarter growth data saved to: {quarterly_growth_path}")
+    else:
+        logger.warning("Quarterly growth DataFrame is empty. Not saving.")
+
+def save_metrics_store(metrics_store: MetricsStore, save: bool) -> None:
+    """Save the metrics store, or log why a partial rebuild left the saved store unchanged."""
+    if save:
+        metrics_store.save(METRICS_STORE_DIR)
+    else:
+        logger.warning(f"Sales were limited to a date range without --batch-id; "
+                       f"the metrics store in {METRICS_STORE_DIR} was not replaced.")
+
 #####################################
 # Define Main Function - The main entry point of the script
 #####################################
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     """
     Main function to orchestrate the loading, merging, processing,
     and aggregation of sales, product, and customer data for BI analysis.
+    An optional --start/--end sale date range limits which sales partitions are read.
+    With --batch-id, the loaded sales are treated as a new batch: they are added
+    to the metrics store and every aggregate is derived from the store, so
+    historical sales are not re-read. A batch whose dates the store already
+    covers is rejected and the script exits with status 1. Without it, the
+    store is rebuilt from all sales; a --start/--end run without --batch-id
+    only writes the aggregates of its window and leaves the saved store alone.
+    With --memory-budget-mb, sales are joined out of core and streamed into the
+    metrics store, so the full sales table is never held in memory.
     """
+    parser = argparse.ArgumentParser(description="Merge prepared data and build BI aggregates.")
+    parser.add_argument("--start", help="First sale date to include, e.g. 2025-04-01")
+    parser.add_argument("--end", help="Last sale date to include, e.g. 2025-06-30")
+    parser.add_argument("--batch-id", help="Apply the loaded sales incrementally as this batch, e.g. 2025-06-01")
+    parser.add_argument("--memory-budget-mb", type=int, help="Join sales out of core within this memory budget (MiB)")
+    parser.add_argument("--workers", type=int, help="Join processes used with --memory-budget-mb")
+    args = parser.parse_args(argv)
+
     logger.info("--- Starting custom BI project data preparation and aggregation script ---")
+    # A ranged run without a batch id sees only part of the sales, so its store must not replace the saved one
+    save_store = bool(args.batch_id) or not (args.start or args.end)
 
-    # Step 1: Load prepared individual data files
-    prepared_data_dfs = load_prepared_data()
+    if args.memory_budget_mb:
+        metrics_store = MetricsStore.load(METRICS_STORE_DIR) if args.batch_id else MetricsStore()
+        if args.batch_id in metrics_store.applied_batches:
+            logger.info(f"Batch '{args.batch_id}' was already applied; aggregates are unchanged.")
+        else:
+            chunks = stream_processed_data(args.memory_budget_mb, args.start, args.end, args.workers)
+            try:
+                touched = metrics_store.apply_batch(chunks, batch_id=args.batch_id, start=args.start, end=args.end)
+            except ValueError as e:
+                logger.error(f"{e} Aggregates are unchanged.")
+                sys.exit(1)
+            logger.info(f"Streamed the processed sales into {touched} metric buckets.")
+        save_metrics_store(metrics_store, save_store)
+        save_aggregates(metrics_store.profit_by_category_region_quarter(), metrics_store.channel_share(),
+                        metrics_store.yearly_growth(), metrics_store.quarterly_growth(["ProductCategory"]))
+        logger.info("--- Script Finished ---")
+        return
+
+    # Step 1: Load prepared individual data files (sales pruned to the requested date range)
+    prepared_data_dfs = load_prepared_data(start=args.start, end=args.end)
 
     # Step 2: Merge the loaded dataframes and perform final calculations/transformations
     fully_processed_df = merge_and_process_data(prepared_data_dfs)
 
     if not fully_processed_df.empty:
         # Step 3: Aggregate the fully processed data into the required formats for BI
-        main_agg_df, channel_share_agg_df, yoy_growth_agg_df = aggregate_final_data(fully_processed_df)
-
-        # Step 4: Save the aggregated DataFrames to the data/processed/ directory
-        if not main_agg_df.empty:
-            main_agg_path = PROCESSED_DATA_DIR / 'profit_by_category_region_quarter_agg.csv'
-            main_agg_df.to_csv(main_agg_path, index=False)
-            logger.info(f"Main aggregated data saved to: {main_agg_path}")
-        else:
-            logger.warning("Main aggregated DataFrame is empty after aggregation. Not saving.")
-
-        if not channel_share_agg_df.empty:
-            channel_share_path = PROCESSED_DATA_DIR / 'sales_channel_share_agg.csv'
-            channel_share_agg_df.to_csv(channel_share_path, index=False)
-            logger.info(f"Sales channel share data saved to: {channel_share_path}")
+        if args.batch_id:
+            metrics_store = MetricsStore.load(METRICS_STORE_DIR)
+            try:
+                touched = metrics_store.apply_batch(fully_processed_df, batch_id=args.batch_id,
+                                                    start=args.start, end=args.end)
+            except ValueError as e:
+                logger.error(f"{e} Aggregates are unchanged.")
+                sys.exit(1)
+            logger.info(f"Batch '{args.batch_id}' updated {touched} metric buckets.")
+            main_agg_df = metrics_store.profit_by_category_region_quarter()
+            channel_share_agg_df = metrics_store.channel_share()
+            yoy_growth_agg_df = metrics_store.yearly_growth()
         else:
-            logger.warning("Sales channel share DataFrame is empty after aggregation. Not saving.")
+            main_agg_df, channel_share_agg_df, yoy_growth_agg_df = aggregate_final_data(fully_processed_df)
+            metrics_store = MetricsStore()
+            metrics_store.apply_batch(fully_processed_df, start=args.start, end=args.end)
+        save_metrics_store(metrics_store, save_store)
+        quarterly_growth_agg_df = metrics_store.quarterly_growth(["ProductCategory"])
 
-        if not yoy_growth_agg_df.empty:
-            yoy_growth_path = PROCESSED_DATA_DIR / 'yoy_growth_agg.csv'
-            yoy_growth_agg_df.to_csv(yoy_growth_path, index=False)
-            logger.info(f"Year-over-Year growth data saved to: {yoy_growth_path}")
-        else:
-            logger.warning("Year-over-Year growth DataFrame is empty after aggregation. Not saving.")
+        # Step 4: Save the aggregated DataFrames to the data/processed/ directory
+        save_aggregates(main_agg_df, channel_share_agg_df, yoy_growth_agg_df, quarterly_growth_agg_df)
 
         logger.info("All data processing and aggregation steps completed successfully.")
     else:
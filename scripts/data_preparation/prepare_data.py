@@ -0,0 +1,138 @@
+"""
+scripts/data_preparation/prepare_data.py
+
+This script reads raw data from the data/raw folder, cleans it with the
+declarative rules in utils/cleaning_rules.py, and writes the cleaned version
+to the data/prepared folder.
+
+Every table shares the same executor; only its rules differ.
+
+Usage:
+    py scripts/data_preparation/prepare_data.py              # all tables
+    py scripts/data_preparation/prepare_data.py customers    # one table
+    py scripts/data_preparation/prepare_data.py --workers 8  # transform columns on 8 threads
+"""
+
+#####################################
+# Import Modules at the Top
+#####################################
+
+# Import from Python Standard Library
+import argparse
+import pathlib
+import sys
+
+# Import from external packages (requires a virtual environment)
+import pandas as pd
+
+# Ensure project root is in sys.path for local imports (now 3 parents are needed)
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent.parent))
+
+# Import local modules (e.g. utils/logger.py)
+from utils.logger import logger
+from utils.cleaning_rules import TABLE_RULES, compile_rules
+from utils.ingest import read_raw_data
+from utils.manifest import write_manifest
+from utils.partitions import write_partitioned
+from utils.validation import write_rejects
+
+# Constants
+SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent  # Directory of the current script
+SCRIPTS_DIR: pathlib.Path = SCRIPTS_DATA_PREP_DIR.parent
+PROJECT_ROOT: pathlib.Path = SCRIPTS_DIR.parent
+DATA_DIR: pathlib.Path = PROJECT_ROOT / "data"
+RAW_DATA_DIR: pathlib.Path = DATA_DIR / "raw"
+PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"  # place to store prepared data
+REJECTS_DIR: pathlib.Path = PREPARED_DATA_DIR / "rejects"  # rows that failed validation
+
+#####################################
+# Define Functions - Reusable blocks of code / instructions
+#####################################
+
+def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
+    """
+    Save cleaned data to CSV, with its sidecar manifest.
+
+    Args:
+        df (pd.DataFrame): Cleaned DataFrame.
+        file_name (str): Name of the output file.
+    """
+    logger.info(f"FUNCTION START: save_prepared_data with file_name={file_name}, dataframe shape={df.shape}")
+    PREPARED_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    file_path = PREPARED_DATA_DIR.joinpath(file_name)
+    df.to_csv(file_path, index=False)
+    write_manifest(df, file_path)
+    logger.info(f"Data saved to {file_path}")
+
+
+def prepare_table(table: str, max_workers: int = 1) -> pd.DataFrame:
+    """
+    Read, clean and save one source table using its declared rules.
+
+    Args:
+        table (str): Key into TABLE_RULES, e.g. "customers".
+        max_workers (int): Threads for per-column transforms; 1 runs them in sequence.
+
+    Returns:
+        pd.DataFrame: The cleaned DataFrame (empty if the raw file could not be read).
+    """
+    if table not in TABLE_RULES:
+        raise ValueError(f"No cleaning rules declared for table '{table}'. Known tables: {', '.join(TABLE_RULES)}")
+    rules = TABLE_RULES[table]
+
+    logger.info("==================================")
+    logger.info(f"STARTING preparation of {table}")
+    logger.info("==================================")
+
+    df = read_raw_data(rules["input_file"], RAW_DATA_DIR)
+    if df.empty:
+        logger.warning(f"No data to prepare for {table}.")
+        return df
+    original_shape = df.shape
+    logger.info(f"Initial dataframe columns: {', '.join(df.columns.tolist())}")
+
+    plan = compile_rules(rules)
+    logger.info(f"Cleaning plan for {table}: {' -> '.join(plan.describe())}")
+    df = plan.run(df, max_workers=max_workers)
+
+    # Route rows that failed validation to a reject file for review
+    if plan.validation is not None:
+        reject_path = REJECTS_DIR.joinpath(f"{table}_rejects.csv")
+        rejected_count = write_rejects(plan.validation, reject_path)
+        if rejected_count:
+            logger.warning(f"Rejected {rejected_count} {table} rows; see {reject_path}")
+
+    save_prepared_data(df, rules["output_file"])
+    if rules.get("partition_by"):
+        partition_dir = PREPARED_DATA_DIR.joinpath(rules["partition_dir"])
+        stats = write_partitioned(df, partition_dir, rules["partition_by"])
+        logger.info(f"Wrote {len(stats['partitions'])} {table} partitions by {rules['partition_by']} to {partition_dir}")
+
+    logger.info("==================================")
+    logger.info(f"Original shape: {original_shape}")
+    logger.info(f"Cleaned shape:  {df.shape}")
+    logger.info(f"FINISHED preparation of {table}")
+    logger.info("==================================")
+    return df
+
+#####################################
+# Define Main Function - The main entry point of the script
+#####################################
+
+def main(argv: list[str] | None = None) -> None:
+    """Prepare the tables named on the command line, or all declared tables."""
+    parser = argparse.ArgumentParser(description="Clean raw source tables into data/prepared.")
+    parser.add_argument("tables", nargs="*", help=f"Tables to prepare (default: {', '.join(TABLE_RULES)})")
+    parser.add_argument("--workers", type=int, default=1, help="Threads for per-column transforms (default: 1)")
+    args = parser.parse_args(argv)
+    for table in args.tables or list(TABLE_RULES):
+        prepare_table(table, max_workers=args.workers)
+
+#####################################
+# Conditional Execution Block
+# Ensures the script runs only when executed directly
+# This is a common Python convention.
+#####################################
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,12 @@
 """
-scripts/data_preparation/prepare_sales.py
+scripts/data_preparation/prepare_sales_data.py
 
-This script reads data from the data/raw folder, cleans the data, 
+This script reads sales data from the data/raw folder, cleans the data,
 and writes the cleaned version to the data/prepared folder.
 
-Tasks:
-- Remove duplicates
-- Handle missing values
-- Remove outliers
-- Ensure consistent formatting
-
+The cleaning rules for sales (duplicates, missing values, outliers,
+allowed values and formatting) are declared in utils/cleaning_rules.py
+and run by the shared executor in prepare_data.py.
 """
 
 #####################################
@@ -20,63 +17,11 @@ Tasks:
 import pathlib
 import sys
 
-# Import from external packages (requires a virtual environment)
-import pandas as pd
-
 # Ensure project root is in sys.path for local imports (now 3 parents are needed)
 sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent.parent))
 
-# Import local modules (e.g. utils/logger.py)
-from utils.logger import logger  
-
-# Optional: Use a data_scrubber module for common data cleaning tasks
-from utils.data_scrubber import DataScrubber  
-
-
-# Constants
-SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent  # Directory of the current script
-SCRIPTS_DIR: pathlib.Path = SCRIPTS_DATA_PREP_DIR.parent 
-PROJECT_ROOT: pathlib.Path = SCRIPTS_DIR.parent 
-DATA_DIR: pathlib.Path = PROJECT_ROOT/ "data" 
-RAW_DATA_DIR: pathlib.Path = DATA_DIR / "raw"  
-PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"  # place to store prepared data
-
-
-# Ensure the directories exist or create them
-DATA_DIR.mkdir(exist_ok=True)
-RAW_DATA_DIR.mkdir(exist_ok=True)
-PREPARED_DATA_DIR.mkdir(exist_ok=True)
-
-#####################################
-# Define Functions - Reusable blocks of code / instructions
-#####################################
-
-# TODO: Complete this by implementing functions based on the logic in the other scripts
-
-def read_raw_data(file_name: str) -> pd.DataFrame:
-    """
-    Read raw data from CSV.
-
-    Args:
-        file_name (str): Name of the CSV file to read.
-    
-    Returns:
-        pd.DataFrame: Loaded DataFrame.
-    """
-    logger.info(f"FUNCTION START: read_raw_data with file_name={file_name}")
-    file_path = RAW_DATA_DIR.joinpath(file_name)
-    logger.info(f"Reading data from {file_path}")
-    df = pd.read_csv(file_path)
-    logger.info(f"Loaded dataframe with {len(df)} rows and {len(df.columns)} columns")
-    
-    # TODO: OPTIONAL Add data profiling here to understand the dataset
-    # Suggestion: Log the datatypes of each column and the number of unique values
-    # Example:
-    # logger.info(f"Column datatypes: \n{df.dtypes}")
-    # logger.info(f"Number of unique values: \n{df.nunique()}")
-    
-    return df
-
+# Import local modules
+from scripts.data_preparation.prepare_data import prepare_table
 
 #####################################
 # Define Main Function - The main entry point of the script
@@ -84,64 +29,15 @@ def read_raw_data(file_name: str) -> pd.DataFrame:
 
 def main() -> None:
     """
-    Main function for processing data.
+    Main function for processing sales data.
     """
-    logger.info("==================================")
-    logger.info("STARTING prepare_sales_data.py")
-    logger.info("==================================")
-
-    logger.info(f"Root         : {PROJECT_ROOT}")
-    logger.info(f"data/raw     : {RAW_DATA_DIR}")
-    logger.info(f"data/prepared: {PREPARED_DATA_DIR}")
-    logger.info(f"scripts      : {SCRIPTS_DIR}")
-
-    input_file = "sales_data.csv"
-    output_file = "sales_prepared.csv"
-    
-    # Read raw data
-    df = read_raw_data(input_file)
-
-    # Record original shape
-    original_shape = df.shape
-
-    # Log initial dataframe information
-    logger.info(f"Initial dataframe columns: {', '.join(df.columns.tolist())}")
-    logger.info(f"Initial dataframe shape: {df.shape}")
-    
-    # Clean column names
-    original_columns = df.columns.tolist()
-    df.columns = df.columns.str.strip()
-    
-    # Log if any column names changed
-    changed_columns = [f"{old} -> {new}" for old, new in zip(original_columns, df.columns) if old != new]
-    if changed_columns:
-        logger.info(f"Cleaned column names: {', '.join(changed_columns)}")
-
-    # TODO: Remove duplicates
-
-    # TODO:Handle missing values
-
-    # TODO:Remove outliers
-
-    # TODO:Save prepared data
-    
-    # Save prepared data
-    output_path = PREPARED_DATA_DIR / output_file
-    df.to_csv(output_path, index=False)
-    logger.info(f"Saved cleaned data to: {output_path}")
-    
-    logger.info("==================================")
-    logger.info(f"Original shape: {df.shape}")
-    logger.info(f"Cleaned shape:  {original_shape}")
-    logger.info("==================================")
-    logger.info("FINISHED prepare_sales_data.py")
-    logger.info("==================================")
+    prepare_table("sales")
 
 #####################################
-# Conditional Execution Block 
+# Conditional Execution Block
 # Ensures the script runs only when executed directly
 # This is a common Python convention.
 #####################################
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,3 +1,30 @@
+"""
+scripts/etl_to_dw.py
+
+Load the prepared CSVs into the SQLite data warehouse.
+
+The load is built in a staging copy of the warehouse (smart_sales.staging.db)
+and published in one step when it finishes, so readers of smart_sales.db
+never see a half-loaded warehouse. Sales are loaded in chunks. Every few
+chunks, progress is committed to the etl_checkpoint table in the staging
+database. If a load is interrupted, rerunning it with the same prepared files
+resumes after the last committed chunk instead of starting over. Changed
+prepared files start a fresh load.
+
+With --shards N the sales are split by store_id range into N shard
+warehouses (smart_sales.shard-00.db, ...; see utils/shards.py). Each shard
+is loaded, staged and published by its own process, and the shard manifest
+is written once all of them have been published. A failed shard can be
+resumed by rerunning the same command. A load without --shards removes the
+shards again.
+
+Usage:
+    py scripts/etl_to_dw.py [--scd2] [--chunk-rows 50000] [--checkpoint-every 4] [--shards 4] [--workers 4]
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
 import pandas as pd
 import sqlite3
 import pathlib
@@ -8,10 +35,44 @@ PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
+from utils.campaigns import CAMPAIGN_SUMMARY_SQL, apply_campaign_summary, summarize_campaign_sales
+from utils.cdc import HASH_TABLE_SQL, apply_dimension_snapshot
+from utils.columnar_reader import read_sql_columnar
+from utils.customer_analytics import (
+    CUSTOMER_ANALYTICS_SQL,
+    apply_customer_activity,
+    refresh_customer_tables,
+    summarize_customer_activity,
+)
+from utils.measures import ASSUMED_COST_PERCENTAGE, build_sale_measures
+from utils.olap_sketches import SKETCH_TABLE_SQL, build_sale_sketches
+from utils.manifest import file_sha256
+from utils.shards import plan_store_ranges, remove_shards, shard_path_for, write_shard_manifest
+from utils.warehouse import (
+    DB_PATH,
+    bump_version,
+    connect_writer,
+    create_staging,
+    ensure_meta_table,
+    publish_staging,
+    staging_path_for,
+)
+
 # Constants
-DW_DIR = pathlib.Path("data").joinpath("dw")
-DB_PATH = DW_DIR.joinpath("smart_sales.db")
-PREPARED_DATA_DIR = pathlib.Path("data").joinpath("prepared")
+PREPARED_DATA_DIR = PROJECT_ROOT.joinpath("data", "prepared")
+PREPARED_FILES = ["customers_prepared.csv", "products_prepared.csv", "sales_prepared.csv"]
+SALES_CHUNK_ROWS = 50_000  # Sales rows read and inserted per chunk
+CHECKPOINT_EVERY_CHUNKS = 4  # Commit progress after this many chunks
+
+# Load stages recorded in etl_checkpoint, in order
+STAGE_DIMENSIONS = "dimensions"
+STAGE_SALES = "sales"
+STAGE_COMPLETE = "complete"
+
+SALE_COLUMNS = [
+    'sale_id', 'customer_id', 'product_id', 'sale_amount', 'sale_date', 'store_id',
+    'campaign_id', 'discount_percent', 'payment_type', 'sales_channel',
+]
 
 def create_schema(cursor: sqlite3.Cursor) -> None:
     """Create tables in the data warehouse if they don't exist."""
@@ -62,136 +123,406 @@ def create_schema(cursor: sqlite3.Cursor) -> None:
         )
     """)
     print("Sale table created.")
+
+    # Derived measures are computed once at load so SQL consumers can aggregate
+    # profit directly instead of recomputing the cost model client-side.
+    print("Creating sale_measure table...")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sale_measure (
+            sale_id INTEGER PRIMARY KEY,
+            sale_date_iso TEXT,
+            sale_year INTEGER,
+            sale_quarter INTEGER,
+            sale_month INTEGER,
+            sale_dow INTEGER,
+            total_revenue REAL,
+            gross_amount REAL,
+            discount_amount REAL,
+            total_cost REAL,
+            profit REAL,
+            profit_margin REAL,
+            FOREIGN KEY (sale_id) REFERENCES sale (sale_id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sale_measure_year_quarter
+        ON sale_measure (sale_year, sale_quarter)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sale_measure_date
+        ON sale_measure (sale_date_iso)
+    """)
+    print("Sale_measure table created.")
+
+    print("Creating sale_fact view...")
+    cursor.execute("""
+        CREATE VIEW IF NOT EXISTS sale_fact AS
+        SELECT
+            s.*,
+            m.sale_date_iso,
+            m.sale_year,
+            m.sale_quarter,
+            m.sale_month,
+            m.sale_dow,
+            m.total_revenue,
+            m.gross_amount,
+            m.discount_amount,
+            m.total_cost,
+            m.profit,
+            m.profit_margin
+        FROM sale s
+        JOIN sale_measure m ON m.sale_id = s.sale_id
+    """)
+    print("Sale_fact view created.")
+
+    # Approximate distinct-count / top-K sketches per cube cell (see utils/olap_sketches.py)
+    print("Creating sale_sketch table...")
+    cursor.execute(SKETCH_TABLE_SQL)
+    print("Sale_sketch table created.")
+
+    # Campaign / discount-band rollup, added to chunk by chunk (see utils/campaigns.py)
+    print("Creating campaign_summary table...")
+    cursor.execute(CAMPAIGN_SUMMARY_SQL)
+    print("Campaign_summary table created.")
+
+    # Customer purchase history per month, and the RFM / cohort tables derived from it
+    print("Creating customer analytics tables...")
+    for statement in CUSTOMER_ANALYTICS_SQL:
+        cursor.execute(statement)
+    print("Customer analytics tables created.")
+
+    # Row hashes of the last dimension snapshot, for delta detection (see utils/cdc.py)
+    cursor.execute(HASH_TABLE_SQL)
+
+    ensure_meta_table(cursor.connection)
     print("DEBUG: Exiting create_schema function.")
 
 def delete_existing_records(cursor: sqlite3.Cursor) -> None:
-    """Delete all existing records from the customer, product, and sale tables.
+    """Delete all existing records from the sale tables.
+    Customer and product rows are kept; refresh_dimension applies only their changes.
     Order of deletion matters due to foreign key constraints.
     """
     print("DEBUG: Inside delete_existing_records function.")
     print("Deleting existing records from tables...")
+    cursor.execute("DELETE FROM sale_sketch")
+    cursor.execute("DELETE FROM campaign_summary")
+    cursor.execute("DELETE FROM customer_activity")
+    cursor.execute("DELETE FROM sale_measure")
     cursor.execute("DELETE FROM sale")
-    cursor.execute("DELETE FROM product")
-    cursor.execute("DELETE FROM customer")
     print("Existing records deleted.")
     print("DEBUG: Exiting delete_existing_records function.")
 
-def insert_customers(customers_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
-    """Insert customer data into the customer table."""
-    print("DEBUG: Inside insert_customers function.")
-    print("Inserting customer data...")
-    customers_df.to_sql("customer", cursor.connection, if_exists="append", index=False)
-    print(f"Inserted {len(customers_df)} customer records.")
-    print("DEBUG: Exiting insert_customers function.")
-
-def insert_products(products_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
-    """Insert product data into the product table."""
-    print("DEBUG: Inside insert_products function.")
-    print("Inserting product data...")
-    products_df.to_sql("product", cursor.connection, if_exists="append", index=False)
-    print(f"Inserted {len(products_df)} product records.")
-    print("DEBUG: Exiting insert_products function.")
+def refresh_dimension(df: pd.DataFrame, table: str, key_column: str, cursor: sqlite3.Cursor, scd2: bool = False) -> None:
+    """Apply only the inserts, updates and deletes since the last load to a dimension table."""
+    print(f"DEBUG: Inside refresh_dimension function for {table}.")
+    print(f"Detecting {table} changes...")
+    changes = apply_dimension_snapshot(cursor.connection, table, key_column, df, scd2=scd2)
+    summary = changes.summary()
+    print(f"Applied {table} changes: {summary['inserts']} inserted, {summary['updates']} updated, "
+          f"{summary['deletes']} deleted (of {len(df)} snapshot rows){' with SCD2 history' if scd2 else ''}.")
+    print(f"DEBUG: Exiting refresh_dimension function for {table}.")
 
 def insert_sales(sales_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
-    """Insert sales data into the sales table."""
+    """Insert sales data into the sales table. Sale ids already loaded are skipped."""
     print("DEBUG: Inside insert_sales function.")
     print("Inserting sales data...")
-    sales_df.to_sql("sale", cursor.connection, if_exists="append", index=False)
+    records = sales_df[SALE_COLUMNS].astype(object).where(sales_df[SALE_COLUMNS].notna(), None)
+    cursor.executemany(
+        f"INSERT OR IGNORE INTO sale ({', '.join(SALE_COLUMNS)}) VALUES ({', '.join('?' for _ in SALE_COLUMNS)})",
+        records.itertuples(index=False, name=None),
+    )
     print(f"Inserted {len(sales_df)} sale records.")
     print("DEBUG: Exiting insert_sales function.")
 
-def load_data_to_db() -> None:
+def insert_sale_measures(sales_df: pd.DataFrame, cursor: sqlite3.Cursor) -> pd.DataFrame:
+    """Compute derived measures for the loaded sales, insert them into sale_measure and return them."""
+    print("DEBUG: Inside insert_sale_measures function.")
+    print(f"Computing sale measures (cost = {ASSUMED_COST_PERCENTAGE:.0%} of revenue)...")
+    measures_df = build_sale_measures(sales_df)
+    records = measures_df.astype(object).where(measures_df.notna(), None)
+    cursor.executemany(
+        f"INSERT OR IGNORE INTO sale_measure ({', '.join(measures_df.columns)}) "
+        f"VALUES ({', '.join('?' for _ in measures_df.columns)})",
+        records.itertuples(index=False, name=None),
+    )
+    print(f"Inserted {len(measures_df)} sale_measure records.")
+    print("DEBUG: Exiting insert_sale_measures function.")
+    return measures_df
+
+def insert_campaign_summary(sales_df: pd.DataFrame, measures_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
+    """Add the loaded sales into the campaign / discount-band rollup."""
+    print("DEBUG: Inside insert_campaign_summary function.")
+    summary_df = summarize_campaign_sales(sales_df, measures_df)
+    apply_campaign_summary(cursor, summary_df)
+    print(f"Updated {len(summary_df)} campaign_summary cells.")
+    print("DEBUG: Exiting insert_campaign_summary function.")
+
+def insert_customer_activity(sales_df: pd.DataFrame, measures_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
+    """Add the loaded sales into the per-customer, per-month purchase history."""
+    print("DEBUG: Inside insert_customer_activity function.")
+    activity_df = summarize_customer_activity(sales_df['customer_id'], measures_df['sale_date_iso'],
+                                              measures_df['total_revenue'])
+    apply_customer_activity(cursor, activity_df)
+    print(f"Updated {len(activity_df)} customer_activity rows.")
+    print("DEBUG: Exiting insert_customer_activity function.")
+
+def refresh_customer_analytics(cursor: sqlite3.Cursor) -> None:
+    """Rebuild the customer_rfm and customer_cohort tables from the purchase history."""
+    print("DEBUG: Inside refresh_customer_analytics function.")
+    rfm_rows, cohort_rows = refresh_customer_tables(cursor.connection)
+    print(f"Wrote {rfm_rows} customer_rfm and {cohort_rows} customer_cohort rows.")
+    print("DEBUG: Exiting refresh_customer_analytics function.")
+
+def insert_sale_sketches(cursor: sqlite3.Cursor) -> None:
+    """Build per-cell distinct-customer and top-product sketches from the loaded sales and insert them into sale_sketch."""
+    print("DEBUG: Inside insert_sale_sketches function.")
+    print("Building sale sketches...")
+    fact_df = read_sql_columnar(cursor.connection, """
+        SELECT f.sale_id, f.customer_id, f.product_id, f.sale_date_iso, f.sale_year, f.sale_quarter,
+               f.total_revenue, c.customer_segment, c.region, p.category
+        FROM sale_fact f
+        LEFT JOIN customer c ON c.customer_id = f.customer_id
+        LEFT JOIN product p ON p.product_id = f.product_id
+    """)
+    rows = build_sale_sketches(fact_df)
+    cursor.execute("DELETE FROM sale_sketch")
+    cursor.executemany("INSERT INTO sale_sketch (sketch_name, cell, sketch) VALUES (?, ?, ?)", rows)
+    print(f"Inserted {len(rows)} sale_sketch records.")
+    print("DEBUG: Exiting insert_sale_sketches function.")
+
+def read_customers(prepared_dir: pathlib.Path) -> pd.DataFrame:
+    """Load prepared customers with warehouse column names."""
+    customers_df = pd.read_csv(prepared_dir.joinpath("customers_prepared.csv"))
+    customers_df.rename(columns={
+        'CustomerID': 'customer_id',
+        'Name': 'name',
+        'Region': 'region',
+        'JoinDate': 'join_date',
+        'Loyalty Points': 'loyalty_points',
+        'CustomerSegment': 'customer_segment',
+        'membership_status': 'membership_status'
+    }, inplace=True)
+    customers_df.drop_duplicates(subset=['customer_id'], inplace=True)
+    print(f"DEBUG: Customers DataFrame loaded and columns renamed. Rows: {len(customers_df)}")
+    return customers_df
+
+def read_products(prepared_dir: pathlib.Path) -> pd.DataFrame:
+    """Load prepared products with warehouse column names."""
+    products_df = pd.read_csv(prepared_dir.joinpath("products_prepared.csv"))
+    products_df.rename(columns={
+        'productid': 'product_id',
+        'productname': 'product_name',
+        'category': 'category',
+        'unitprice': 'unit_price',
+        'stockquantity': 'stock_quantity',
+        'subcategory': 'subcategory',
+        'product_condition': 'product_condition'
+    }, inplace=True)
+    products_df.drop_duplicates(subset=['product_id'], inplace=True)
+    print(f"DEBUG: Products DataFrame loaded and columns renamed. Rows: {len(products_df)}")
+    return products_df
+
+def in_store_range(store_ids: pd.Series, store_range: tuple) -> pd.Series:
+    """Rows whose store id is in [low, high); rows without a store id belong to the range open below."""
+    low, high = store_range
+    ids = pd.to_numeric(store_ids, errors='coerce')
+    mask = pd.Series(True, index=store_ids.index)
+    if low is not None:
+        mask &= ids >= low
+    if high is not None:
+        mask &= ids < high
+    if low is None:
+        mask |= ids.isna()
+    return mask
+
+def prepare_sales_chunk(sales_df: pd.DataFrame, cursor: sqlite3.Cursor, store_range: tuple | None = None) -> pd.DataFrame:
+    """Rename a chunk of prepared sales and keep rows whose customer and product exist in the warehouse (and whose store is in store_range)."""
+    sales_df = sales_df.rename(columns={
+        'TransactionID': 'sale_id',
+        'SaleDate': 'sale_date',
+        'CustomerID': 'customer_id',
+        'ProductID': 'product_id',
+        'SaleAmount': 'sale_amount',
+        'StoreID': 'store_id',
+        'CampaignID': 'campaign_id',
+        'DiscountPercent': 'discount_percent',
+        'PaymentType': 'payment_type',
+        'sales_channel': 'sales_channel'
+    })
+    if store_range is not None:
+        sales_df = sales_df[in_store_range(sales_df['store_id'], store_range)]
+    sales_df['sale_amount'] = pd.to_numeric(sales_df['sale_amount'], errors='coerce').fillna(0)
+
+    initial_sales_rows = len(sales_df)
+    valid_customer_ids = [row[0] for row in cursor.execute("SELECT customer_id FROM customer")]
+    valid_product_ids = [row[0] for row in cursor.execute("SELECT product_id FROM product")]
+    sales_df = sales_df[sales_df['customer_id'].isin(valid_customer_ids)]
+    sales_df = sales_df[sales_df['product_id'].isin(valid_product_ids)]
+    if initial_sales_rows != len(sales_df):
+        print(f"DEBUG: Removed {initial_sales_rows - len(sales_df)} sales rows due to invalid foreign keys.")
+
+    # Duplicate sale_ids: the first occurrence wins, also across chunks, so the
+    # campaign rollup only counts sales that are actually inserted. The chunk's
+    # ids go to a temporary table joined against sale, so the lookup costs the
+    # chunk's ids, not every loaded sale in their id range.
+    sales_df = sales_df.drop_duplicates(subset=['sale_id'])
+    sale_ids = pd.to_numeric(sales_df['sale_id'], errors='coerce').dropna()
+    if len(sale_ids):
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS chunk_sale_id (sale_id INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM chunk_sale_id")
+        cursor.executemany("INSERT OR IGNORE INTO chunk_sale_id (sale_id) VALUES (?)",
+                           ((int(sale_id),) for sale_id in sale_ids))
+        loaded = [row[0] for row in cursor.execute(
+            "SELECT c.sale_id FROM chunk_sale_id c JOIN sale s ON s.sale_id = c.sale_id")]
+        cursor.execute("DELETE FROM chunk_sale_id")
+        sales_df = sales_df[~sales_df['sale_id'].isin(loaded)]
+    return sales_df
+
+def load_fingerprint(prepared_dir: pathlib.Path, scd2: bool, store_range: tuple | None = None) -> str:
+    """Identify a load by the content of its prepared files, so a resume only continues the same load."""
+    digest = hashlib.sha256(f"scd2={scd2}".encode("utf-8"))
+    if store_range is not None:
+        digest.update(f"stores={tuple(store_range)}".encode("utf-8"))
+    for name in PREPARED_FILES:
+        digest.update(file_sha256(prepared_dir.joinpath(name)).encode("utf-8"))
+    return digest.hexdigest()
+
+def read_checkpoint(conn: sqlite3.Connection) -> dict:
+    """Return the checkpoint of the load in a staging database (empty if there is none)."""
+    try:
+        return dict(conn.execute("SELECT key, value FROM etl_checkpoint").fetchall())
+    except sqlite3.OperationalError:
+        return {}
+
+def write_checkpoint(conn: sqlite3.Connection, **values) -> None:
+    """Record load progress; committed together with the rows it describes."""
+    conn.execute("CREATE TABLE IF NOT EXISTS etl_checkpoint (key TEXT PRIMARY KEY, value TEXT)")
+    conn.executemany("INSERT OR REPLACE INTO etl_checkpoint (key, value) VALUES (?, ?)",
+                     [(key, str(value)) for key, value in values.items()])
+
+def open_staging(db_path: pathlib.Path, load_id: str) -> tuple:
+    """
+    Open the staging database, resuming an interrupted load of the same prepared files if there is one.
+
+    Returns:
+        tuple: (writer connection, checkpoint dict)
+    """
+    staging_path = staging_path_for(db_path)
+    if staging_path.exists():
+        conn = connect_writer(staging_path)
+        checkpoint = read_checkpoint(conn)
+        if checkpoint.get("load_id") == load_id:
+            print(f"Resuming interrupted load from {staging_path} "
+                  f"(stage: {checkpoint.get('stage')}, sales rows done: {checkpoint.get('sales_rows_done', 0)}).")
+            return conn, checkpoint
+        conn.close()
+        print("Discarding staging database of a different load.")
+    print(f"Creating staging database at: {staging_path}")
+    conn = create_staging(db_path)
+    conn.execute("DROP TABLE IF EXISTS etl_checkpoint")
+    write_checkpoint(conn, load_id=load_id, stage="", sales_rows_done=0)
+    conn.commit()
+    return conn, read_checkpoint(conn)
+
+def drop_published_checkpoint(db_path: pathlib.Path) -> None:
+    """Remove the checkpoint table the publish copied into the live warehouse."""
+    conn = connect_writer(db_path)
+    try:
+        conn.execute("DROP TABLE IF EXISTS etl_checkpoint")
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"WARNING: Could not drop etl_checkpoint from {db_path}: {e}")  # Harmless; the next load replaces it
+    finally:
+        conn.close()
+
+def load_sales(prepared_dir: pathlib.Path, conn: sqlite3.Connection, rows_done: int,
+               chunk_rows: int, checkpoint_every: int, store_range: tuple | None = None) -> None:
+    """Load sales in chunks, committing a checkpoint every `checkpoint_every` chunks."""
+    print(f"DEBUG: Loading sales in chunks of {chunk_rows} rows, starting after row {rows_done}.")
+    cursor = conn.cursor()
+    reader = pd.read_csv(prepared_dir.joinpath("sales_prepared.csv"), chunksize=chunk_rows,
+                         skiprows=range(1, rows_done + 1))
+    for chunk_number, chunk in enumerate(reader, start=1):
+        sales_df = prepare_sales_chunk(chunk, cursor, store_range)
+        insert_sales(sales_df, cursor)
+        measures_df = insert_sale_measures(sales_df, cursor)
+        insert_campaign_summary(sales_df, measures_df, cursor)
+        insert_customer_activity(sales_df, measures_df, cursor)
+        rows_done += len(chunk)
+        if chunk_number % checkpoint_every == 0:
+            write_checkpoint(conn, sales_rows_done=rows_done)
+            conn.commit()
+            print(f"Checkpoint: {rows_done} sales rows loaded.")
+    write_checkpoint(conn, stage=STAGE_SALES, sales_rows_done=rows_done)
+    conn.commit()
+    print(f"All {rows_done} sales rows processed.")
+
+def load_data_to_db(
+    scd2: bool = False,
+    prepared_dir: pathlib.Path = PREPARED_DATA_DIR,
+    db_path: pathlib.Path = DB_PATH,
+    chunk_rows: int = SALES_CHUNK_ROWS,
+    checkpoint_every: int = CHECKPOINT_EVERY_CHUNKS,
+    store_range: tuple | None = None,
+) -> bool:
+    """
+    Build the next warehouse version in staging (resuming if possible) and publish it.
+
+    With a store_range (low, high), only sales of those stores are loaded (one shard).
+
+    Returns:
+        bool: True if the new version was published.
+    """
     conn = None
+    published = False
     print("DEBUG: Starting load_data_to_db function.")
     try:
-        DW_DIR.mkdir(parents=True, exist_ok=True)
-        print(f"Attempting to connect to database at: {DB_PATH}")
-        conn = sqlite3.connect(DB_PATH)
+        db_path = pathlib.Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        print(f"Loading prepared data from: {prepared_dir}")
+        load_id = load_fingerprint(prepared_dir, scd2, store_range)
+        conn, checkpoint = open_staging(db_path, load_id)
         cursor = conn.cursor()
-        print("Database connection established.")
-
-        create_schema(cursor)
-        delete_existing_records(cursor)
-
-        print(f"Loading prepared data from: {PREPARED_DATA_DIR}")
-
-        # Load and rename columns for customer data
-        customers_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("customers_prepared.csv"))
-        customers_df.rename(columns={
-            'CustomerID': 'customer_id',
-            'Name': 'name',
-            'Region': 'region',
-            'JoinDate': 'join_date',
-            'Loyalty Points': 'loyalty_points',
-            'CustomerSegment': 'customer_segment',
-            'membership_status': 'membership_status'
-        }, inplace=True)
-        customers_df.drop_duplicates(subset=['customer_id'], inplace=True)
-        print(f"DEBUG: Customers DataFrame loaded and columns renamed. Rows: {len(customers_df)}")
-
-        # Load and rename columns for product data
-        products_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("products_prepared.csv"))
-        products_df.rename(columns={
-            'productid': 'product_id',
-            'productname': 'product_name',
-            'category': 'category',
-            'unitprice': 'unit_price',
-            'stockquantity': 'stock_quantity',
-            'subcategory': 'subcategory',
-            'product_condition': 'product_condition'
-        }, inplace=True)
-        print(f"DEBUG: Products DataFrame loaded and columns renamed. Rows: {len(products_df)}")
-
-        # Load and rename columns for sales data
-        sales_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("sales_prepared.csv"))
-        sales_df.rename(columns={
-            'TransactionID': 'sale_id',
-            'SaleDate': 'sale_date',
-            'CustomerID': 'customer_id',
-            'ProductID': 'product_id',
-            'SaleAmount': 'sale_amount',
-            'StoreID': 'store_id',
-            'CampaignID': 'campaign_id',
-            'DiscountPercent': 'discount_percent',
-            'PaymentType': 'payment_type',
-            'sales_channel': 'sales_channel'
-        }, inplace=True)
-        sales_df['sale_amount'] = pd.to_numeric(sales_df['sale_amount'], errors='coerce')
-        sales_df['sale_amount'].fillna(0, inplace=True)
-        
-        print("DEBUG: Filtering sales data for foreign key integrity...")
-        initial_sales_rows = len(sales_df)
-        
-        valid_customer_ids = customers_df['customer_id'].tolist()
-        valid_product_ids = products_df['product_id'].tolist()
-
-        sales_df = sales_df[sales_df['customer_id'].isin(valid_customer_ids)]
-        sales_df = sales_df[sales_df['product_id'].isin(valid_product_ids)]
-        
-        rows_after_fk_filter = len(sales_df)
-        if initial_sales_rows != rows_after_fk_filter:
-            print(f"DEBUG: Removed {initial_sales_rows - rows_after_fk_filter} sales rows due to invalid foreign keys.")
-        else:
-            print("DEBUG: No sales rows removed due to foreign key violations.")
-
-        # --- NEW ADDITION: Drop duplicate sale_ids ---
-        sales_df.drop_duplicates(subset=['sale_id'], inplace=True)
-        # --- END NEW ADDITION ---
-
-        print(f"DEBUG: Sales DataFrame loaded and columns renamed. Rows: {len(sales_df)}")
-
-        print("Prepared data loaded into pandas DataFrames.")
-
-        insert_customers(customers_df, cursor)
-        insert_products(products_df, cursor)
-        insert_sales(sales_df, cursor)
+        stage = checkpoint.get("stage", "")
 
-        print("DEBUG: Attempting to commit changes.")
-        conn.commit()
-        print("All data loaded successfully and committed to database.")
+        if not stage:
+            create_schema(cursor)
+            delete_existing_records(cursor)
+            refresh_dimension(read_customers(prepared_dir), "customer", "customer_id", cursor, scd2=scd2)
+            refresh_dimension(read_products(prepared_dir), "product", "product_id", cursor, scd2=scd2)
+            write_checkpoint(conn, stage=STAGE_DIMENSIONS)
+            conn.commit()
+            stage = STAGE_DIMENSIONS
+
+        if stage == STAGE_DIMENSIONS:
+            load_sales(prepared_dir, conn, int(checkpoint.get("sales_rows_done", 0)), chunk_rows, checkpoint_every,
+                       store_range)
+            stage = STAGE_SALES
+
+        if stage == STAGE_SALES:
+            insert_sale_sketches(cursor)
+            refresh_customer_analytics(cursor)
+            version = bump_version(conn)
+            write_checkpoint(conn, stage=STAGE_COMPLETE)
+            conn.commit()
+            print(f"Warehouse version is now {version}.")
+
+        print("DEBUG: Attempting to publish staging database.")
+        # The checkpoint stays in staging until the publish succeeds, so a failed
+        # publish (live file locked, disk full) is retried by the next run
+        staging, conn = conn, None
+        try:
+            publish_staging(staging, db_path)
+        except Exception:
+            staging.close()  # No-op if publish_staging() closed it
+            print(f"ERROR: Publishing failed; the completed load is kept in {staging_path_for(db_path)}.")
+            raise
+        published = True
+        drop_published_checkpoint(db_path)
+        print(f"All data loaded successfully and published to {db_path}.")
 
     except FileNotFoundError as e:
-        print(f"ERROR: A required CSV file was not found. Please ensure your cleaned data files are in '{PREPARED_DATA_DIR}'.")
+        print(f"ERROR: A required CSV file was not found. Please ensure your cleaned data files are in '{prepared_dir}'.")
         print(f"Missing file: {e.filename}")
     except pd.errors.EmptyDataError:
         print(f"ERROR: One of the CSV files is empty. Please check your prepared data.")
@@ -199,14 +530,87 @@ def load_data_to_db() -> None:
         print(f"AN UNEXPECTED ERROR OCCURRED DURING ETL PROCESS: {e}")
         if conn:
             conn.rollback()
-            print("Transaction rolled back due to error.")
+            print("Uncommitted work rolled back; the live warehouse is unchanged.")
+            print(f"Rerun the load to resume from the last checkpoint in {staging_path_for(db_path)}.")
     finally:
         if conn:
             conn.close()
             print("Database connection closed.")
         print("DEBUG: Exiting load_data_to_db function.")
+    return published
+
+def count_sales_by_store(prepared_dir: pathlib.Path, chunk_rows: int = SALES_CHUNK_ROWS) -> dict:
+    """Count prepared sales rows per store id (rows without a numeric store id are not counted)."""
+    counts = pd.Series(dtype="int64")
+    for chunk in pd.read_csv(prepared_dir.joinpath("sales_prepared.csv"), usecols=['StoreID'], chunksize=chunk_rows):
+        stores = pd.to_numeric(chunk['StoreID'], errors='coerce').dropna().astype("int64")
+        counts = counts.add(stores.value_counts(), fill_value=0)
+    return {int(store): int(count) for store, count in counts.items()}
+
+def load_sharded(
+    shard_count: int,
+    scd2: bool = False,
+    prepared_dir: pathlib.Path = PREPARED_DATA_DIR,
+    db_path: pathlib.Path = DB_PATH,
+    chunk_rows: int = SALES_CHUNK_ROWS,
+    checkpoint_every: int = CHECKPOINT_EVERY_CHUNKS,
+    workers: int | None = None,
+) -> bool:
+    """
+    Load the warehouse as store_id range shards, one loader process per shard.
+    smart_sales.db itself is not updated; readers that only use that file
+    refuse to run while the shard manifest exists (see utils/shards.py).
+
+    Returns:
+        bool: True if every shard was published and the shard manifest written.
+    """
+    db_path = pathlib.Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        ranges = plan_store_ranges(count_sales_by_store(prepared_dir, chunk_rows), shard_count)
+    except FileNotFoundError as e:
+        print(f"ERROR: A required CSV file was not found: {e.filename}")
+        return False
+    paths = [shard_path_for(db_path, i) for i in range(len(ranges))]
+    print(f"DEBUG: Loading {len(ranges)} shards: {[tuple(r) for r in ranges]}")
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers or len(ranges)) as pool:
+        futures = [
+            pool.submit(load_data_to_db, scd2, prepared_dir, path, chunk_rows, checkpoint_every, tuple(store_range))
+            for path, store_range in zip(paths, ranges)
+        ]
+        published = [future.result() for future in futures]
+
+    failed = [path.name for path, ok in zip(paths, published) if not ok]
+    if failed:
+        print(f"ERROR: Shards not published: {', '.join(failed)}. Rerun the load to resume them.")
+        return False
+    write_shard_manifest(db_path, paths, ranges)
+    remove_shards(db_path, keep=paths)
+    print(f"Shard manifest written; {len(paths)} shards published.")
+    return True
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse command-line options and run the load."""
+    parser = argparse.ArgumentParser(description="Load prepared data into the data warehouse.")
+    parser.add_argument("--scd2", action="store_true", help="Keep type-2 history of customer and product changes")
+    parser.add_argument("--chunk-rows", type=int, default=SALES_CHUNK_ROWS, help="Sales rows per chunk")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY_CHUNKS,
+                        help="Commit a resumable checkpoint after this many chunks")
+    parser.add_argument("--shards", type=int, default=1, help="Split sales by store_id range into this many shard warehouses")
+    parser.add_argument("--workers", type=int, default=None, help="Shard loader processes (default: one per shard)")
+    args = parser.parse_args(argv)
+    if args.shards > 1:
+        loaded = load_sharded(args.shards, scd2=args.scd2, chunk_rows=args.chunk_rows,
+                              checkpoint_every=args.checkpoint_every, workers=args.workers)
+    else:
+        loaded = load_data_to_db(scd2=args.scd2, chunk_rows=args.chunk_rows, checkpoint_every=args.checkpoint_every)
+        if loaded:
+            remove_shards(DB_PATH)
+    if not loaded:
+        sys.exit(1)
 
 if __name__ == "__main__":
     print("DEBUG: Script started from main entry point.")
-    load_data_to_db()
+    main()
     print("DEBUG: Script finished.")
\ No newline at end of file
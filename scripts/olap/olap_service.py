@@ -0,0 +1,348 @@
+"""
+scripts/olap/olap_service.py
+
+Lightweight asyncio HTTP service that serves the OLAP aggregates from the
+smart_sales.db data warehouse on demand.
+
+BI consumers can request the same aggregates that data_prep.py writes to
+data/processed/, with filters, instead of reading static CSVs:
+
+    GET /health
+    GET /aggregates
+    GET /aggregates/profit?year=2025&quarter=2&region=East
+    GET /aggregates/channel_share?category=Electronics
+    GET /aggregates/yoy_growth?region=West
+    GET /aggregates/segment_weekday?segment=Regular
+    GET /aggregates/campaign_lift?store=402&year=2025
+    GET /aggregates/discount_bands?channel=Online&campaign=2
+    GET /aggregates/rfm_segments?segment=VIP
+    GET /aggregates/cohort_retention
+
+SQLite queries run on a thread pool over read-only pooled connections
+(utils/warehouse.py). Results are cached in memory and the cache is cleared
+whenever the ETL bumps the warehouse version stamp on commit. The cache is an
+LRU bounded by the total size of the cached responses (--cache-mb), since
+clients choose the filter combinations it is keyed by.
+
+If the warehouse was loaded as store shards (utils/shards.py), each query
+fans out to every shard and the partial aggregates are merged before they
+are returned; responses look the same as for a single warehouse file. The
+shard manifest is read at startup, so restart the service after changing
+the number of shards.
+
+The service binds to 127.0.0.1 by default and is meant for local use only.
+
+Usage:
+    py scripts/olap/olap_service.py --port 8765
+"""
+
+#####################################
+# Import Modules at the Top
+#####################################
+
+# Import from Python Standard Library
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import json
+import pathlib
+import sqlite3
+import sys
+import urllib.parse
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Ensure project root is in sys.path for local imports (2 parents up from scripts/olap)
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent.parent))
+
+# Import local modules
+from utils.logger import logger
+from utils.olap_queries import AGGREGATES, run_aggregate
+from utils.shards import ShardedWarehouse, read_shard_manifest
+from utils.warehouse import DB_PATH, DEFAULT_POOL_SIZE, ConnectionPool, read_version
+
+# Constants
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+VERSION_POLL_SECONDS = 1.0
+DEFAULT_CACHE_LIMIT_MB = 64
+MAX_HEADER_LINES = 100
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+#####################################
+# Define the Service
+#####################################
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class ResponseCache:
+    """LRU of response bodies, bounded by their total size in bytes."""
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self.size_bytes = 0
+        self._bodies: "collections.OrderedDict[CacheKey, bytes]" = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+        return body
+
+    def put(self, key: CacheKey, body: bytes) -> None:
+        if len(body) > self.limit_bytes:
+            return  # Larger than the whole cache: serve it uncached
+        if key in self._bodies:
+            self.size_bytes -= len(self._bodies.pop(key))
+        self._bodies[key] = body
+        self.size_bytes += len(body)
+        while self.size_bytes > self.limit_bytes:
+            _, evicted = self._bodies.popitem(last=False)
+            self.size_bytes -= len(evicted)
+
+    def clear(self) -> None:
+        self._bodies.clear()
+        self.size_bytes = 0
+
+
+class OlapService:
+    """Serve named OLAP aggregates over HTTP with a version-aware result cache."""
+
+    def __init__(
+        self,
+        db_path: pathlib.Path = DB_PATH,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: int = DEFAULT_POOL_SIZE,
+        poll_interval: float = VERSION_POLL_SECONDS,
+        cache_limit_bytes: int = DEFAULT_CACHE_LIMIT_MB * 1024 * 1024,
+    ):
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        manifest = read_shard_manifest(db_path)
+        self.shards = ShardedWarehouse(manifest, pool_size=workers) if manifest else None
+        self.pool = None if self.shards else ConnectionPool(db_path, max_size=workers)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="olap-query")
+        self.version = 0
+        self.cache = ResponseCache(cache_limit_bytes)
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._poller: Optional[asyncio.Task] = None
+
+    async def start(self) -> int:
+        """Start listening and return the bound port (useful when port=0)."""
+        self.version = await self._run_query(self._read_version)
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._poller = asyncio.create_task(self._watch_version())
+        logger.info(f"OLAP service listening on http://{self.host}:{self.port} (warehouse version {self.version})")
+        return self.port
+
+    async def close(self) -> None:
+        """Stop the server, the version poller and the query threads."""
+        if self._poller:
+            self._poller.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=True)
+        if self.shards:
+            self.shards.close()
+        else:
+            self.pool.close()
+
+    async def refresh_version(self) -> bool:
+        """Re-read the warehouse version; clear the cache and return True if it changed."""
+        version = await self._run_query(self._read_version)
+        if version == self.version:
+            return False
+        logger.info(f"Warehouse version changed {self.version} -> {version}; clearing {len(self.cache)} cached results.")
+        self.version = version
+        self.cache.clear()
+        return True
+
+    async def _watch_version(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh_version()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read warehouse version: {e}")
+
+    def _with_connection(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self.pool.connection() as conn:
+            return func(conn, *args)
+
+    def _read_version(self) -> int:
+        if self.shards:
+            return self.shards.read_version()
+        return self._with_connection(read_version)
+
+    def _aggregate(self, name: str, filters: Dict[str, str]) -> List[Dict[str, Any]]:
+        if self.shards:
+            return self.shards.run_aggregate(name, filters)
+        return self._with_connection(run_aggregate, name, filters)
+
+    async def _run_query(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def get_aggregate(self, name: str, filters: Dict[str, str]) -> bytes:
+        """Return the JSON body for an aggregate, from cache when possible."""
+        key = (name, tuple(sorted(filters.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Concurrent requests for the same uncached result share one query
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        version = self.version
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            rows = await self._run_query(self._aggregate, name, filters)
+            body = json.dumps({"aggregate": name, "filters": filters, "version": version, "rows": rows}).encode("utf-8")
+            if version == self.version:
+                self.cache.put(key, body)
+            future.set_result(body)
+            return body
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved so failures without waiters are not logged
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._in_flight[key]
+
+    async def _dispatch(self, method: str, target: str) -> Tuple[int, bytes]:
+        if method != "GET":
+            return 405, _error_body("Only GET is supported.")
+        url = urllib.parse.urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        if path == "/health":
+            return 200, json.dumps({"status": "ok", "version": self.version}).encode("utf-8")
+        if path == "/aggregates":
+            listing = {name: {"description": agg["description"], "filters": agg["filters"]} for name, agg in AGGREGATES.items()}
+            return 200, json.dumps(listing).encode("utf-8")
+        if path.startswith("/aggregates/"):
+            name = path[len("/aggregates/"):]
+            if name not in AGGREGATES:
+                return 404, _error_body(f"Unknown aggregate '{name}'.")
+            filters = dict(urllib.parse.parse_qsl(url.query))
+            try:
+                return 200, await self.get_aggregate(name, filters)
+            except ValueError as e:
+                return 400, _error_body(str(e))
+            except sqlite3.Error as e:
+                logger.error(f"Query failed for aggregate '{name}': {e}")
+                return 500, _error_body("Warehouse query failed.")
+            except Exception:
+                logger.exception(f"Unexpected error serving aggregate '{name}'.")
+                return 500, _error_body("Internal error.")
+        return 404, _error_body(f"No route for '{path}'.")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection, honoring keep-alive."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                parts = request_line.decode("latin-1").split()
+                headers = await _read_headers(reader)
+                if len(parts) != 3 or headers is None:
+                    await _write_response(writer, 400, _error_body("Malformed request."), keep_alive=False)
+                    break
+                method, target, http_version = parts
+                content_length = int(headers.get("content-length", "0") or 0)
+                if content_length:
+                    await reader.readexactly(content_length)
+
+                connection_header = headers.get("connection", "").lower()
+                keep_alive = connection_header != "close" if http_version == "HTTP/1.1" else connection_header == "keep-alive"
+
+                status, body = await self._dispatch(method, target)
+                await _write_response(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+#####################################
+# Define Functions - HTTP helpers
+#####################################
+
+async def _read_headers(reader: asyncio.StreamReader) -> Optional[Dict[str, str]]:
+    """Read header lines up to the blank line; None if there are too many."""
+    headers: Dict[str, str] = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return None
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, body: bytes, keep_alive: bool) -> None:
+    head = (
+        f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Unknown')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+def _error_body(message: str) -> bytes:
+    return json.dumps({"error": message}).encode("utf-8")
+
+#####################################
+# Define Main Function - The main entry point of the script
+#####################################
+
+async def serve(db_path: pathlib.Path, host: str, port: int, workers: int,
+                cache_mb: int = DEFAULT_CACHE_LIMIT_MB) -> None:
+    """Run the service until cancelled."""
+    service = OlapService(db_path=db_path, host=host, port=port, workers=workers,
+                          cache_limit_bytes=cache_mb * 1024 * 1024)
+    await service.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parse arguments and run the OLAP service."""
+    parser = argparse.ArgumentParser(description="Serve OLAP aggregates from the smart_sales data warehouse.")
+    parser.add_argument("--db", type=pathlib.Path, default=DB_PATH, help="Path to the warehouse database.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to bind (default: localhost only).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_POOL_SIZE, help="Query threads and pooled connections.")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_LIMIT_MB,
+                        help="Memory limit of the response cache (MiB).")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, args.workers, args.cache_mb))
+    except KeyboardInterrupt:
+        logger.info("OLAP service stopped.")
+
+
+if __name__ == "__main__":
+    main()
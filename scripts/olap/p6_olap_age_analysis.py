@@ -8,34 +8,54 @@
 # =========================================
 # 1. SETUP & IMPORTS
 # =========================================
-import sqlite3
+import pathlib
+import sys
+
+import matplotlib
 import pandas as pd
+
+# Render headlessly (Agg) unless the chart window is requested with --show
+SHOW_CHART = "--show" in sys.argv[1:]
+if not SHOW_CHART:
+    matplotlib.use("Agg")
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+# Ensure project root is in sys.path for local imports (2 parents up from scripts/olap)
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from utils.fact_query import read_fact_frame
+from utils.query_cache import QueryCache
+from utils.shards import require_single_warehouse
+from utils.warehouse import DB_PATH, get_reader_pool
+
+# Query results are reused across runs until the ETL bumps the warehouse version
+QUERY_CACHE_DIR = PROJECT_ROOT / "data" / "cache" / "query_results"
+CHART_PATH = PROJECT_ROOT / "data" / "reports" / "charts" / "p6_regular_sales_by_weekday.png"
+
 # =========================================
 # 2. DATA LOADING
 # =========================================
-print("Connecting to database...")
-# The path navigates up two directories from 'scripts/olap' to the project root
-conn = sqlite3.connect("C:/Repos/project1/smart-store-purna/data/dw/smart_sales.db")
-
-# SQL query to join the necessary tables
-# Corrected SQL Query
-query = """
-SELECT
-    s.sale_date,
-    s.sale_amount,
-    p.category,
-    c.customer_segment
-FROM sale s
-JOIN customer c ON s.customer_id = c.customer_id
-JOIN product p ON s.product_id = p.product_id;
-"""
+print(f"Connecting to database at {DB_PATH}...")
+try:
+    require_single_warehouse(DB_PATH)
+except RuntimeError as e:
+    print(f"Error: {e}")
+    sys.exit(1)
+
+# Only the columns the analysis uses are read. The segment slice and the
+# parseable-date check run in SQL (see utils/fact_query.py), so the product
+# table is not joined and rows outside the slice are never transferred.
+TARGET_SEGMENT = 'Regular'
+columns = ['sale_date', 'sale_amount', 'segment']
+filters = {'segment': TARGET_SEGMENT, 'dated': True}
 
 print("Loading and joining data...")
-df = pd.read_sql_query(query, conn)
-conn.close()
+query_cache = QueryCache(disk_dir=QUERY_CACHE_DIR)
+with get_reader_pool().connection() as conn:
+    df = read_fact_frame(conn, columns, filters, cache=query_cache)
+print(f"Query cache stats: {query_cache.stats()}")
 
 # Validate by printing the first few rows
 print("Data loaded successfully. Here are the first 5 rows:")
@@ -62,8 +82,8 @@ df['day_of_week'] = df['sale_date'].dt.day_name()
 # Create 'day_of_week' column from the correct date column
 df['day_of_week'] = df['sale_date'].dt.day_name()
 
-# Rename the 'customer_segment' column to 'age_segment' so the rest of the script works without changes
-df.rename(columns={'customer_segment': 'age_segment'}, inplace=True)
+# Rename the 'segment' column to 'age_segment' so the rest of the script works without changes
+df.rename(columns={'segment': 'age_segment'}, inplace=True)
 
 # Validate the new columns
 print("Data transformed. Here are the first 5 rows with new columns:")
@@ -90,8 +110,9 @@ print(df.head())
 print("\nPerforming OLAP analysis...")
 # SLICE: Filter the DataFrame to get a slice for a specific customer segment.
 # Let's assume 'Regular' is a key segment we want to analyze.
-# You can change 'Regular' to 'New' or 'Loyal' if those exist in your data.
-target_segment_slice = df[df['age_segment'] == 'Regular'].copy()
+# Change TARGET_SEGMENT above to 'VIP' (or another segment in your data) to analyze a different slice.
+# The SQL filter already matched the segment case-insensitively; keep the exact label here.
+target_segment_slice = df[df['age_segment'] == TARGET_SEGMENT].copy()
 print(f"Sliced data for '{target_segment_slice['age_segment'].iloc[0]}' segment. Found {len(target_segment_slice)} sales records.")
 
 # DICE: On that slice, group by 'day_of_week' to find their busiest shopping days
@@ -119,7 +140,11 @@ plt.ylabel('Total Sales ($)', fontsize=12)
 plt.xticks(rotation=45)
 plt.tight_layout() # Adjusts plot to ensure everything fits without overlapping
 
-# This command will display the chart in a new window
-plt.show()
+# Save the chart; only open a window when run with --show
+CHART_PATH.parent.mkdir(parents=True, exist_ok=True)
+plt.savefig(CHART_PATH)
+print(f"Chart saved to {CHART_PATH}")
+if SHOW_CHART:
+    plt.show()
 
 print("\n--- Script Finished ---")
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+scripts/olap/render_report.py
+
+Render the OLAP report charts headlessly from warehouse aggregates.
+
+Every chart in utils/charts.py is drawn from its pre-aggregated warehouse
+result, never from raw sales rows. The charts that need drawing are rendered
+in parallel in a process pool. A chart is skipped when the hash of its input
+rows matches the hash recorded when its PNG was last written
+(render_cache.json), so a nightly run only redraws the charts whose data changed.
+
+Usage:
+    py scripts/olap/render_report.py [--output-dir data/reports/charts] [--workers 4] [--force]
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import pathlib
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Ensure project root is in sys.path for local imports (2 parents up from scripts/olap)
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.charts import CHARTS, Rows, chart_input_hash, render_chart
+from utils.logger import logger
+from utils.olap_queries import run_aggregate
+from utils.shards import ShardedWarehouse, read_shard_manifest
+from utils.warehouse import DB_PATH, get_reader_pool
+
+CHART_DIR: pathlib.Path = PROJECT_ROOT / "data" / "reports" / "charts"
+RENDER_CACHE_FILE = "render_cache.json"
+
+
+def load_chart_inputs(db_path: pathlib.Path = DB_PATH) -> Dict[str, Rows]:
+    """Fetch the aggregate rows behind every chart (merged across shards if the warehouse is sharded)."""
+    manifest = read_shard_manifest(db_path)
+    if manifest:
+        with ShardedWarehouse(manifest) as warehouse:
+            return {name: warehouse.run_aggregate(chart["aggregate"], {}) for name, chart in CHARTS.items()}
+    with get_reader_pool(db_path).connection() as conn:
+        return {name: run_aggregate(conn, chart["aggregate"], {}) for name, chart in CHARTS.items()}
+
+
+def load_render_cache(output_dir: pathlib.Path) -> Dict[str, str]:
+    """Return chart name -> input hash of the PNG currently on disk."""
+    path = output_dir / RENDER_CACHE_FILE
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
+
+def plan_renders(chart_inputs: Dict[str, Rows], output_dir: pathlib.Path, force: bool = False) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Decide which charts must be drawn.
+
+    Returns:
+        tuple: (chart name -> current input hash, names of charts to render)
+    """
+    cache = load_render_cache(output_dir)
+    hashes = {name: chart_input_hash(name, rows) for name, rows in chart_inputs.items()}
+    stale = [
+        name for name, digest in hashes.items()
+        if force or cache.get(name) != digest or not (output_dir / f"{name}.png").exists()
+    ]
+    return hashes, stale
+
+
+def render_report(
+    chart_inputs: Dict[str, Rows],
+    output_dir: pathlib.Path = CHART_DIR,
+    max_workers: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, str]:
+    """
+    Render the stale charts in a process pool and record their input hashes.
+
+    Args:
+        chart_inputs (dict): Chart name -> aggregate rows.
+        output_dir (Path): Where PNGs and render_cache.json are written.
+        max_workers (int, optional): Worker processes; defaults to one per stale chart, up to the CPU count.
+        force (bool): Redraw every chart.
+
+    Returns:
+        dict: Chart name -> "rendered", "cached" or "failed".
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    hashes, stale = plan_renders(chart_inputs, output_dir, force)
+    cache = load_render_cache(output_dir)
+    status = {name: "cached" for name in hashes if name not in stale}
+
+    if stale:
+        workers = max_workers or min(len(stale), os.cpu_count() or 1)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(render_chart, name, chart_inputs[name], str(output_dir / f"{name}.png")): name
+                for name in stale
+            }
+            for future in concurrent.futures.as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                    cache[name] = hashes[name]
+                    status[name] = "rendered"
+                except Exception as e:
+                    logger.error(f"Rendering chart '{name}' failed: {e}")
+                    cache.pop(name, None)
+                    status[name] = "failed"
+
+    tmp_path = output_dir / (RENDER_CACHE_FILE + ".tmp")
+    tmp_path.write_text(json.dumps(cache, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, output_dir / RENDER_CACHE_FILE)
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Render every report chart whose input changed since the last run."""
+    parser = argparse.ArgumentParser(description="Render OLAP report charts headlessly.")
+    parser.add_argument("--db", type=pathlib.Path, default=DB_PATH, help="Path to the warehouse database.")
+    parser.add_argument("--output-dir", type=pathlib.Path, default=CHART_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Rendering processes.")
+    parser.add_argument("--force", action="store_true", help="Redraw every chart even if its data is unchanged.")
+    args = parser.parse_args(argv)
+
+    status = render_report(load_chart_inputs(args.db), args.output_dir, args.workers, args.force)
+    for name, state in sorted(status.items()):
+        logger.info(f"Chart {name}: {state}")
+    logger.info(f"Report charts are in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,14 +11,12 @@ File: scripts/data_prep.py
 import pathlib
 import sys
 
-# Import from external packages
-import pandas as pd
-
 # Ensure project root is in sys.path for local imports
 sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
 
 # Import local modules (e.g. utils/logger.py)
 from utils.logger import logger
+from utils.ingest import read_raw_data
 
 # Constants
 SCRIPTS_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent  # Directory of the current script
@@ -34,24 +32,9 @@ RAW_DATA_DIR.mkdir(exist_ok=True)
 # Define Functions - Reusable blocks of code / instructions
 #####################################
 
-def read_raw_data(file_name: str) -> pd.DataFrame:
-    """Define a function to read raw data from CSV,
-    given the name of the file as a string. 
-    We will look for it in the data/raw directory."""
-    file_path: pathlib.Path = RAW_DATA_DIR.joinpath(file_name)
-    try:
-        logger.info(f"READING: {file_path}.")
-        return pd.read_csv(file_path)
-    except FileNotFoundError:
-        logger.error(f"File not found: {file_path}")
-        return pd.DataFrame()  # Return an empty DataFrame if the file is not found
-    except Exception as e:
-        logger.error(f"Error reading {file_path}: {e}")
-        return pd.DataFrame()  # Return an empty DataFrame if any other error occurs
-
 def process_data(file_name: str) -> None:
     """Define a function to process raw data by reading it into a pandas DataFrame object."""
-    df = read_raw_data(file_name)
+    df = read_raw_data(file_name, RAW_DATA_DIR)
     if df.empty:
         logger.warning(f"No data to process for {file_name}.")
         return
@@ -0,0 +1,103 @@
+"""
+smart_store.py
+
+Single command-line entry point for the smart store pipeline.
+
+Usage:
+    py smart_store.py prepare [customers products sales]
+    py smart_store.py aggregate [--start 2025-04-01 --end 2025-06-30 --batch-id 2025-06-01 --memory-budget-mb 512]
+    py smart_store.py load [--scd2 --shards 4]
+    py smart_store.py olap serve [--port 8765]
+    py smart_store.py olap report [--show]
+    py smart_store.py report [--force --workers 4]
+    py smart_store.py inspect [--schema --maintain --every-hours 24]
+    py smart_store.py count
+
+Each subcommand imports its script only when it runs, so pandas, matplotlib
+and seaborn are loaded only by the subcommands that use them. `count` and
+`inspect` start without any of them. tests/test_import_time.py guards this
+with `python -X importtime`.
+"""
+
+import argparse
+import pathlib
+import sys
+from typing import Callable, Dict, List, Optional
+
+PROJECT_ROOT: pathlib.Path = pathlib.Path(__file__).resolve().parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+
+def run_prepare(args: List[str]) -> None:
+    from scripts.data_preparation.prepare_data import main
+    main(args)
+
+
+def run_aggregate(args: List[str]) -> None:
+    from scripts.data_prep import main
+    main(args)
+
+
+def run_load(args: List[str]) -> None:
+    from scripts.etl_to_dw import main
+    main(args)
+
+
+def run_olap(args: List[str]) -> None:
+    if args[:1] == ["report"]:
+        import runpy
+        runpy.run_path(str(PROJECT_ROOT / "scripts" / "olap" / "p6_olap_age_analysis.py"), run_name="__main__")
+        return
+    from scripts.olap.olap_service import main
+    main(args[1:] if args[:1] == ["serve"] else args)
+
+
+def run_report(args: List[str]) -> None:
+    from scripts.olap.render_report import main
+    main(args)
+
+
+def run_inspect(args: List[str]) -> None:
+    from inspect_db import main
+    main(args)
+
+
+def run_count(args: List[str]) -> None:
+    from scripts.counts_raw_prepare_data import main
+    main()
+
+
+COMMANDS: Dict[str, Callable[[List[str]], None]] = {
+    "prepare": run_prepare,
+    "aggregate": run_aggregate,
+    "load": run_load,
+    "olap": run_olap,
+    "report": run_report,
+    "inspect": run_inspect,
+    "count": run_count,
+}
+
+COMMAND_HELP: Dict[str, str] = {
+    "prepare": "Clean raw CSVs into data/prepared (optionally only the named tables).",
+    "aggregate": "Merge prepared data and write BI aggregates to data/processed.",
+    "load": "Load prepared data into the SQLite data warehouse.",
+    "olap": "Serve OLAP aggregates over HTTP ('serve', default) or run the P6 report ('report').",
+    "report": "Render the OLAP report charts headlessly (only charts whose data changed).",
+    "inspect": "Report warehouse sizes and hot query plans; --maintain runs ANALYZE / VACUUM / optimize.",
+    "count": "Compare raw and prepared record counts.",
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Dispatch to the subcommand; everything after its name is passed through to it."""
+    parser = argparse.ArgumentParser(prog="smart-store", description="Smart store BI pipeline.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in COMMAND_HELP.items():
+        subparsers.add_parser(name, help=help_text, add_help=False)  # The subcommand parses its own options
+    parsed, rest = parser.parse_known_args(argv)
+    COMMANDS[parsed.command](rest)
+
+
+if __name__ == "__main__":
+    main()
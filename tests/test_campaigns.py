@@ -0,0 +1,89 @@
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from scripts import etl_to_dw
+from tests.test_etl_load import write_prepared
+from utils.campaigns import SUMMARY_KEYS, discount_floor, rebuild_campaign_summary
+from utils.olap_queries import merge_aggregate_rows, run_aggregate
+from utils.warehouse import connect_writer
+
+
+class TestCampaignSummary(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        self.prepared = self.tmp / 'prepared'
+        self.prepared.mkdir()
+        write_prepared(self.prepared, sale_count=30)
+        sales = pd.read_csv(self.prepared / 'sales_prepared.csv')
+        sales['StoreID'] = [401 + i % 2 for i in range(30)]
+        sales['CampaignID'] = [float(i % 3) for i in range(30)]
+        sales['DiscountPercent'] = [[0, 5, 12, 25][i % 4] for i in range(30)]
+        sales['sales_channel'] = ['Online', None, 'Retail'] * 10
+        sales.loc[3, 'CampaignID'] = None
+        sales.loc[4, 'DiscountPercent'] = None
+        sales.loc[7, 'SaleDate'] = 'not a date'
+        duplicate = sales.iloc[[0]].assign(SaleAmount=9999.0)  # Same sale id in a later chunk: first one wins
+        pd.concat([sales, duplicate]).to_csv(self.prepared / 'sales_prepared.csv', index=False)
+        self.db_path = self.tmp / 'smart_sales.db'
+        self.assertTrue(etl_to_dw.load_data_to_db(prepared_dir=self.prepared, db_path=self.db_path, chunk_rows=4))
+        self.conn = connect_writer(self.db_path)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def summary(self):
+        return pd.read_sql_query(f"SELECT * FROM campaign_summary ORDER BY {', '.join(SUMMARY_KEYS)}", self.conn)
+
+    def test_discount_bands(self):
+        floors = discount_floor(pd.Series([0, 4.99, 5, 14, 15, 20, 80, -3, None, 'x']))
+        self.assertListEqual(floors.tolist(), [0, 0, 5, 10, 15, 20, 20, 0, -1, -1])
+
+    def test_incremental_rollup_matches_rebuild(self):
+        incremental = self.summary()
+        self.assertEqual(incremental['sale_count'].sum(), 30)
+        self.assertAlmostEqual(incremental['total_revenue'].sum(), sum(100.0 + i for i in range(30)))
+        self.assertIn(-1, incremental['campaign_id'].tolist())
+        self.assertIn(0, incremental['sale_year'].tolist())
+        rebuild_campaign_summary(self.conn)
+        pd.testing.assert_frame_equal(incremental, self.summary(), check_dtype=False)
+
+    def test_lift_against_no_campaign_sales(self):
+        rows = run_aggregate(self.conn, 'campaign_lift', {'store': 401, 'channel': 'online'})
+        fact = pd.read_sql_query("SELECT campaign_id, total_revenue FROM sale_fact "
+                                 "WHERE store_id = 401 AND sales_channel = 'Online'", self.conn)
+        per_sale = fact.fillna({'campaign_id': -1}).groupby('campaign_id')['total_revenue'].mean()
+        self.assertListEqual([row['campaign_id'] for row in rows], sorted(per_sale.index.astype(int)))
+        for row in rows:
+            expected = (per_sale[row['campaign_id']] / per_sale[0] - 1) * 100
+            self.assertAlmostEqual(row['lift_percent'], expected, places=9)
+            self.assertAlmostEqual(row['margin_percent'], 30.0, places=9)
+        baseline = [row for row in rows if row['campaign_id'] == 0][0]
+        self.assertAlmostEqual(baseline['lift_percent'], 0.0, places=9)
+
+    def test_discount_band_lift_and_merge(self):
+        rows = run_aggregate(self.conn, 'discount_bands', {'campaign': 1})
+        self.assertTrue(all(row['discount_floor'] in (-1, 0, 5, 10, 20) for row in rows))
+        for row in rows:
+            if row['discount_floor'] >= 0 and row['discount_amount']:
+                self.assertGreater(row['gross_amount'], row['total_revenue'])
+        # Splitting the cells in two and merging them back gives the same rows
+        halves = [[dict(row, sale_count=row['sale_count'] / 2, total_revenue=row['total_revenue'] / 2,
+                        gross_amount=row['gross_amount'] / 2, discount_amount=row['discount_amount'] / 2,
+                        total_profit=row['total_profit'] / 2) for row in rows]] * 2
+        merged = merge_aggregate_rows('discount_bands', halves)
+        for got, want in zip(merged, rows):
+            for column, value in want.items():
+                if value is None or isinstance(value, str):
+                    self.assertEqual(got[column], value)
+                else:
+                    self.assertAlmostEqual(got[column], value, places=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import sqlite3
+import unittest
+
+import pandas as pd
+
+from utils.cdc import apply_dimension_snapshot, detect_changes, load_hash_index, row_hashes
+
+
+def customers(points):
+    return pd.DataFrame({
+        'customer_id': list(range(1, len(points) + 1)),
+        'name': [f'C{i}' for i in range(1, len(points) + 1)],
+        'loyalty_points': points,
+    })
+
+
+class TestCdc(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('CREATE TABLE customer (customer_id INTEGER PRIMARY KEY, name TEXT, loyalty_points INTEGER)')
+
+    def tearDown(self):
+        self.conn.close()
+
+    def table(self):
+        return pd.read_sql_query('SELECT * FROM customer ORDER BY customer_id', self.conn)
+
+    def test_detect_changes(self):
+        previous = row_hashes(customers([10, 20, 30]), 'customer_id')
+        snapshot = customers([10, 25, 30, 40]).drop(index=0)
+        changes = detect_changes(snapshot, 'customer_id', previous)
+        self.assertEqual(changes.summary(), {'inserts': 1, 'updates': 1, 'deletes': 1})
+        self.assertListEqual(changes.updates['customer_id'].tolist(), [2])
+        self.assertListEqual(changes.deletes, [1])
+        self.assertTrue(detect_changes(customers([10, 20, 30]), 'customer_id', previous).is_empty())
+        with self.assertRaises(ValueError):
+            detect_changes(pd.concat([snapshot, snapshot]), 'customer_id', previous)
+
+    def test_first_load_replaces_full_load_rows(self):
+        self.conn.execute("INSERT INTO customer VALUES (99, 'Old', 1)")
+        changes = apply_dimension_snapshot(self.conn, 'customer', 'customer_id', customers([10, 20]))
+        self.assertEqual(changes.summary()['inserts'], 2)
+        self.assertListEqual(self.table()['customer_id'].tolist(), [1, 2])
+        self.assertEqual(len(load_hash_index(self.conn, 'customer')), 2)
+
+    def test_apply_deltas_with_scd2_history(self):
+        apply_dimension_snapshot(self.conn, 'customer', 'customer_id', customers([10, 20, 30]), scd2=True, as_of='2025-05-01')
+        snapshot = customers([10, 25, 30]).drop(index=2)
+        changes = apply_dimension_snapshot(self.conn, 'customer', 'customer_id', snapshot, scd2=True, as_of='2025-05-02')
+        self.assertEqual(changes.summary(), {'inserts': 0, 'updates': 1, 'deletes': 1})
+        pd.testing.assert_frame_equal(self.table(), snapshot.reset_index(drop=True))
+        history = pd.read_sql_query(
+            'SELECT customer_id, loyalty_points, valid_from, valid_to, is_current FROM customer_history ORDER BY version_id',
+            self.conn)
+        self.assertListEqual(history['is_current'].tolist(), [1, 0, 0, 1])
+        self.assertListEqual(history[history['customer_id'] == 2]['valid_to'].tolist(), ['2025-05-02', None])
+        self.assertEqual(history['loyalty_points'].iloc[-1], 25)
+        unchanged = apply_dimension_snapshot(self.conn, 'customer', 'customer_id', snapshot, scd2=True)
+        self.assertTrue(unchanged.is_empty())
+
+    def test_first_scd2_load_seeds_history_for_current_rows(self):
+        apply_dimension_snapshot(self.conn, 'customer', 'customer_id', customers([10, 20, 30]), as_of='2025-05-01')
+        apply_dimension_snapshot(self.conn, 'customer', 'customer_id', customers([10, 25, 30]), scd2=True, as_of='2025-05-02')
+        query = 'SELECT customer_id, loyalty_points, valid_from, valid_to, is_current FROM customer_history ORDER BY version_id'
+        history = pd.read_sql_query(query, self.conn)
+        self.assertListEqual(history['customer_id'].tolist(), [1, 2, 3])
+        self.assertListEqual(history['loyalty_points'].tolist(), [10, 25, 30])
+        self.assertListEqual(history['is_current'].tolist(), [1, 1, 1])
+        apply_dimension_snapshot(self.conn, 'customer', 'customer_id', customers([15, 25, 30]), scd2=True, as_of='2025-05-03')
+        history = pd.read_sql_query(query, self.conn)
+        self.assertListEqual(history[history['customer_id'] == 1]['valid_to'].tolist(), ['2025-05-03', None])
+        self.assertEqual(int(history['is_current'].sum()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
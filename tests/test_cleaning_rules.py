@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.cleaning_rules import TABLE_RULES, compile_rules
+
+
+class TestCleaningRules(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = {
+            "column_names": "snake",
+            "types": {"amount": "numeric"},
+            "key_columns": ["id"],
+            "required": ["id", "amount"],
+            "fill": {"channel": "Unknown", "points": "median"},
+            "ranges": {"amount": (0, 100)},
+            "allowed_values": {"segment": ["A", "B"]},
+            "casing": {"channel": "title"},
+        }
+        self.df = pd.DataFrame({
+            ' ID ': [1, 1, 2, 3, 4, 5, 6],
+            'Amount': ['10', '10', '?', '50', '500', '20', '30'],
+            'Channel': [' online', ' online', 'RETAIL', None, 'mobile', 'retail', 'Online'],
+            'Points': [1.0, 1.0, 2.0, np.nan, 5.0, 3.0, 7.0],
+            'Segment': ['A', 'A', 'B', 'B', 'A', 'C', 'A'],
+        })
+
+    def test_plan_order(self):
+        plan = compile_rules(self.rules)
+        self.assertListEqual(plan.describe(), [
+            'column_names:snake', 'types', 'deduplicate', 'fill', 'validate', 'casing'])
+
+    def test_run_plan(self):
+        cleaned = compile_rules(self.rules).run(self.df)
+        self.assertListEqual(cleaned['id'].tolist(), [1, 3, 6])
+        self.assertListEqual(cleaned['channel'].tolist(), ['Online', 'Unknown', 'Online'])
+        self.assertEqual(cleaned['points'].iloc[1], 3.0)
+        self.assertFalse(cleaned.isna().values.any())
+
+    def test_run_plan_keeps_rejects(self):
+        plan = compile_rules(self.rules)
+        plan.run(self.df)
+        rejected = plan.validation.rejected_rows()
+        self.assertListEqual(rejected['id'].tolist(), [2, 4, 5])
+        self.assertListEqual(rejected['violations'].tolist(),
+                             ['amount_not_null;amount_in_range', 'amount_in_range', 'segment_allowed'])
+
+    def test_malformed_number_is_rejected(self):
+        rules = dict(self.rules, ranges={"amount": (0, 100), "points": (0, 10)})
+        df = self.df.assign(Points=[1.0, 1.0, 2.0, np.nan, 5.0, 3.0, 'n/a'])
+        plan = compile_rules(rules)
+        cleaned = plan.run(df)
+        self.assertListEqual(cleaned['id'].tolist(), [1, 3])
+        self.assertEqual(cleaned['points'].iloc[1], 2.5)
+        self.assertEqual(plan.validation.rejected_rows().loc[6, 'violations'], 'points_in_range')
+
+    def test_concurrent_run_matches_sequential(self):
+        plan = compile_rules(self.rules)
+        pd.testing.assert_frame_equal(plan.run(self.df, max_workers=4), plan.run(self.df))
+
+    def test_input_not_modified(self):
+        compile_rules(self.rules).run(self.df)
+        self.assertIn(' ID ', self.df.columns)
+
+    def test_unknown_casing(self):
+        with self.assertRaises(ValueError):
+            compile_rules({"casing": {"a": "camel"}})
+
+    def test_declared_tables_compile(self):
+        for rules in TABLE_RULES.values():
+            self.assertTrue(compile_rules(rules).describe())
+
+
+if __name__ == '__main__':
+    unittest.main()
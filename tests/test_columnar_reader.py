@@ -0,0 +1,63 @@
+import sqlite3
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.columnar_reader import iter_record_batches, iter_sql_frames, read_sql_columnar
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+class TestColumnarReader(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('CREATE TABLE t (id INTEGER, amount REAL, region TEXT, maybe INTEGER, mixed)')
+        self.conn.executemany('INSERT INTO t VALUES (?, ?, ?, ?, ?)', [
+            (i, i * 1.5 if i % 3 else None, ['East', 'West', None][i % 3], None if i < 5 else i, 'x' if i < 6 else 7)
+            for i in range(10)
+        ])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_matches_read_sql_query(self):
+        expected = pd.read_sql_query('SELECT * FROM t', self.conn)
+        df = read_sql_columnar(self.conn, 'SELECT * FROM t', batch_rows=3)
+        self.assertEqual(df['id'].dtype, np.int64)
+        self.assertEqual(df['amount'].dtype, np.float64)
+        self.assertIsInstance(df['region'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['maybe'].dtype, np.float64)
+        self.assertEqual(df['mixed'].dtype, object)
+        pd.testing.assert_frame_equal(df.astype({'region': object}).fillna(-1), expected.fillna(-1), check_dtype=False)
+
+    def test_streams_chunks_with_stable_codes(self):
+        chunks = list(iter_sql_frames(self.conn, 'SELECT id, region FROM t ORDER BY id', (), batch_rows=4))
+        self.assertListEqual([len(c) for c in chunks], [4, 4, 2])
+        self.assertListEqual(list(chunks[-1]['region'].cat.categories), ['East', 'West'])
+        regions = pd.concat([c['region'].astype(object) for c in chunks], ignore_index=True)
+        self.assertListEqual(regions.tolist()[:3], ['East', 'West', np.nan])
+
+    def test_empty_result_uses_kind_hints(self):
+        df = read_sql_columnar(self.conn, 'SELECT id, region FROM t WHERE id < ?', (0,), kinds={'id': 'int', 'region': 'text'})
+        self.assertListEqual(list(df.columns), ['id', 'region'])
+        self.assertEqual(df['id'].dtype, np.int64)
+        self.assertEqual(len(df), 0)
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_record_batches(self):
+        batches = list(iter_record_batches(self.conn, 'SELECT id, amount, region FROM t', batch_rows=5))
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(sum(b.num_rows for b in batches), 10)
+        first = batches[0]
+        self.assertEqual(first.column(1).null_count, 2)
+        self.assertEqual(first.column(2).to_pylist(), ['East', 'West', None, 'East', 'West'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from scripts import etl_to_dw
+from tests.test_etl_load import write_prepared
+from utils.customer_analytics import (
+    ACTIVITY_COLUMNS,
+    build_customer_tables,
+    quintile_scores,
+    summarize_customer_activity,
+)
+from utils.olap_queries import run_aggregate
+from utils.warehouse import connect_reader
+
+
+class TestCustomerActivity(unittest.TestCase):
+
+    def test_chunk_matches_pandas_groupby(self):
+        rng = np.random.default_rng(3)
+        dates = pd.Series(pd.to_datetime('2024-01-01') + pd.to_timedelta(rng.integers(0, 400, 500), unit='D'))
+        sales = pd.DataFrame({'customer_id': rng.integers(1, 40, 500), 'sale_date_iso': dates.dt.strftime('%Y-%m-%d'),
+                              'total_revenue': rng.random(500) * 100})
+        sales.loc[::50, 'sale_date_iso'] = None
+        activity = summarize_customer_activity(sales['customer_id'], sales['sale_date_iso'], sales['total_revenue'])
+
+        dated = sales.dropna(subset=['sale_date_iso']).assign(activity_month=lambda d: d['sale_date_iso'].str[:7])
+        expected = (dated.groupby(['customer_id', 'activity_month'])
+                    .agg(first_sale_date=('sale_date_iso', 'min'), last_sale_date=('sale_date_iso', 'max'),
+                         sale_count=('sale_date_iso', 'size'), total_revenue=('total_revenue', 'sum'))
+                    .reset_index())
+        pd.testing.assert_frame_equal(activity, expected[ACTIVITY_COLUMNS], check_dtype=False)
+
+    def test_quintile_scores(self):
+        self.assertListEqual(quintile_scores(pd.Series(range(10))).tolist(), [1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
+        self.assertListEqual(quintile_scores(pd.Series([1, 1, 1, 50]), higher_is_better=False).tolist(), [4, 4, 4, 2])
+
+    def test_join_dates_use_prepared_format(self):
+        activity = summarize_customer_activity(pd.Series([1, 2]), pd.Series(['2025-03-05', '2025-04-01']),
+                                               pd.Series([10.0, 20.0]))
+        customers = pd.DataFrame({'customer_id': [1, 2], 'customer_segment': 'VIP', 'region': 'East',
+                                  'loyalty_points': 1, 'join_date': ['13/1/2020', '3/2/2025']})
+        rfm, _ = build_customer_tables(activity, customers)
+        # A day-first value must not flip how the other join dates are read
+        self.assertTrue(pd.isna(rfm['join_month'].iloc[0]))
+        self.assertEqual(rfm['join_month'].iloc[1], '2025-03')
+
+
+class TestCustomerTables(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        prepared = self.tmp / 'prepared'
+        prepared.mkdir()
+        write_prepared(prepared, sale_count=24)
+        customers = pd.read_csv(prepared / 'customers_prepared.csv')
+        customers['JoinDate'] = ['1/15/2025', '3/2/2025']
+        customers.to_csv(prepared / 'customers_prepared.csv', index=False)
+        sales = pd.read_csv(prepared / 'sales_prepared.csv')
+        sales['SaleDate'] = [f'{1 + i % 6}/{1 + i}/2025' for i in range(24)]
+        sales.loc[5, 'SaleDate'] = 'unknown'
+        sales.to_csv(prepared / 'sales_prepared.csv', index=False)
+        self.db_path = self.tmp / 'smart_sales.db'
+        self.assertTrue(etl_to_dw.load_data_to_db(prepared_dir=prepared, db_path=self.db_path, chunk_rows=5))
+        self.conn = connect_reader(self.db_path)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_rfm_matches_sale_history(self):
+        rfm = pd.read_sql_query('SELECT * FROM customer_rfm ORDER BY customer_id', self.conn)
+        fact = pd.read_sql_query('SELECT customer_id, sale_date_iso, total_revenue FROM sale_fact '
+                                 'WHERE sale_date_iso IS NOT NULL', self.conn)
+        history = fact.groupby('customer_id').agg(frequency=('sale_date_iso', 'size'), monetary=('total_revenue', 'sum'),
+                                                  last_sale_date=('sale_date_iso', 'max'))
+        self.assertListEqual(rfm['frequency'].tolist(), history['frequency'].tolist())
+        np.testing.assert_allclose(rfm['monetary'], history['monetary'])
+        self.assertListEqual(rfm['last_sale_date'].tolist(), history['last_sale_date'].tolist())
+        self.assertEqual(rfm['recency_days'].min(), 0)
+        self.assertListEqual(rfm['customer_segment'].tolist(), ['VIP', 'Regular'])
+        self.assertListEqual(rfm['join_month'].tolist(), ['2025-01', '2025-03'])
+        self.assertTrue(rfm['rfm_code'].str.fullmatch('[1-5]{3}').all())
+
+    def test_cohort_retention(self):
+        rows = run_aggregate(self.conn, 'cohort_retention', {})
+        january = [row for row in rows if row['cohort_month'] == '2025-01']
+        self.assertListEqual([row['months_since_join'] for row in january], [0, 1, 2, 3, 4, 5])
+        self.assertTrue(all(row['cohort_size'] == 1 for row in rows))
+        march = [row for row in rows if row['cohort_month'] == '2025-03']
+        self.assertListEqual([row['months_since_join'] for row in march], [0, 1, 2, 3])
+        vip = run_aggregate(self.conn, 'cohort_retention', {'segment': 'vip'})
+        self.assertListEqual([row['cohort_month'] for row in vip], ['2025-01'] * 6)
+        self.assertListEqual([row['active_customers'] for row in vip], [1, 0, 1, 0, 1, 0])
+        segments = run_aggregate(self.conn, 'rfm_segments', {})
+        self.assertEqual(sum(row['customers'] for row in segments), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
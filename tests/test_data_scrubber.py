@@ -1,6 +1,6 @@
 import unittest
 import pandas as pd
-from utils.data_scrubber import DataScrubber
+from utils.data_scrubber import DataScrubber, map_unique_values
 
 class TestDataScrubber(unittest.TestCase):
 
@@ -34,6 +34,45 @@ class TestDataScrubber(unittest.TestCase):
         cleaned_df = scrubber.convert_column_types(column_types)
         self.assertTrue(pd.api.types.is_integer_dtype(cleaned_df['Age']))
 
+    def test_format_strings_matches_row_wise_result(self):
+        df = pd.DataFrame({'channel': [' online', 'RETAIL ', None, ' online', 42]})
+        expected = df['channel'].str.strip().str.title()
+        cleaned_df = DataScrubber(df.copy()).format_column_strings_to_title_and_trim('channel')
+        pd.testing.assert_series_equal(cleaned_df['channel'], expected, check_dtype=False)
+        lower_df = DataScrubber(df.copy()).format_column_strings_to_lower_and_trim('channel')
+        self.assertListEqual(lower_df['channel'].tolist()[:2], ['online', 'retail'])
+
+    def test_map_unique_values_keeps_categorical(self):
+        series = pd.Series([' online', 'Online', None, 'retail'], dtype='category')
+        result = map_unique_values(series, lambda s: s.str.strip().str.title())
+        self.assertIsInstance(result.dtype, pd.CategoricalDtype)
+        self.assertListEqual(sorted(result.cat.categories), ['Online', 'Retail'])
+        self.assertListEqual(result.astype(object).where(result.notna(), None).tolist(), ['Online', 'Online', None, 'Retail'])
+
+    def test_map_unique_values_mostly_distinct_column(self):
+        series = pd.Series([f' id {i} ' for i in range(50)] + [None, float('nan')], index=range(100, 152))
+        result = map_unique_values(series, lambda s: s.str.strip().str.title())
+        self.assertEqual(result.dtype, object)
+        self.assertListEqual(result.index.tolist(), series.index.tolist())
+        self.assertListEqual(result.tolist()[:2], ['Id 0', 'Id 1'])
+        self.assertIsNone(result.iloc[50])
+        self.assertTrue(pd.isna(result.iloc[51]))
+
+    def test_concurrent_transforms_match_sequential(self):
+        df = pd.DataFrame({f'c{i}': [' online', 'RETAIL ', None, f' store {i}'] for i in range(6)})
+        df['n'] = ['1', '2', '3', '4']
+        styles = {f'c{i}': ['lower', 'upper', 'title'][i % 3] for i in range(6)}
+        sequential = DataScrubber(df.copy()).format_column_strings(styles)
+        concurrent = DataScrubber(df.copy(), max_workers=4).format_column_strings(styles)
+        pd.testing.assert_frame_equal(concurrent, sequential)
+        converted = DataScrubber(concurrent, max_workers=4).convert_column_types({'n': 'int64'})
+        self.assertListEqual(converted['n'].tolist(), [1, 2, 3, 4])
+        self.assertListEqual(list(converted.columns), list(df.columns))
+        with self.assertRaises(ValueError):
+            DataScrubber(df.copy(), max_workers=4).format_column_strings({'c0': 'snake'})
+        with self.assertRaises(ValueError):
+            DataScrubber(df.copy(), max_workers=4).convert_column_types({'missing': 'int64'})
+
 
 if __name__ == '__main__':
     unittest.main()
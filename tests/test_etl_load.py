@@ -0,0 +1,125 @@
+import pathlib
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from scripts import etl_to_dw
+from utils.warehouse import read_version, staging_path_for
+
+
+def write_prepared(directory, sale_count=10):
+    pd.DataFrame({
+        'CustomerID': [1, 2], 'Name': ['A', 'B'], 'Region': ['East', 'West'], 'JoinDate': ['1/1/2024', '2/1/2024'],
+        'Loyalty Points': [5, 7], 'CustomerSegment': ['VIP', 'Regular'], 'membership_status': ['Gold', 'Silver'],
+    }).to_csv(directory / 'customers_prepared.csv', index=False)
+    pd.DataFrame({
+        'productid': [10, 11], 'productname': ['P10', 'P11'], 'category': ['Electronics', 'Clothing'],
+        'unitprice': [9.5, 3.0], 'stockquantity': [4, 8], 'subcategory': ['X', 'Y'], 'product_condition': ['New', 'New'],
+    }).to_csv(directory / 'products_prepared.csv', index=False)
+    pd.DataFrame({
+        'TransactionID': range(1, sale_count + 1),
+        'SaleDate': ['5/4/2025'] * sale_count,
+        'CustomerID': [1 + i % 2 for i in range(sale_count)],
+        'ProductID': [10 + i % 2 for i in range(sale_count)],
+        'StoreID': [401] * sale_count,
+        'CampaignID': [0.0] * sale_count,
+        'SaleAmount': [100.0 + i for i in range(sale_count)],
+        'DiscountPercent': [10] * sale_count,
+        'PaymentType': ['Debit'] * sale_count,
+        'sales_channel': ['Online'] * sale_count,
+    }).to_csv(directory / 'sales_prepared.csv', index=False)
+
+
+class TestResumableLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        self.prepared = self.tmp / 'prepared'
+        self.prepared.mkdir()
+        self.db_path = self.tmp / 'dw' / 'smart_sales.db'
+        write_prepared(self.prepared)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def load(self):
+        etl_to_dw.load_data_to_db(prepared_dir=self.prepared, db_path=self.db_path, chunk_rows=2, checkpoint_every=2)
+
+    def counts(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return {t: conn.execute(f'SELECT COUNT(*) FROM {t}').fetchone()[0] for t in ('sale', 'sale_measure')}
+        finally:
+            conn.close()
+
+    def test_full_load_publishes_and_removes_staging(self):
+        self.load()
+        self.assertEqual(self.counts(self.db_path), {'sale': 10, 'sale_measure': 10})
+        self.assertFalse(staging_path_for(self.db_path).exists())
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(read_version(conn), 1)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'etl_checkpoint'").fetchone()[0], 0)
+        conn.close()
+
+    def test_interrupted_load_keeps_live_warehouse_and_resumes(self):
+        self.load()
+        write_prepared(self.prepared, sale_count=12)
+        insert = etl_to_dw.insert_sales
+        calls = []
+
+        def failing_insert(sales_df, cursor):
+            calls.append(sales_df['sale_id'].tolist())
+            if len(calls) == 3:
+                raise RuntimeError('simulated crash')
+            insert(sales_df, cursor)
+
+        with mock.patch.object(etl_to_dw, 'insert_sales', side_effect=failing_insert):
+            self.load()
+
+        # Readers still see the previous load; two chunks were checkpointed in staging
+        self.assertEqual(self.counts(self.db_path), {'sale': 10, 'sale_measure': 10})
+        staging = staging_path_for(self.db_path)
+        self.assertTrue(staging.exists())
+        self.assertEqual(self.counts(staging), {'sale': 4, 'sale_measure': 4})
+
+        resumed = []
+        with mock.patch.object(etl_to_dw, 'insert_sales', side_effect=lambda df, cur: (resumed.append(df['sale_id'].tolist()), insert(df, cur))):
+            self.load()
+        self.assertEqual(resumed[0], [5, 6])
+        self.assertEqual(len(resumed), 4)
+        self.assertEqual(self.counts(self.db_path), {'sale': 12, 'sale_measure': 12})
+        self.assertFalse(staging.exists())
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(read_version(conn), 2)
+        conn.close()
+
+    def test_failed_publish_resumes_without_reloading(self):
+        with mock.patch.object(etl_to_dw, 'publish_staging', side_effect=sqlite3.OperationalError('database is locked')):
+            self.assertFalse(etl_to_dw.load_data_to_db(prepared_dir=self.prepared, db_path=self.db_path, chunk_rows=2))
+        staging = staging_path_for(self.db_path)
+        self.assertEqual(self.counts(staging), {'sale': 10, 'sale_measure': 10})
+
+        with mock.patch.object(etl_to_dw, 'insert_sales') as insert:
+            self.assertTrue(etl_to_dw.load_data_to_db(prepared_dir=self.prepared, db_path=self.db_path, chunk_rows=2))
+        insert.assert_not_called()
+        self.assertEqual(self.counts(self.db_path), {'sale': 10, 'sale_measure': 10})
+        self.assertFalse(staging.exists())
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'etl_checkpoint'").fetchone()[0], 0)
+        conn.close()
+
+    def test_changed_inputs_restart_the_load(self):
+        with mock.patch.object(etl_to_dw, 'insert_sale_sketches', side_effect=RuntimeError('simulated crash')):
+            self.load()
+        self.assertTrue(staging_path_for(self.db_path).exists())
+        write_prepared(self.prepared, sale_count=6)
+        self.load()
+        self.assertEqual(self.counts(self.db_path), {'sale': 6, 'sale_measure': 6})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from tests.test_olap_service import build_test_warehouse
+from utils.fact_query import build_fact_query, fetch_fact_columns, read_fact_frame
+from utils.query_cache import QueryCache
+
+
+class TestFactQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = build_test_warehouse(pathlib.Path(self.tmp.name) / 'smart_sales.db')
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def test_selects_only_requested_columns_and_needed_joins(self):
+        sql, params = build_fact_query(['sale_date', 'sale_amount', 'segment'], {'segment': 'regular', 'dated': True})
+        self.assertIn('JOIN customer', sql)
+        self.assertNotIn('JOIN product', sql)
+        self.assertNotIn('payment_type', sql)
+        self.assertIn('f.sale_date_iso IS NOT NULL', sql)
+        self.assertEqual(params, ['regular'])
+        sql, _ = build_fact_query(['sale_id', 'total_revenue'], {'start': '2025-01-01'})
+        self.assertNotIn('JOIN', sql)
+        with self.assertRaises(ValueError):
+            build_fact_query(['sale_id'], {'weather': 'sunny'})
+        with self.assertRaises(ValueError):
+            build_fact_query(['not_a_column'])
+
+    def test_streams_into_typed_arrays(self):
+        columns = fetch_fact_columns(self.conn, ['sale_id', 'sale_date', 'total_revenue', 'channel'],
+                                     {'channel': ['online', 'unknown']}, batch_rows=1)
+        self.assertEqual(columns['sale_id'].dtype, np.int64)
+        self.assertEqual(columns['sale_date'].dtype, np.dtype('datetime64[D]'))
+        self.assertEqual(columns['total_revenue'].dtype, np.float64)
+        self.assertIsInstance(columns['channel'], pd.Categorical)
+        self.assertListEqual(sorted(columns['sale_id'].tolist()), [1, 3, 4])
+        self.assertSetEqual(set(columns['channel'].categories), {'Online', 'online', 'Unknown'})
+
+    def test_filters_match_pandas_slice(self):
+        df = read_fact_frame(self.conn, ['sale_id', 'sale_amount', 'category'],
+                             {'category': 'home', 'start': '2025-01-01', 'end': '2025-12-31'})
+        self.assertListEqual(sorted(df['sale_id'].tolist()), [1, 3])
+        self.assertAlmostEqual(df['sale_amount'].sum(), 400.0)
+        empty = read_fact_frame(self.conn, ['sale_id', 'region'], {'year': 1999})
+        self.assertEqual(len(empty), 0)
+        self.assertListEqual(list(empty.columns), ['sale_id', 'region'])
+
+    def test_cached_until_version_changes(self):
+        cache = QueryCache()
+        first = read_fact_frame(self.conn, ['sale_id', 'segment'], {'segment': 'VIP'}, cache=cache)
+        second = read_fact_frame(self.conn, ['sale_id', 'segment'], {'segment': 'VIP'}, cache=cache)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(cache.stats()['memory_hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
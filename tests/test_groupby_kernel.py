@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils import groupby_kernel
+from utils.groupby_kernel import GroupIndex, group_sums
+
+
+def random_sales(rows=2000, seed=5):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Year': rng.integers(2022, 2026, rows),
+        'Region': np.array(['North', 'South', 'East', None], dtype=object)[rng.integers(0, 4, rows)],
+        'ProductCategory': np.array(['Home', 'Office', 'Garden'], dtype=object)[rng.integers(0, 3, rows)],
+        'Revenue': rng.random(rows) * 100,
+        'Units': rng.integers(1, 5, rows),
+    })
+    df.loc[::7, 'Revenue'] = np.nan
+    return df
+
+
+class TestGroupSums(unittest.TestCase):
+
+    def expected(self, df, keys, dropna=True):
+        return (df.groupby(keys, dropna=dropna)
+                .agg(Revenue=('Revenue', 'sum'), Units=('Units', 'sum'), Count=('Units', 'size'))
+                .reset_index())
+
+    def test_matches_pandas_groupby(self):
+        df = random_sales()
+        keys = ['Year', 'Region', 'ProductCategory']
+        got = group_sums(df, keys, {'Revenue': 'Revenue', 'Units': 'Units'}, count='Count')
+        pd.testing.assert_frame_equal(got, self.expected(df, keys), check_dtype=False)
+        self.assertEqual(got['Units'].dtype, np.int64)
+        self.assertNotIn(None, got['Region'].tolist())
+
+    def test_missing_keys_grouped_last(self):
+        df = random_sales()
+        got = group_sums(df, ['Region', 'Year'], {'Revenue': 'Revenue', 'Units': 'Units'}, count='Count', dropna=False)
+        pd.testing.assert_frame_equal(got, self.expected(df, ['Region', 'Year'], dropna=False), check_dtype=False)
+        self.assertTrue(pd.isna(got['Region'].iloc[-1]))
+
+    def test_sparse_key_space(self):
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({'a': rng.integers(0, 10 ** 6, 500), 'b': rng.integers(0, 10 ** 6, 500),
+                           'c': rng.integers(0, 3, 500), 'Revenue': rng.random(500), 'Units': 1})
+        got = group_sums(df, ['a', 'b', 'c'], {'Revenue': 'Revenue', 'Units': 'Units'}, count='Count')
+        pd.testing.assert_frame_equal(got, self.expected(df, ['a', 'b', 'c']), check_dtype=False)
+
+    def test_rollup_of_cells(self):
+        df = random_sales()
+        index = GroupIndex(df, ['Year', 'Region', 'ProductCategory'], dropna=False)
+        cells = index.aggregate(df, {'Revenue': 'Revenue', 'Units': 'Units'}, count='Count')
+        self.assertEqual(index.n_cells, len(cells))
+        rolled = group_sums(cells, ['ProductCategory'], {'Revenue': 'Revenue', 'Units': 'Units', 'Count': 'Count'})
+        pd.testing.assert_frame_equal(rolled, self.expected(df, ['ProductCategory']), check_dtype=False)
+
+    def test_empty_frame(self):
+        df = random_sales().iloc[:0]
+        got = group_sums(df, ['Year', 'Region'], {'Revenue': 'Revenue'}, count='Count')
+        self.assertListEqual(list(got.columns), ['Year', 'Region', 'Revenue', 'Count'])
+        self.assertEqual(len(got), 0)
+
+    def test_numba_engine(self):
+        df = random_sales()
+        if groupby_kernel._compiled_sums() is None:
+            with self.assertRaises(ImportError):
+                group_sums(df, ['Year'], {'Revenue': 'Revenue'}, engine='numba')
+            return
+        got = group_sums(df, ['Year', 'Region'], {'Revenue': 'Revenue', 'Units': 'Units'}, count='Count', engine='numba')
+        pd.testing.assert_frame_equal(got, self.expected(df, ['Year', 'Region']), check_dtype=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import pathlib
+import subprocess
+import sys
+import unittest
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+HEAVY_MODULES = {'pandas', 'numpy', 'matplotlib', 'seaborn', 'pyarrow'}
+IMPORT_BUDGET_US = 300_000  # Total import time allowed for a light subcommand; pandas alone is about this much
+
+
+def profile_imports(*args):
+    """Run smart_store.py under -X importtime and return {top-level package: cumulative microseconds}."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(PROJECT_ROOT / 'smart_store.py'), *args],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60,
+    )
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):  # Only count top-level imports so nested times are not added twice
+            imports[name.strip()] = int(cumulative)
+        imports.setdefault(name.strip().split('.')[0], 0)
+    return imports
+
+
+class TestImportTime(unittest.TestCase):
+
+    def assert_light(self, *args):
+        imports = profile_imports(*args)
+        self.assertSetEqual(HEAVY_MODULES & set(imports), set(), f"'{' '.join(args)}' imported heavy modules")
+        self.assertLess(sum(imports.values()), IMPORT_BUDGET_US)
+
+    def test_help_is_light(self):
+        self.assert_light('--help')
+
+    def test_count_is_light(self):
+        self.assert_light('count')
+
+    def test_inspect_is_light(self):
+        self.assert_light('inspect')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+from utils.ingest import load_cached_schema, read_csv_directory, read_csv_fast, read_raw_data, schema_path_for
+
+
+class TestIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = pathlib.Path(self.tmp.name)
+        self.path = self.dir / 'sales.csv'
+        self.path.write_text('TransactionID,SaleDate,SaleAmount\n1,5/4/2025,10.5\n2,5/5/2025,?\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_schema_cached_on_first_read(self):
+        df = read_csv_fast(self.path)
+        self.assertEqual(len(df), 2)
+        dtypes = load_cached_schema(self.path)
+        self.assertEqual(dtypes['TransactionID'], 'int64')
+        self.assertEqual(dtypes['SaleAmount'], 'object')
+        pd.testing.assert_frame_equal(read_csv_fast(self.path), df)
+
+    def test_schema_invalidated_when_file_changes(self):
+        read_csv_fast(self.path)
+        self.path.write_text('TransactionID,SaleDate,SaleAmount\n1,5/4/2025,10.5\n2,5/5/2025,7.25\n')
+        self.assertIsNone(load_cached_schema(self.path))
+        df = read_csv_fast(self.path)
+        self.assertEqual(df['SaleAmount'].dtype, 'float64')
+        self.assertEqual(json.loads(schema_path_for(self.path).read_text())['dtypes']['SaleAmount'], 'float64')
+
+    def test_read_raw_data_missing_file(self):
+        self.assertTrue(read_raw_data('missing.csv', self.dir).empty)
+
+    def test_read_csv_directory(self):
+        daily = self.dir / 'daily'
+        daily.mkdir()
+        for day in range(1, 4):
+            (daily / f'sales_2025050{day}.csv').write_text(f'TransactionID,SaleAmount\n{day},1.0\n{day + 10},2.0\n')
+        df = read_csv_directory(daily, pattern='sales_*.csv', max_workers=3)
+        self.assertListEqual(df['TransactionID'].tolist(), [1, 11, 2, 12, 3, 13])
+        self.assertTrue(read_csv_directory(self.dir / 'daily', pattern='none_*.csv').empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
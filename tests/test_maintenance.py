@@ -0,0 +1,101 @@
+import contextlib
+import io
+import pathlib
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import inspect_db
+from scripts import etl_to_dw
+from tests.test_etl_load import write_prepared
+from utils.maintenance import (
+    database_report,
+    explain_hot_queries,
+    full_scans,
+    maintenance_due,
+    run_maintenance,
+    table_report,
+)
+from utils.warehouse import connect_reader
+
+
+class TestMaintenance(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        prepared = self.tmp / 'prepared'
+        prepared.mkdir()
+        write_prepared(prepared, sale_count=400)
+        self.db_path = self.tmp / 'smart_sales.db'
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(etl_to_dw.load_data_to_db(prepared_dir=prepared, db_path=self.db_path, chunk_rows=100))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def reader(self):
+        return contextlib.closing(connect_reader(self.db_path))
+
+    def test_table_report(self):
+        with self.reader() as conn:
+            tables = {entry['table']: entry for entry in table_report(conn)}
+            summary = database_report(conn, self.db_path)
+        self.assertEqual(tables['sale']['rows'], 400)
+        self.assertGreater(tables['sale']['pages'], 0)
+        indexes = [index['index'] for index in tables['sale_measure']['indexes']]
+        self.assertIn('idx_sale_measure_year_quarter', indexes)
+        self.assertEqual(summary['auto_vacuum'], 'incremental')
+        self.assertIsNone(summary['last_maintenance'])
+
+    def test_full_scans_are_flagged_through_the_view(self):
+        with self.reader() as conn:
+            plans = {result['name']: result for result in explain_hot_queries(conn)}
+            self.assertTrue(all(result['error'] is None for result in plans.values()))
+            self.assertTrue(plans['aggregate:segment_weekday']['full_scans'])
+            self.assertFalse(plans['aggregate:profit?year&region']['full_scans'])
+            sql = "SELECT COUNT(*) FROM sale_fact f WHERE f.sale_year = 2025"
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            self.assertListEqual(full_scans(conn, sql, plan), [])
+            self.assertListEqual(full_scans(conn, "SELECT * FROM sale", ["SCAN sale"]), ["SCAN sale"])
+
+    def test_maintenance_reclaims_free_pages(self):
+        writer = sqlite3.connect(self.db_path)
+        writer.execute("DELETE FROM sale WHERE sale_id % 2 = 0")
+        writer.commit()
+        writer.close()
+        with self.reader() as conn:
+            self.assertGreater(database_report(conn, self.db_path)['freelist_count'], 0)
+        result = run_maintenance(self.db_path)
+        self.assertFalse(result['full_vacuum'])
+        self.assertEqual(result['freelist_after'], 0)
+        with self.reader() as conn:
+            self.assertEqual(database_report(conn, self.db_path)['freelist_count'], 0)
+            self.assertTrue(conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0])
+            self.assertFalse(maintenance_due(conn, every_hours=24))
+            self.assertTrue(maintenance_due(conn, every_hours=0))
+
+    def test_first_run_converts_old_warehouse(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("PRAGMA auto_vacuum = NONE")
+        conn.execute("VACUUM")
+        conn.close()
+        self.assertTrue(run_maintenance(self.db_path)['full_vacuum'])
+        with self.reader() as conn:
+            self.assertEqual(database_report(conn, self.db_path)['auto_vacuum'], 'incremental')
+
+    def test_command_line(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            inspect_db.main(['--db', str(self.db_path), '--maintain', '--every-hours', '24', '--schema'])
+            inspect_db.main(['--db', str(self.db_path), '--maintain', '--every-hours', '24', '--no-plans'])
+        text = output.getvalue()
+        self.assertIn('Maintained', text)
+        self.assertIn('skipped', text)
+        self.assertIn('[Table: sale]', text)
+        self.assertIn('!! FULL SCAN', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.manifest import (
+    count_csv_rows,
+    count_rows,
+    estimate_distinct,
+    manifest_path_for,
+    read_manifest,
+    write_manifest,
+)
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = pathlib.Path(self.tmp.name)
+        self.df = pd.DataFrame({
+            'CustomerID': [1, 2, 3, 3],
+            'Region': ['East', None, 'West', 'West'],
+            'Amount': [10.5, 20.0, None, 5.25],
+        })
+        self.path = self.dir / 'sample.csv'
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_write_and_read_manifest(self):
+        write_manifest(self.df, self.path)
+        manifest = read_manifest(self.path, verify_hash=True)
+        self.assertEqual(manifest['row_count'], 4)
+        self.assertEqual(manifest['columns']['Region']['null_count'], 1)
+        self.assertEqual(manifest['columns']['Amount']['min'], 5.25)
+        self.assertEqual(manifest['columns']['CustomerID']['distinct_estimate'], 3)
+
+    def test_stale_manifest_is_ignored(self):
+        write_manifest(self.df, self.path)
+        self.df.head(2).to_csv(self.path, index=False)
+        self.assertIsNone(read_manifest(self.path))
+        self.assertEqual(count_rows(self.path), (2, 'scan'))
+
+    def test_count_rows_uses_manifest(self):
+        write_manifest(self.df, self.path)
+        self.assertEqual(count_rows(self.path), (4, 'manifest'))
+        self.assertTrue(manifest_path_for(self.path).exists())
+
+    def test_count_csv_rows_without_trailing_newline(self):
+        path = self.dir / 'no_newline.csv'
+        path.write_bytes(b'a,b\n1,2\n3,4')
+        self.assertEqual(count_csv_rows(path), 2)
+        empty = self.dir / 'empty.csv'
+        empty.write_bytes(b'')
+        self.assertEqual(count_csv_rows(empty), 0)
+
+    def test_estimate_distinct_large_column(self):
+        series = pd.Series(np.arange(50_000) % 20_000)
+        estimate = estimate_distinct(series)
+        self.assertAlmostEqual(estimate / 20_000, 1.0, delta=0.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
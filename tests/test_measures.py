@@ -0,0 +1,35 @@
+import unittest
+
+import pandas as pd
+
+from utils.measures import SALE_MEASURE_COLUMNS, build_sale_measures, compute_profit_measures
+
+
+class TestMeasures(unittest.TestCase):
+
+    def test_compute_profit_measures(self):
+        measures = compute_profit_measures(pd.Series([100.0, 'bad', 0.0]), pd.Series([20, 0, 10]))
+        self.assertListEqual(measures['Total_Revenue'].tolist(), [100.0, 0.0, 0.0])
+        self.assertAlmostEqual(measures['Profit'].iloc[0], 30.0)
+        self.assertAlmostEqual(measures['Profit_Margin'].iloc[0], 30.0)
+        self.assertEqual(measures['Profit_Margin'].iloc[2], 0)
+        self.assertAlmostEqual(measures['Gross_Amount'].iloc[0], 125.0)
+        self.assertAlmostEqual(measures['Discount_Amount'].iloc[0], 25.0)
+
+    def test_build_sale_measures_keeps_invalid_dates(self):
+        sales = pd.DataFrame({
+            'sale_id': [1, 2],
+            'sale_date': ['5/4/2025', '2023-13-01'],
+            'sale_amount': [200.0, 50.0],
+            'discount_percent': [0, 5],
+        })
+        measures = build_sale_measures(sales)
+        self.assertListEqual(measures.columns.tolist(), SALE_MEASURE_COLUMNS)
+        self.assertEqual(measures['sale_date_iso'].iloc[0], '2025-05-04')
+        self.assertEqual(measures['sale_quarter'].iloc[0], 2)
+        self.assertEqual(measures['sale_dow'].iloc[0], 6)
+        self.assertTrue(pd.isna(measures['sale_year'].iloc[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+from utils.metrics_store import MetricsStore
+
+
+def processed_sales(rows):
+    """Build processed sales rows from (year, quarter, category, revenue) tuples."""
+    return pd.DataFrame({
+        'Year': [r[0] for r in rows], 'Quarter': [r[1] for r in rows],
+        'Region': 'East', 'ProductCategory': [r[2] for r in rows], 'sales_channel': 'Online',
+        'Total_Revenue': [float(r[3]) for r in rows], 'Profit': [r[3] * 0.3 for r in rows], 'Units_Sold': 1,
+    })
+
+
+class TestMetricsStore(unittest.TestCase):
+
+    def setUp(self):
+        history = [(2024, q, 'Home', 100) for q in range(1, 5)] + [(2025, 1, 'Home', 150), (2025, 1, 'Office', 80)]
+        self.store = MetricsStore()
+        self.store.apply_batch(processed_sales(history), batch_id='history')
+
+    def test_batch_updates_only_its_buckets(self):
+        before = self.store.buckets().set_index(['Year', 'Quarter', 'ProductCategory'])
+        touched = self.store.apply_batch(processed_sales([(2025, 2, 'Home', 200), (2025, 2, 'Home', 20)]), batch_id='b2')
+        self.assertEqual(touched, 1)
+        after = self.store.buckets().set_index(['Year', 'Quarter', 'ProductCategory'])
+        pd.testing.assert_frame_equal(after.drop(index=(2025, 2, 'Home')), before)
+        self.assertEqual(after.loc[(2025, 2, 'Home'), 'Sale_Count'], 2)
+        self.assertEqual(self.store.apply_batch(processed_sales([(2025, 2, 'Home', 200)]), batch_id='b2'), 0)
+
+    def test_growth_matches_full_recompute(self):
+        self.store.apply_batch(processed_sales([(2025, 2, 'Home', 300)]), batch_id='b2')
+        growth = self.store.quarterly_growth(['ProductCategory']).set_index(['ProductCategory', 'Year', 'Quarter'])
+        q2 = growth.loc[('Home', 2025, 2)]
+        self.assertAlmostEqual(q2['QoQ_Growth_Percent'], 100.0)
+        self.assertAlmostEqual(q2['YoY_Growth_Percent'], 200.0)
+        self.assertAlmostEqual(q2['Rolling_4Q_Revenue'], 650.0)
+        self.assertAlmostEqual(growth.loc[('Office', 2025, 1), 'QoQ_Growth_Percent'], 0.0)
+        yearly = self.store.yearly_growth().set_index(['ProductCategory', 'Year'])
+        self.assertAlmostEqual(yearly.loc[('Home', 2025), 'YoY_Growth_Percent'], 12.5)
+
+    def test_batch_over_covered_dates_is_rejected(self):
+        def dated_sales(dates):
+            df = processed_sales([(pd.Timestamp(d).year, pd.Timestamp(d).quarter, 'Home', 100) for d in dates])
+            return df.assign(SaleDate=pd.to_datetime(dates))
+
+        rebuilt = MetricsStore()
+        rebuilt.apply_batch(dated_sales(['2025-05-01', '2025-05-20', '2025-06-30']))
+        totals = rebuilt.buckets()
+        with self.assertRaises(ValueError):
+            rebuilt.apply_batch(dated_sales(['2025-06-01']), batch_id='2025-06-01',
+                                start='2025-06-01', end='2025-06-01')
+        pd.testing.assert_frame_equal(rebuilt.buckets(), totals)
+        self.assertListEqual(rebuilt.applied_batches, [])
+
+        chunks = [dated_sales(['2025-07-01']), dated_sales(['2025-07-02', '2025-07-01'])]
+        self.assertEqual(rebuilt.apply_batch(chunks, batch_id='2025-07'), 1)
+        self.assertEqual(rebuilt.buckets().set_index('Quarter').loc[3, 'Sale_Count'], 3)
+        self.assertDictEqual(rebuilt.coverage[-1], {'batch_id': '2025-07', 'start': '2025-07-01', 'end': '2025-07-02'})
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.store.save(pathlib.Path(tmp))
+            loaded = MetricsStore.load(pathlib.Path(tmp))
+        pd.testing.assert_frame_equal(loaded.buckets(), self.store.buckets(), check_dtype=False)
+        self.assertListEqual(loaded.applied_batches, ['history'])
+        self.assertListEqual(loaded.coverage, [{'batch_id': 'history', 'start': '2024-01-01', 'end': '2025-03-31'}])
+        self.assertAlmostEqual(loaded.channel_share()['Share_Percent'].sum(), 100.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from scripts.etl_to_dw import create_schema
+from scripts.olap.olap_service import OlapService
+from utils.measures import build_sale_measures
+from utils.warehouse import bump_version, connect_writer
+
+
+def build_test_warehouse(db_path: pathlib.Path):
+    """Create a small warehouse with two customers, two products and four sales."""
+    conn = connect_writer(db_path)
+    create_schema(conn.cursor())
+    pd.DataFrame({
+        'customer_id': [1, 2], 'name': ['A', 'B'], 'region': ['East', 'WEST'],
+        'join_date': ['1/1/2024', '1/1/2024'], 'loyalty_points': [10, 20],
+        'customer_segment': ['Regular', 'VIP'], 'membership_status': ['Gold', 'Silver'],
+    }).to_sql('customer', conn, if_exists='append', index=False)
+    pd.DataFrame({
+        'product_id': [10, 11], 'product_name': ['P', 'Q'], 'category': ['Home', 'Office'],
+        'unit_price': [5.0, 7.0], 'stock_quantity': [1, 2], 'subcategory': ['H', 'O'],
+        'product_condition': ['New', 'Used'],
+    }).to_sql('product', conn, if_exists='append', index=False)
+    sales = pd.DataFrame({
+        'sale_id': [1, 2, 3, 4], 'customer_id': [1, 1, 2, 2], 'product_id': [10, 11, 10, 11],
+        'sale_amount': [100.0, 200.0, 300.0, 400.0],
+        'sale_date': ['1/6/2025', '4/8/2025', '4/9/2025', '5/4/2024'],
+        'store_id': [401, 401, 402, 402], 'campaign_id': [0, 1, 0, 1],
+        'discount_percent': [0, 10, 0, 5], 'payment_type': ['Credit'] * 4,
+        'sales_channel': ['Online', 'Retail', None, 'online'],
+    })
+    sales.to_sql('sale', conn, if_exists='append', index=False)
+    build_sale_measures(sales).to_sql('sale_measure', conn, if_exists='append', index=False)
+    bump_version(conn)
+    conn.commit()
+    return conn
+
+
+async def http_get(port: int, target: str):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    return status, json.loads(body)
+
+
+class TestOlapService(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = pathlib.Path(self.tmp.name) / 'smart_sales.db'
+        self.writer = build_test_warehouse(self.db_path)
+        self.service = OlapService(db_path=self.db_path, port=0, workers=2, poll_interval=60)
+        self.port = await self.service.start()
+
+    async def asyncTearDown(self):
+        await self.service.close()
+        self.writer.close()
+        self.tmp.cleanup()
+
+    async def test_profit_with_filters(self):
+        status, body = await http_get(self.port, '/aggregates/profit?year=2025&region=east')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body['rows']), 2)
+        self.assertAlmostEqual(sum(row['total_profit'] for row in body['rows']), 90.0)
+
+    async def test_channel_share_and_yoy(self):
+        _, share = await http_get(self.port, '/aggregates/channel_share')
+        self.assertAlmostEqual(sum(row['share_percent'] for row in share['rows']), 100.0)
+        self.assertIn('Unknown', [row['sales_channel'] for row in share['rows']])
+        _, yoy = await http_get(self.port, '/aggregates/yoy_growth?category=Office')
+        self.assertEqual([row['year'] for row in yoy['rows']], [2024, 2025])
+        self.assertAlmostEqual(yoy['rows'][1]['yoy_growth_percent'], -50.0)
+
+    async def test_date_range_filter(self):
+        status, body = await http_get(self.port, '/aggregates/channel_share?start=2025-04-01&end=2025-06-30')
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(sum(row['total_revenue'] for row in body['rows']), 500.0)
+        status, _ = await http_get(self.port, '/aggregates/profit?start=April')
+        self.assertEqual(status, 400)
+        plan = self.writer.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM sale_fact f WHERE f.sale_date_iso >= ?", ('2025-01-01',)
+        ).fetchall()
+        self.assertIn('idx_sale_measure_date', ' '.join(row[-1] for row in plan))
+
+    async def test_bad_requests(self):
+        status, _ = await http_get(self.port, '/aggregates/missing')
+        self.assertEqual(status, 404)
+        status, body = await http_get(self.port, '/aggregates/profit?segment=VIP')
+        self.assertEqual(status, 400)
+        self.assertIn('segment', body['error'])
+        status, _ = await http_get(self.port, '/aggregates/profit?year=abc')
+        self.assertEqual(status, 400)
+
+    async def test_cache_invalidated_on_version_bump(self):
+        await http_get(self.port, '/aggregates/segment_weekday?segment=Regular')
+        self.assertEqual(len(self.service.cache), 1)
+        self.assertFalse(await self.service.refresh_version())
+        bump_version(self.writer)
+        self.writer.commit()
+        self.assertTrue(await self.service.refresh_version())
+        self.assertEqual(len(self.service.cache), 0)
+
+    async def test_cache_is_bounded(self):
+        await http_get(self.port, '/aggregates/profit?year=1999')
+        self.service.cache.limit_bytes = 3 * self.service.cache.size_bytes
+        for year in range(2000, 2020):  # Client-chosen filters: one cache entry each
+            await http_get(self.port, f'/aggregates/profit?year={year}')
+        self.assertLessEqual(self.service.cache.size_bytes, self.service.cache.limit_bytes)
+        self.assertEqual(len(self.service.cache), 3)
+
+    async def test_unexpected_error_returns_500(self):
+        with mock.patch.object(self.service, '_aggregate', side_effect=KeyError('boom')):
+            status, body = await http_get(self.port, '/aggregates/profit')
+        self.assertEqual(status, 500)
+        self.assertIn('error', body)
+        status, _ = await http_get(self.port, '/aggregates/profit')
+        self.assertEqual(status, 200)
+
+    async def test_concurrent_requests(self):
+        results = await asyncio.gather(*[http_get(self.port, '/aggregates/profit') for _ in range(50)])
+        self.assertTrue(all(status == 200 for status, _ in results))
+        self.assertEqual(len(self.service.cache), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from utils import partitions
+from utils.partitions import prune_partitions, read_partition_stats, read_partitioned, write_partitioned
+
+
+class TestPartitions(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = pathlib.Path(self.tmp.name) / 'sales'
+        self.df = pd.DataFrame({
+            'TransactionID': [1, 2, 3, 4, 5],
+            'SaleDate': ['1/15/2025', '1/20/2025', '4/2/2025', '4/28/2025', 'not a date'],
+            'SaleAmount': [10.0, 20.0, 30.0, 40.0, 50.0],
+        })
+        self.stats = write_partitioned(self.df, self.base_dir, 'SaleDate')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_layout_and_stats(self):
+        paths = [p['path'] for p in self.stats['partitions']]
+        self.assertListEqual(paths, [
+            'year=2025/month=01/part-0.csv', 'year=2025/month=04/part-0.csv',
+            'year=__unknown__/month=__unknown__/part-0.csv',
+        ])
+        january = self.stats['partitions'][0]
+        self.assertEqual((january['date_min'], january['date_max'], january['row_count']), ('2025-01-15', '2025-01-20', 2))
+        self.assertDictEqual(january['columns']['SaleAmount'], {'min': 10.0, 'max': 20.0})
+        self.assertEqual(read_partition_stats(self.base_dir), json.loads(json.dumps(self.stats)))
+
+    def test_read_without_range_returns_all_rows(self):
+        self.assertEqual(len(read_partitioned(self.base_dir)), 5)
+
+    def test_prunes_before_reading(self):
+        with mock.patch.object(partitions.pd, 'read_csv', wraps=pd.read_csv) as read_csv:
+            df = read_partitioned(self.base_dir, start='2025-04-01', end='2025-04-30')
+        self.assertEqual(read_csv.call_count, 1)
+        self.assertListEqual(df['TransactionID'].tolist(), [3, 4])
+
+    def test_boundary_partition_filtered_by_row(self):
+        df = read_partitioned(self.base_dir, start='2025-01-18', end='2025-04-10')
+        self.assertListEqual(df['TransactionID'].tolist(), [2, 3])
+        self.assertEqual(len(prune_partitions(self.stats, start='2025-05-01')), 0)
+        self.assertTrue(read_partitioned(self.base_dir, start='2026-01-01').empty)
+
+    def test_rewrite_replaces_old_partitions(self):
+        write_partitioned(self.df.iloc[:2], self.base_dir, 'SaleDate')
+        self.assertFalse((self.base_dir / 'year=2025' / 'month=04').exists())
+        self.assertEqual(len(read_partitioned(self.base_dir)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import pathlib
+import sqlite3
+import tempfile
+import unittest
+
+import pandas as pd
+
+from utils.query_cache import QueryCache, make_cache_key, normalize_sql, read_sql_cached
+from utils.warehouse import bump_version
+
+
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.disk_dir = pathlib.Path(self.tmp.name) / 'cache'
+        self.df = pd.DataFrame({'region': ['East', 'West'], 'sales': [1.0, 2.0]})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_normalize_sql_keeps_literals(self):
+        sql = "SELECT  *\n FROM sale -- all rows\n WHERE name = 'a  b';"
+        self.assertEqual(normalize_sql(sql), "SELECT * FROM sale WHERE name = 'a  b'")
+        self.assertEqual(make_cache_key("SELECT 1", None, 1), make_cache_key("SELECT   1;", (), 1))
+        self.assertNotEqual(make_cache_key("SELECT 1", None, 1), make_cache_key("SELECT 1", None, 2))
+
+    def test_memory_hit_and_version_miss(self):
+        cache = QueryCache()
+        self.assertIsNone(cache.get("SELECT 1", None, 1))
+        cache.put("SELECT 1", None, 1, self.df)
+        pd.testing.assert_frame_equal(cache.get("SELECT 1", None, 1), self.df)
+        self.assertIsNone(cache.get("SELECT 1", None, 2))
+        stats = cache.stats()
+        self.assertEqual((stats['memory_hits'], stats['misses']), (1, 2))
+
+    def test_memory_lru_eviction(self):
+        size = int(self.df.memory_usage(deep=True).sum())
+        cache = QueryCache(memory_limit_bytes=size * 2)
+        for i in range(3):
+            cache.put(f"SELECT {i}", None, 1, self.df)
+        self.assertEqual(cache.stats()['memory_evictions'], 1)
+        self.assertIsNone(cache.get("SELECT 0", None, 1))
+
+    def test_disk_tier_survives_new_instance(self):
+        QueryCache(disk_dir=self.disk_dir).put("SELECT 1", (5,), 3, self.df)
+        cache = QueryCache(disk_dir=self.disk_dir)
+        pd.testing.assert_frame_equal(cache.get("SELECT 1", (5,), 3), self.df)
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+
+    def test_disk_size_limit(self):
+        cache = QueryCache(disk_dir=self.disk_dir, disk_limit_bytes=1)
+        cache.put("SELECT 1", None, 1, self.df)
+        self.assertEqual(cache.stats()['disk_evictions'], 1)
+        self.assertEqual(cache.stats()['disk_bytes'], 0)
+
+    def test_read_sql_cached_follows_version(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        cache = QueryCache()
+        self.assertEqual(len(read_sql_cached(conn, "SELECT x FROM t", cache=cache)), 1)
+        conn.execute("INSERT INTO t VALUES (2)")
+        self.assertEqual(len(read_sql_cached(conn, "SELECT x FROM t", cache=cache)), 1)
+        bump_version(conn)
+        self.assertEqual(len(read_sql_cached(conn, "SELECT x FROM t", cache=cache)), 2)
+
+    def test_databases_do_not_share_results(self):
+        cache = QueryCache(disk_dir=self.disk_dir)
+        paths = [self.disk_dir.parent / 'a.db', self.disk_dir.parent / 'b.db']
+        for value, path in enumerate(paths):
+            conn = sqlite3.connect(path)
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.execute("INSERT INTO t VALUES (?)", (value,))
+            conn.commit()
+            self.assertEqual(read_sql_cached(conn, "SELECT x FROM t", cache=cache)['x'].tolist(), [value])
+            conn.close()
+        self.assertEqual(cache.stats()['misses'], 2)
+        self.assertNotEqual(make_cache_key("SELECT 1", None, 1, 'a.db'), make_cache_key("SELECT 1", None, 1, 'b.db'))
+
+    def test_rebuilt_file_does_not_reuse_results(self):
+        path = self.disk_dir.parent / 'rebuilt.db'
+        for value in (1, 2):
+            path.unlink(missing_ok=True)
+            conn = sqlite3.connect(path)
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.execute("INSERT INTO t VALUES (?)", (value,))
+            self.assertEqual(bump_version(conn), 1)
+            conn.commit()
+            cache = QueryCache(disk_dir=self.disk_dir)  # The disk tier outlives the file
+            self.assertEqual(read_sql_cached(conn, "SELECT x FROM t", cache=cache)['x'].tolist(), [value])
+            conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import importlib.util
+import json
+import pathlib
+import tempfile
+import unittest
+
+from scripts.olap.render_report import RENDER_CACHE_FILE, load_chart_inputs, plan_renders, render_report
+from tests.test_olap_service import build_test_warehouse
+from utils.charts import CHARTS
+from utils.warehouse import close_reader_pools
+
+
+class TestRenderReport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        self.output_dir = self.root / 'charts'
+        self.output_dir.mkdir()
+        conn = build_test_warehouse(self.root / 'smart_sales.db')
+        conn.close()
+        self.inputs = load_chart_inputs(self.root / 'smart_sales.db')
+
+    def tearDown(self):
+        close_reader_pools()
+        self.tmp.cleanup()
+
+    def test_inputs_come_from_aggregates(self):
+        self.assertSetEqual(set(self.inputs), set(CHARTS))
+        self.assertEqual(len(self.inputs['channel_share']), 4)
+
+    def test_only_changed_charts_are_planned(self):
+        hashes, stale = plan_renders(self.inputs, self.output_dir)
+        self.assertListEqual(sorted(stale), sorted(CHARTS))
+        for name in CHARTS:
+            (self.output_dir / f'{name}.png').write_bytes(b'png')
+        (self.output_dir / RENDER_CACHE_FILE).write_text(json.dumps(hashes))
+        self.assertListEqual(plan_renders(self.inputs, self.output_dir)[1], [])
+
+        changed = dict(self.inputs, channel_share=self.inputs['channel_share'][:2])
+        self.assertListEqual(plan_renders(changed, self.output_dir)[1], ['channel_share'])
+        (self.output_dir / 'yoy_growth.png').unlink()
+        self.assertListEqual(plan_renders(self.inputs, self.output_dir)[1], ['yoy_growth'])
+        self.assertEqual(len(plan_renders(self.inputs, self.output_dir, force=True)[1]), len(CHARTS))
+
+    @unittest.skipUnless(importlib.util.find_spec('matplotlib'), 'matplotlib is not installed')
+    def test_render_in_process_pool_then_cache(self):
+        status = render_report(self.inputs, self.output_dir, max_workers=2)
+        self.assertSetEqual(set(status.values()), {'rendered'})
+        self.assertTrue(all((self.output_dir / f'{name}.png').stat().st_size > 0 for name in CHARTS))
+        status = render_report(self.inputs, self.output_dir, max_workers=2)
+        self.assertSetEqual(set(status.values()), {'cached'})
+
+
+if __name__ == '__main__':
+    unittest.main()
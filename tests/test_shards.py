@@ -0,0 +1,129 @@
+import pathlib
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from scripts import etl_to_dw
+from tests.test_etl_load import write_prepared
+from utils.olap_queries import AGGREGATES, run_aggregate
+from utils.olap_sketches import distinct_customers
+from utils.shards import (
+    ShardedWarehouse,
+    StoreRange,
+    plan_store_ranges,
+    read_shard_manifest,
+    remove_shards,
+    require_single_warehouse,
+)
+from utils.warehouse import connect_reader
+
+
+class TestStoreRanges(unittest.TestCase):
+
+    def test_ranges_balance_rows_and_cover_all_stores(self):
+        ranges = plan_store_ranges({401: 50, 402: 50, 403: 50, 404: 50}, 2)
+        self.assertListEqual(ranges, [StoreRange(None, 403), StoreRange(403, None)])
+        self.assertListEqual(plan_store_ranges({401: 10}, 4), [StoreRange(None, None)])
+        skewed = plan_store_ranges({1: 90, 2: 5, 3: 5}, 2)
+        self.assertListEqual(skewed, [StoreRange(None, 2), StoreRange(2, None)])
+
+    def test_missing_store_ids_go_to_first_shard(self):
+        stores = pd.Series([None, 401, 402, 'x'])
+        self.assertListEqual(etl_to_dw.in_store_range(stores, (None, 402)).tolist(), [True, True, False, True])
+        self.assertListEqual(etl_to_dw.in_store_range(stores, (402, None)).tolist(), [False, False, True, False])
+
+
+class TestShardedLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        self.prepared = self.tmp / 'prepared'
+        self.prepared.mkdir()
+        write_prepared(self.prepared, sale_count=40)
+        sales = pd.read_csv(self.prepared / 'sales_prepared.csv')
+        sales['StoreID'] = [401 + i % 4 for i in range(40)]
+        sales.loc[5, 'StoreID'] = None
+        sales['SaleDate'] = [f'{1 + i % 12}/{1 + i % 28}/{2024 + i % 2}' for i in range(40)]
+        sales['sales_channel'] = ['Online', 'Retail', None, 'Online'] * 10
+        sales.to_csv(self.prepared / 'sales_prepared.csv', index=False)
+        self.single = self.tmp / 'single' / 'smart_sales.db'
+        self.sharded = self.tmp / 'sharded' / 'smart_sales.db'
+        etl_to_dw.load_data_to_db(prepared_dir=self.prepared, db_path=self.single, chunk_rows=7)
+        self.assertTrue(etl_to_dw.load_sharded(3, prepared_dir=self.prepared, db_path=self.sharded,
+                                               chunk_rows=7, workers=2))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def assert_rows_equal(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for got, want in zip(actual, expected):
+            self.assertListEqual(list(got), list(want))
+            for column, value in want.items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(got[column], value, places=9)
+                else:
+                    self.assertEqual(got[column], value)
+
+    def test_shards_partition_the_sales(self):
+        manifest = read_shard_manifest(self.sharded)
+        self.assertEqual(len(manifest), 3)
+        counts = []
+        for shard in manifest:
+            conn = connect_reader(shard['path'])
+            counts.append(conn.execute('SELECT COUNT(*) FROM sale').fetchone()[0])
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM customer').fetchone()[0], 2)
+            conn.close()
+        self.assertEqual(sum(counts), 40)
+        self.assertFalse(self.sharded.exists())
+
+    def test_merged_aggregates_match_single_warehouse(self):
+        single = connect_reader(self.single)
+        with ShardedWarehouse(read_shard_manifest(self.sharded)) as warehouse:
+            for name, aggregate in AGGREGATES.items():
+                if 'keys' not in aggregate:
+                    with self.assertRaises(ValueError):
+                        warehouse.run_aggregate(name, {})
+                    continue
+                self.assert_rows_equal(warehouse.run_aggregate(name, {}), run_aggregate(single, name, {}))
+            self.assert_rows_equal(warehouse.run_aggregate('profit', {'year': '2025', 'region': 'east'}),
+                                   run_aggregate(single, 'profit', {'year': '2025', 'region': 'east'}))
+            self.assertListEqual(warehouse._shards_for({'store': '404'}), [2])
+            self.assert_rows_equal(warehouse.run_aggregate('profit', {'store': 404}),
+                                   run_aggregate(single, 'profit', {'store': 404}))
+            self.assertEqual(warehouse.read_version(), 3)
+            with self.assertRaises(ValueError):
+                warehouse.run_aggregate('profit', {'store': 'abc'})
+        single.close()
+
+    def test_single_file_readers_refuse_sharded_warehouse(self):
+        require_single_warehouse(self.single)
+        with self.assertRaises(RuntimeError):
+            require_single_warehouse(self.sharded)
+        shutil.copy(self.single, self.sharded)  # A stale file left by an earlier unsharded load
+        stale = connect_reader(self.sharded)
+        with self.assertRaises(RuntimeError):
+            distinct_customers(stale)
+        stale.close()
+        shard = connect_reader(read_shard_manifest(self.sharded)[0]['path'])
+        self.assertTrue(distinct_customers(shard))
+        shard.close()
+
+    def test_failed_load_exits_with_error(self):
+        with mock.patch.object(etl_to_dw, 'load_sharded', return_value=False):
+            with self.assertRaises(SystemExit) as raised:
+                etl_to_dw.main(['--shards', '2'])
+        self.assertEqual(raised.exception.code, 1)
+
+    def test_unsharded_load_replaces_shards(self):
+        self.assertTrue(etl_to_dw.load_data_to_db(prepared_dir=self.prepared, db_path=self.sharded, chunk_rows=7))
+        remove_shards(self.sharded)
+        self.assertIsNone(read_shard_manifest(self.sharded))
+        self.assertListEqual(sorted(p.name for p in self.sharded.parent.iterdir()), ['smart_sales.db'])
+
+
+if __name__ == '__main__':
+    unittest.main()
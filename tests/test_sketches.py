@@ -0,0 +1,79 @@
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.olap_sketches import build_sale_sketches, distinct_customers, top_products
+from utils.sketches import HyperLogLog, SpaceSaving
+from tests.test_olap_service import build_test_warehouse
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_estimate_and_merge(self):
+        first = HyperLogLog().add(np.arange(0, 30_000))
+        second = HyperLogLog().add(np.arange(20_000, 50_000))
+        self.assertAlmostEqual(first.estimate(), 30_000, delta=30_000 * 0.05)
+        merged = HyperLogLog.from_bytes(first.to_bytes()).merge(second)
+        self.assertAlmostEqual(merged.estimate(), 50_000, delta=50_000 * 0.05)
+        self.assertEqual(len(first.to_bytes()), 4097)
+
+    def test_small_counts_are_near_exact(self):
+        self.assertEqual(round(HyperLogLog().add(['a', 'b', 'c', 'a']).estimate()), 3)
+        with self.assertRaises(ValueError):
+            HyperLogLog(10).merge(HyperLogLog(12))
+
+
+class TestSpaceSaving(unittest.TestCase):
+
+    def test_top_items_with_bounded_capacity(self):
+        rng = np.random.default_rng(7)
+        items = np.concatenate([np.repeat([1, 2, 3], [500, 300, 200]), rng.integers(100, 10_000, 2_000)])
+        rng.shuffle(items)
+        halves = [SpaceSaving(capacity=20).add(part) for part in np.array_split(items, 2)]
+        merged = SpaceSaving.from_bytes(halves[0].to_bytes()).merge(halves[1])
+        self.assertLessEqual(len(merged.counts), 20)
+        top = merged.top(3)
+        self.assertListEqual([item for item, _, _ in top], [1, 2, 3])
+        for item, count, error in top:
+            true_count = int((items == item).sum())
+            self.assertGreaterEqual(count, true_count)
+            self.assertLessEqual(count - error, true_count)
+
+
+class TestWarehouseSketches(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = build_test_warehouse(pathlib.Path(self.tmp.name) / 'smart_sales.db')
+        self.fact_df = pd.read_sql_query("""
+            SELECT f.sale_id, f.customer_id, f.product_id, f.sale_date_iso, f.sale_year, f.sale_quarter,
+                   f.total_revenue, c.customer_segment, c.region, p.category
+            FROM sale_fact f JOIN customer c USING (customer_id) JOIN product p USING (product_id)
+        """, self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def test_falls_back_to_exact_without_sketches(self):
+        rows = distinct_customers(self.conn, ['segment'])
+        self.assertListEqual(rows, [{'segment': 'Regular', 'customers': 1}, {'segment': 'VIP', 'customers': 1}])
+
+    def test_sketch_answers_match_exact(self):
+        self.conn.executemany("INSERT INTO sale_sketch VALUES (?, ?, ?)", build_sale_sketches(self.fact_df))
+        for group_by, filters in [(['segment', 'weekday'], {}), (['region'], {'start': '2025-01-01'}), ([], {'region': 'west'})]:
+            self.assertListEqual(distinct_customers(self.conn, group_by, filters),
+                                 distinct_customers(self.conn, group_by, filters, exact=True))
+        approximate = top_products(self.conn, category='home', year=2025, k=5)
+        exact = top_products(self.conn, category='home', year=2025, k=5, exact=True)
+        self.assertListEqual([(r['product_id'], r['revenue']) for r in approximate],
+                             [(r['product_id'], r['revenue']) for r in exact])
+        with self.assertRaises(ValueError):
+            distinct_customers(self.conn, ['store'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.star_join import DimensionJoin, estimate_partitions, partition_ids, star_join
+
+
+class TestStarJoin(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        rng = np.random.default_rng(7)
+        self.sales = pd.DataFrame({
+            'TransactionID': range(1, 3001),
+            'CustomerID': rng.integers(1, 60, 3000),  # 50-59 have no customer row
+            'ProductID': rng.integers(1, 25, 3000).astype(float),
+            'SaleAmount': rng.random(3000).round(2),
+        })
+        self.sales.loc[::97, 'ProductID'] = np.nan
+        self.customers = pd.DataFrame({'CustomerID': range(1, 50), 'Region': [f'R{i % 4}' for i in range(1, 50)]})
+        self.products = pd.DataFrame({'productid': range(1, 21), 'category': [f'C{i % 3}' for i in range(1, 21)],
+                                      'unitprice': range(1, 21)})
+        self.sales.to_csv(self.tmp / 'sales.csv', index=False)
+        self.customers.to_csv(self.tmp / 'customers.csv', index=False)
+        self.products.to_csv(self.tmp / 'products.csv', index=False)
+        self.dimensions = [
+            DimensionJoin(self.tmp / 'products.csv', 'ProductID', 'productid', ('category',)),
+            DimensionJoin(self.tmp / 'customers.csv', 'CustomerID', 'CustomerID', ('Region',)),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def expected(self):
+        products = self.products.rename(columns={'productid': 'ProductID'})[['ProductID', 'category']]
+        return (self.sales.merge(products, on='ProductID', how='left')
+                .merge(self.customers, on='CustomerID', how='left'))
+
+    def test_matches_in_memory_left_join(self):
+        parts = list(star_join([self.tmp / 'sales.csv'], self.dimensions, memory_budget_bytes=60_000,
+                               max_workers=2, spill_dir=self.tmp))
+        self.assertGreater(len(parts), 1)
+        joined = pd.concat(parts).sort_values('TransactionID', ignore_index=True)
+        pd.testing.assert_frame_equal(joined, self.expected(), check_dtype=False)
+        self.assertListEqual([p.name for p in self.tmp.iterdir() if p.name.startswith('star-join-')], [])
+
+    def test_budget_sets_partition_count(self):
+        small, _ = estimate_partitions([self.tmp / 'sales.csv'], 60_000, 2)
+        large, _ = estimate_partitions([self.tmp / 'sales.csv'], 100 * 2**20, 2)
+        self.assertGreater(small, 1)
+        self.assertEqual(large, 1)
+
+    def test_int_and_float_keys_share_partitions(self):
+        ints = pd.Series([1, 2, 1000, -5])
+        floats = pd.Series([1.0, 2.0, 1000.0, -5.0])
+        np.testing.assert_array_equal(partition_ids(ints, 16), partition_ids(floats, 16))
+
+
+if __name__ == '__main__':
+    unittest.main()
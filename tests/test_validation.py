@@ -0,0 +1,70 @@
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.validation import rules_from_table, validate, write_rejects
+
+
+class TestValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'price': [10.0, -1.0, 5.0, None, 2000.0],
+            'category': ['Home', 'Home', 'Toys', 'Office', 'Home'],
+            'code': ['A1', 'A2', 'bad', 'A4', 'A5'],
+        })
+        self.rules = [
+            {'name': 'price_not_null', 'column': 'price', 'check': 'not_null'},
+            {'name': 'price_in_range', 'column': 'price', 'check': 'range', 'min': 0, 'max': 1000},
+            {'name': 'category_allowed', 'column': 'category', 'check': 'allowed', 'values': ['Home', 'Office']},
+            {'name': 'code_format', 'column': 'code', 'check': 'pattern', 'pattern': r'A\d'},
+        ]
+
+    def test_bitmask(self):
+        result = validate(self.df, self.rules)
+        self.assertEqual(result.mask.dtype, np.uint64)
+        self.assertListEqual(result.mask.tolist(), [0, 0b0010, 0b1100, 0b0011, 0b0010])
+        self.assertListEqual(result.violations_per_row().tolist(), [0, 1, 2, 2, 1])
+
+    def test_counts(self):
+        counts = validate(self.df, self.rules).counts()
+        self.assertDictEqual(counts, {'price_not_null': 1, 'price_in_range': 3, 'category_allowed': 1, 'code_format': 1})
+
+    def test_split_rows(self):
+        result = validate(self.df, self.rules)
+        self.assertEqual(len(result.valid_rows()), 1)
+        rejected = result.rejected_rows()
+        self.assertEqual(rejected.loc[2, 'violations'], 'category_allowed;code_format')
+
+    def test_high_bit_rule(self):
+        rules = [{'name': f'r{i}', 'column': 'price', 'check': 'range', 'min': -10, 'max': 10_000} for i in range(63)]
+        rules.append({'name': 'last', 'column': 'category', 'check': 'allowed', 'values': ['Home']})
+        result = validate(self.df, rules)
+        self.assertEqual(result.counts()['last'], 2)
+        self.assertEqual(result.counts()['r0'], 1)
+
+    def test_range_on_text_column(self):
+        df = pd.DataFrame({'price': ['10', 'n/a', '2000', None, '5.5']})
+        result = validate(df, [self.rules[1]])
+        self.assertListEqual(result.invalid().tolist(), [False, True, True, True, False])
+
+    def test_too_many_rules(self):
+        with self.assertRaises(ValueError):
+            validate(self.df, [self.rules[0]] * 65)
+
+    def test_rules_from_table_and_write_rejects(self):
+        rules = rules_from_table({'required': ['price'], 'ranges': {'price': (0, 100)}})
+        self.assertEqual([rule['name'] for rule in rules], ['price_not_null', 'price_in_range'])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / 'rejects' / 'products_rejects.csv'
+            self.assertEqual(write_rejects(validate(self.df, rules), path), 3)
+            self.assertIn('violations', pd.read_csv(path).columns)
+            self.assertEqual(write_rejects(validate(self.df.iloc[[0, 2]], rules), path), 0)
+            self.assertFalse(path.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
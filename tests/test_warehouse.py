@@ -0,0 +1,59 @@
+import pathlib
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from utils.warehouse import ConnectionPool, connect_reader, connect_writer
+
+
+class TestWarehouse(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = pathlib.Path(self.tmp.name) / 'dw' / 'test.db'
+        self.writer = connect_writer(self.db_path)
+        self.writer.execute("CREATE TABLE sale (sale_id INTEGER PRIMARY KEY, sale_amount REAL)")
+        self.writer.executemany("INSERT INTO sale VALUES (?, ?)", [(i, i * 1.5) for i in range(100)])
+        self.writer.commit()
+
+    def tearDown(self):
+        self.writer.close()
+        self.tmp.cleanup()
+
+    def test_writer_uses_wal(self):
+        mode = self.writer.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_reader_is_read_only(self):
+        conn = connect_reader(self.db_path)
+        with self.assertRaises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO sale VALUES (1000, 1.0)")
+        conn.close()
+
+    def test_reader_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            connect_reader(pathlib.Path(self.tmp.name) / 'missing.db')
+
+    def test_pool_serves_threads_during_write(self):
+        pool = ConnectionPool(self.db_path, max_size=2)
+        self.writer.execute("INSERT INTO sale VALUES (500, 1.0)")  # Uncommitted write in progress
+        results = []
+
+        def query():
+            with pool.connection() as conn:
+                results.append(conn.execute("SELECT COUNT(*) FROM sale").fetchone()[0])
+
+        threads = [threading.Thread(target=query) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.writer.commit()
+        pool.close()
+        self.assertEqual(results, [100] * 10)
+        self.assertLessEqual(pool._created, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+utils/campaigns.py
+
+Campaign and discount rollup maintained in the data warehouse.
+
+The campaign_summary table holds additive sales measures per
+(campaign, discount band, store, channel, year, quarter) cell. These are
+sale count, revenue, gross amount, discount given, cost and profit.
+scripts/etl_to_dw.py adds each loaded chunk of sales into the cells it
+touches, so the rollup is ready as soon as the load commits and is never
+rebuilt from the sale table.
+
+Keys never hold NULL, so chunks can be upserted:
+- campaign_id / store_id: -1 when missing (campaign 0 means "no campaign")
+- discount_floor: lower edge of the discount band, in percent
+  (DISCOUNT_BAND_FLOORS; a band runs up to the next floor), -1 when missing
+- sales_channel: "Unknown" when missing, as in utils/olap_queries.py
+- sale_year / sale_quarter: 0 for sales without a parseable date
+
+The campaign_lift and discount_bands aggregates in utils/olap_queries.py read
+only this table. They report revenue, margin and lift (revenue per sale
+relative to a baseline in the same store and channel).
+
+Example:
+    from utils.campaigns import apply_campaign_summary, summarize_campaign_sales
+    apply_campaign_summary(cursor, summarize_campaign_sales(sales_df, measures_df))
+"""
+
+import sqlite3
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+CAMPAIGN_SUMMARY_SQL = """
+    CREATE TABLE IF NOT EXISTS campaign_summary (
+        campaign_id INTEGER NOT NULL,
+        discount_floor INTEGER NOT NULL,
+        store_id INTEGER NOT NULL,
+        sales_channel TEXT NOT NULL,
+        sale_year INTEGER NOT NULL,
+        sale_quarter INTEGER NOT NULL,
+        sale_count INTEGER NOT NULL,
+        total_revenue REAL NOT NULL,
+        gross_amount REAL NOT NULL,
+        discount_amount REAL NOT NULL,
+        total_cost REAL NOT NULL,
+        profit REAL NOT NULL,
+        PRIMARY KEY (campaign_id, discount_floor, store_id, sales_channel, sale_year, sale_quarter)
+    )
+"""
+
+# Lower edges of the discount bands, in percent: 0-4, 5-9, 10-14, 15-19, 20+
+DISCOUNT_BAND_FLOORS: List[int] = [0, 5, 10, 15, 20]
+UNKNOWN_ID = -1
+
+SUMMARY_KEYS: List[str] = ["campaign_id", "discount_floor", "store_id", "sales_channel", "sale_year", "sale_quarter"]
+SUMMARY_MEASURES: List[str] = ["sale_count", "total_revenue", "gross_amount", "discount_amount", "total_cost", "profit"]
+
+
+def discount_floor(discount_percent: pd.Series) -> pd.Series:
+    """Map discounts (0-100) to the floor of their band; missing values to -1."""
+    discount = pd.to_numeric(discount_percent, errors="coerce")
+    floors = np.array(DISCOUNT_BAND_FLOORS)
+    positions = np.searchsorted(floors, discount.clip(lower=0).fillna(0).to_numpy(), side="right") - 1
+    return pd.Series(np.where(discount.isna(), UNKNOWN_ID, floors[positions]), index=discount_percent.index)
+
+
+def _id_or_unknown(values: pd.Series) -> pd.Series:
+    return pd.to_numeric(values, errors="coerce").fillna(UNKNOWN_ID).astype("int64")
+
+
+def summarize_campaign_sales(sales_df: pd.DataFrame, measures_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Roll a chunk of sales up to campaign_summary cells.
+
+    Args:
+        sales_df (pd.DataFrame): Warehouse-named sales (campaign_id, discount_percent, store_id, sales_channel).
+        measures_df (pd.DataFrame): Their sale_measure rows (utils/measures.py), on the same index.
+
+    Returns:
+        pd.DataFrame: One row per cell with SUMMARY_KEYS and SUMMARY_MEASURES.
+    """
+    cells = pd.DataFrame({
+        "campaign_id": _id_or_unknown(sales_df["campaign_id"]),
+        "discount_floor": discount_floor(sales_df["discount_percent"]),
+        "store_id": _id_or_unknown(sales_df["store_id"]),
+        "sales_channel": sales_df["sales_channel"].fillna("Unknown"),
+        "sale_year": measures_df["sale_year"].fillna(0).astype("int64"),
+        "sale_quarter": measures_df["sale_quarter"].fillna(0).astype("int64"),
+        "sale_count": 1,
+    })
+    for column in SUMMARY_MEASURES[1:]:
+        cells[column] = measures_df[column]
+    return cells.groupby(SUMMARY_KEYS, as_index=False, sort=False)[SUMMARY_MEASURES].sum()
+
+
+def apply_campaign_summary(cursor: sqlite3.Cursor, summary_df: pd.DataFrame) -> None:
+    """Add rolled-up cells into campaign_summary inside the caller's transaction."""
+    columns = SUMMARY_KEYS + SUMMARY_MEASURES
+    updates = ", ".join(f"{m} = {m} + excluded.{m}" for m in SUMMARY_MEASURES)
+    cursor.executemany(
+        f"INSERT INTO campaign_summary ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+        f"ON CONFLICT ({', '.join(SUMMARY_KEYS)}) DO UPDATE SET {updates}",
+        summary_df[columns].astype(object).itertuples(index=False, name=None),
+    )
+
+
+def rebuild_campaign_summary(conn: sqlite3.Connection) -> int:
+    """
+    Recompute campaign_summary from sale_fact (for warehouses loaded before it existed).
+
+    Returns:
+        int: Number of cells written.
+    """
+    def known_id(column: str) -> str:
+        return f"CASE WHEN typeof({column}) IN ('integer', 'real') THEN CAST({column} AS INTEGER) ELSE {UNKNOWN_ID} END"
+
+    floors = " ".join(f"WHEN f.discount_percent >= {floor} THEN {floor}" for floor in reversed(DISCOUNT_BAND_FLOORS[1:]))
+    conn.execute(CAMPAIGN_SUMMARY_SQL)
+    conn.execute("DELETE FROM campaign_summary")
+    cursor = conn.execute(f"""
+        INSERT INTO campaign_summary ({', '.join(SUMMARY_KEYS + SUMMARY_MEASURES)})
+        SELECT
+            {known_id('f.campaign_id')},
+            CASE WHEN typeof(f.discount_percent) NOT IN ('integer', 'real') THEN {UNKNOWN_ID} {floors} ELSE 0 END,
+            {known_id('f.store_id')},
+            COALESCE(f.sales_channel, 'Unknown'),
+            COALESCE(f.sale_year, 0),
+            COALESCE(f.sale_quarter, 0),
+            COUNT(*),
+            SUM(f.total_revenue),
+            SUM(f.gross_amount),
+            SUM(f.discount_amount),
+            SUM(f.total_cost),
+            SUM(f.profit)
+        FROM sale_fact f
+        GROUP BY 1, 2, 3, 4, 5, 6
+    """)
+    return cursor.rowcount
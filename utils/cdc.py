@@ -0,0 +1,201 @@
+"""
+utils/cdc.py
+
+Change-data-capture style delta detection for warehouse dimension tables.
+
+Each dimension row is hashed by business key over all its other columns.
+The hashes of the last load are kept in the warehouse (dim_row_hash), so a
+new snapshot is compared against that index instead of against the stored
+rows. Only the differences are applied:
+- inserts: keys not seen before
+- updates: keys whose row hash changed
+- deletes: keys missing from the new snapshot
+
+The dimension table itself always holds the current rows (type 1), so the
+sale_fact joins are unchanged. With scd2=True every change is also recorded
+in <table>_history as slowly changing dimension type-2 versions with
+valid_from / valid_to dates and an is_current flag. When history is switched
+on for a table loaded before, the first type-2 load opens one version per
+current row, so later changes to rows that did not change then are tracked too.
+
+Hashes are taken over the values as loaded, so a column that changes dtype
+between snapshots (e.g. int to float) shows up as an update.
+
+Example:
+    from utils.cdc import apply_dimension_snapshot
+    changes = apply_dimension_snapshot(conn, "customer", "customer_id", customers_df, scd2=True)
+    print(changes.summary())
+"""
+
+import datetime
+import sqlite3
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+HASH_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS dim_row_hash (
+        table_name TEXT NOT NULL,
+        business_key INTEGER NOT NULL,
+        row_hash INTEGER NOT NULL,
+        PRIMARY KEY (table_name, business_key)
+    )
+"""
+
+
+class ChangeSet:
+    """The inserts, updates and deletes that turn the previous snapshot into the new one."""
+
+    def __init__(self, inserts: pd.DataFrame, updates: pd.DataFrame, deletes: List[int], hashes: pd.Series):
+        self.inserts = inserts
+        self.updates = updates
+        self.deletes = deletes
+        self.hashes = hashes  # Row hash per business key of the changed (inserted/updated) rows
+
+    def summary(self) -> Dict[str, int]:
+        return {"inserts": len(self.inserts), "updates": len(self.updates), "deletes": len(self.deletes)}
+
+    def is_empty(self) -> bool:
+        return not (len(self.inserts) or len(self.updates) or self.deletes)
+
+
+def row_hashes(df: pd.DataFrame, key_column: str) -> pd.Series:
+    """Hash every row over its non-key columns, indexed by business key (signed 64-bit)."""
+    values = df.drop(columns=[key_column])
+    hashes = pd.util.hash_pandas_object(values[sorted(values.columns)], index=False).to_numpy().view("int64")
+    return pd.Series(hashes, index=df[key_column].to_numpy())
+
+
+def load_hash_index(conn: sqlite3.Connection, table: str) -> pd.Series:
+    """Return the stored row hash per business key for a table (empty on the first load)."""
+    rows = conn.execute("SELECT business_key, row_hash FROM dim_row_hash WHERE table_name = ?", (table,)).fetchall()
+    return pd.Series([h for _, h in rows], index=[k for k, _ in rows], dtype="int64")
+
+
+def detect_changes(df: pd.DataFrame, key_column: str, previous: pd.Series) -> ChangeSet:
+    """
+    Compare a dimension snapshot with the previous hash index.
+
+    Args:
+        df (pd.DataFrame): New snapshot, one row per business key.
+        key_column (str): Business key column.
+        previous (pd.Series): Row hash per business key from the last load.
+
+    Returns:
+        ChangeSet: Rows to insert and update, and keys to delete.
+
+    Raises:
+        ValueError: If the snapshot repeats a business key.
+    """
+    if df[key_column].duplicated().any():
+        raise ValueError(f"Snapshot has duplicate values in key column '{key_column}'.")
+    current = row_hashes(df, key_column)
+    keys = df[key_column].to_numpy()
+    seen = pd.Index(keys).isin(previous.index)
+    previous_hashes = np.zeros(len(keys), dtype=np.int64)
+    previous_hashes[seen] = previous.loc[keys[seen]].to_numpy()
+    changed = seen & (current.to_numpy() != previous_hashes)
+    deletes = previous.index.difference(pd.Index(keys)).tolist()
+    inserted, updated = df[~seen], df[changed]
+    return ChangeSet(inserted, updated, [int(k) for k in deletes], current[~seen | changed])
+
+
+def _to_records(df: pd.DataFrame, columns: List[str]) -> List[tuple]:
+    """Rows as tuples of plain Python values, with NaN as NULL."""
+    cleaned = df[columns].astype(object).where(df[columns].notna(), None)
+    return [tuple(v.item() if hasattr(v, "item") else v for v in row) for row in cleaned.itertuples(index=False)]
+
+
+def ensure_history_table(conn: sqlite3.Connection, table: str, key_column: str, columns: List[str]) -> None:
+    """Create <table>_history for SCD type-2 versions if it does not exist."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table}_history (
+            version_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {', '.join(columns)},
+            valid_from TEXT NOT NULL,
+            valid_to TEXT,
+            is_current INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_history_key ON {table}_history ({key_column}, is_current)")
+
+
+def apply_changes(
+    conn: sqlite3.Connection,
+    table: str,
+    key_column: str,
+    changes: ChangeSet,
+    scd2: bool = False,
+    as_of: Optional[str] = None,
+) -> None:
+    """
+    Apply a ChangeSet to a dimension table and its hash index (no commit).
+
+    Args:
+        conn (sqlite3.Connection): Warehouse writer connection.
+        table (str): Dimension table, e.g. "customer".
+        key_column (str): Business key column, e.g. "customer_id".
+        changes (ChangeSet): Output of detect_changes().
+        scd2 (bool): Also record type-2 history in <table>_history.
+        as_of (str, optional): Effective date of the changes (YYYY-MM-DD); defaults to today.
+    """
+    as_of = as_of or datetime.date.today().isoformat()
+    columns = list(changes.inserts.columns)
+    placeholders = ", ".join("?" for _ in columns)
+
+    if len(changes.inserts):
+        conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                         _to_records(changes.inserts, columns))
+    if len(changes.updates):
+        value_columns = [c for c in columns if c != key_column]
+        assignments = ", ".join(f"{c} = ?" for c in value_columns)
+        conn.executemany(f"UPDATE {table} SET {assignments} WHERE {key_column} = ?",
+                         _to_records(changes.updates, value_columns + [key_column]))
+    if changes.deletes:
+        conn.executemany(f"DELETE FROM {table} WHERE {key_column} = ?", [(k,) for k in changes.deletes])
+
+    if scd2:
+        ensure_history_table(conn, table, key_column, columns)
+        if conn.execute(f"SELECT 1 FROM {table}_history LIMIT 1").fetchone() is None:
+            # First type-2 load (history switched on after earlier loads): open one
+            # version per current row, so unchanged rows are tracked from here on
+            conn.execute(f"INSERT INTO {table}_history ({', '.join(columns)}, valid_from) "
+                         f"SELECT {', '.join(columns)}, ? FROM {table}", (as_of,))
+        else:
+            closed_keys = [(as_of, k) for k in changes.updates[key_column].tolist() + changes.deletes]
+            conn.executemany(f"UPDATE {table}_history SET valid_to = ?, is_current = 0 "
+                             f"WHERE {key_column} = ? AND is_current = 1", closed_keys)
+            new_versions = pd.concat([changes.inserts, changes.updates])
+            conn.executemany(
+                f"INSERT INTO {table}_history ({', '.join(columns)}, valid_from) VALUES ({placeholders}, ?)",
+                [record + (as_of,) for record in _to_records(new_versions, columns)],
+            )
+
+    conn.executemany("INSERT OR REPLACE INTO dim_row_hash (table_name, business_key, row_hash) VALUES (?, ?, ?)",
+                     [(table, int(k), int(h)) for k, h in changes.hashes.items()])
+    conn.executemany("DELETE FROM dim_row_hash WHERE table_name = ? AND business_key = ?",
+                     [(table, k) for k in changes.deletes])
+
+
+def apply_dimension_snapshot(
+    conn: sqlite3.Connection,
+    table: str,
+    key_column: str,
+    df: pd.DataFrame,
+    scd2: bool = False,
+    as_of: Optional[str] = None,
+) -> ChangeSet:
+    """
+    Detect and apply the changes between a new dimension snapshot and the last load.
+
+    Without a stored hash index (first delta load, or a warehouse filled by a
+    full reload) the table is cleared and every row is loaded as an insert.
+    """
+    conn.execute(HASH_TABLE_SQL)
+    previous = load_hash_index(conn, table)
+    if previous.empty:
+        conn.execute(f"DELETE FROM {table}")
+    changes = detect_changes(df, key_column, previous)
+    apply_changes(conn, table, key_column, changes, scd2=scd2, as_of=as_of)
+    return changes
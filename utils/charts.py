@@ -0,0 +1,132 @@
+"""
+utils/charts.py
+
+Chart definitions for the OLAP report, rendered headlessly.
+
+Each chart is drawn from one named warehouse aggregate (utils/olap_queries.py)
+by a drawing function that only sees the aggregate rows. render_chart() is a
+plain top-level function, so it can run in a worker process. It selects
+matplotlib's non-interactive Agg backend before importing pyplot, so no
+window (and no display) is ever needed.
+
+chart_input_hash() fingerprints a chart's input rows together with
+CHART_STYLE_VERSION. The report stage (scripts/olap/render_report.py) uses it
+to skip charts whose data has not changed. Bump CHART_STYLE_VERSION whenever
+a drawing function changes, so every chart is redrawn once.
+
+matplotlib is only imported inside render_chart().
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, List
+
+CHART_STYLE_VERSION = 1
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+Rows = List[Dict[str, Any]]
+
+
+def _grouped_bars(ax, labels: List[str], series: Dict[str, List[float]]) -> None:
+    """Draw one bar per series at each label, side by side."""
+    width = 0.8 / max(len(series), 1)
+    for i, (name, values) in enumerate(series.items()):
+        positions = [x + (i - (len(series) - 1) / 2) * width for x in range(len(labels))]
+        ax.bar(positions, values, width=width, label=str(name))
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels)
+    if len(series) > 1:
+        ax.legend(fontsize=8)
+
+
+def draw_segment_weekday(plt, rows: Rows):
+    """Revenue by customer segment and day of week."""
+    segments = sorted({row["segment"] for row in rows}, key=str)
+    totals = {(row["segment"], row["day_of_week"]): row["total_revenue"] for row in rows}
+    fig, ax = plt.subplots(figsize=(10, 6))
+    _grouped_bars(ax, DAY_NAMES, {s: [totals.get((s, d), 0) for d in range(7)] for s in segments})
+    ax.set_title("Total Sales by Customer Segment and Day of Week")
+    ax.set_xlabel("Day of the Week")
+    ax.set_ylabel("Total Sales ($)")
+    return fig
+
+
+def draw_profit_category_region_quarter(plt, rows: Rows):
+    """Profit by region and quarter, one panel per product category."""
+    categories = sorted({row["category"] for row in rows}, key=str)
+    quarters = sorted({(row["year"], row["quarter"]) for row in rows})
+    regions = sorted({row["region"] for row in rows}, key=str)
+    profit = {(row["category"], row["region"], row["year"], row["quarter"]): row["total_profit"] for row in rows}
+    fig, axes = plt.subplots(1, max(len(categories), 1), figsize=(5 * max(len(categories), 1), 5), sharey=True, squeeze=False)
+    for ax, category in zip(axes[0], categories):
+        _grouped_bars(ax, [f"{y} Q{q}" for y, q in quarters],
+                      {r: [profit.get((category, r, y, q), 0) for y, q in quarters] for r in regions})
+        ax.set_title(str(category))
+    axes[0][0].set_ylabel("Total Profit ($)")
+    fig.suptitle("Profit by Product Category, Region and Quarter")
+    return fig
+
+
+def draw_channel_share(plt, rows: Rows):
+    """Revenue share by sales channel."""
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ordered = sorted(rows, key=lambda row: row["share_percent"])
+    ax.barh([str(row["sales_channel"]) for row in ordered], [row["share_percent"] for row in ordered])
+    ax.set_title("Revenue Share by Sales Channel")
+    ax.set_xlabel("Share of Revenue (%)")
+    return fig
+
+
+def draw_yoy_growth(plt, rows: Rows):
+    """Yearly revenue per product category."""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for category in sorted({row["category"] for row in rows}, key=str):
+        points = sorted((row["year"], row["total_revenue"]) for row in rows if row["category"] == category)
+        ax.plot([p[0] for p in points], [p[1] for p in points], marker="o", label=str(category))
+    ax.set_title("Revenue by Product Category and Year")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Total Revenue ($)")
+    ax.legend(fontsize=8)
+    return fig
+
+
+# Chart name -> the warehouse aggregate it is drawn from and its drawing function
+CHARTS: Dict[str, Dict[str, Any]] = {
+    "segment_weekday": {"aggregate": "segment_weekday", "draw": draw_segment_weekday},
+    "profit_category_region_quarter": {"aggregate": "profit", "draw": draw_profit_category_region_quarter},
+    "channel_share": {"aggregate": "channel_share", "draw": draw_channel_share},
+    "yoy_growth": {"aggregate": "yoy_growth", "draw": draw_yoy_growth},
+}
+
+
+def chart_input_hash(name: str, rows: Rows) -> str:
+    """Fingerprint a chart's input rows and drawing version."""
+    payload = json.dumps({"chart": name, "style": CHART_STYLE_VERSION, "rows": rows}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_chart(name: str, rows: Rows, output_path: str) -> str:
+    """
+    Draw one chart with the Agg backend and save it as a PNG.
+
+    The image is written to a temporary file first and then moved into place,
+    so an interrupted render never leaves a partial chart behind.
+
+    Returns:
+        str: The output path.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    draw: Callable = CHARTS[name]["draw"]
+    fig = draw(plt, rows)
+    try:
+        fig.tight_layout()
+        tmp_path = f"{output_path}.tmp.png"
+        fig.savefig(tmp_path, dpi=100)
+        os.replace(tmp_path, output_path)
+    finally:
+        plt.close(fig)
+    return output_path
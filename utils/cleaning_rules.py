@@ -0,0 +1,199 @@
+"""
+utils/cleaning_rules.py
+
+Declarative cleaning rules for the raw source tables, and the engine that runs them.
+
+Each table's cleaning is declared once, as data, in TABLE_RULES:
+- column_names: "strip" (trim headers) or "snake" (trim, lowercase, spaces -> underscores)
+- types: column -> "numeric" (coerce bad values to NaN) or any pandas dtype
+- key_columns: business key used to drop duplicate records
+- fill: column -> constant value, or a strategy: "median", "mean" or "mode"
+- required: columns that must not be null
+- ranges: column -> (min, max), inclusive
+- allowed_values: column -> list of accepted values
+- validations: extra rule dictionaries for utils/validation.py (e.g. patterns)
+- casing: column -> "lower", "upper" or "title" (values are also trimmed)
+- partition_by: date column; the output is also written as year/month
+  partitions under data/prepared/<partition_dir>/ (see utils/partitions.py)
+
+compile_rules() turns a rule set into a CleaningPlan: an ordered list of steps
+that run over a DataScrubber. Related rules are batched into one vectorized
+operation: one fillna for all fills, and one bitmask validation pass for all
+required, range, allowed-value and extra rules. Rows failing validation are
+removed and kept on plan.validation so callers can write a reject file.
+The type and casing steps transform their columns concurrently when the plan
+runs with max_workers > 1 (see DataScrubber.transform_columns()).
+
+Adding a new source table means adding an entry to TABLE_RULES and running
+scripts/data_preparation/prepare_data.py with the table name.
+
+Example:
+    from utils.cleaning_rules import TABLE_RULES, compile_rules
+    plan = compile_rules(TABLE_RULES["customers"])
+    cleaned_df = plan.run(raw_df)
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.data_scrubber import DataScrubber
+from utils.logger import logger
+from utils.validation import ValidationResult, rules_from_table, validate
+
+TABLE_RULES: Dict[str, Dict[str, Any]] = {
+    "customers": {
+        "input_file": "customers_data.csv",
+        "output_file": "customers_prepared.csv",
+        "column_names": "strip",
+        "key_columns": ["CustomerID"],
+        "required": ["CustomerID"],
+        "fill": {"Name": "Unknown", "membership_status": "Unknown", "Loyalty Points": "median"},
+        "ranges": {"Loyalty Points": (0, 100_000)},
+        "allowed_values": {"CustomerSegment": ["Regular", "VIP"]},
+        "casing": {"Region": "title", "membership_status": "title"},
+    },
+    "products": {
+        "input_file": "products_data.csv",
+        "output_file": "products_prepared.csv",
+        "column_names": "snake",
+        "key_columns": ["productid"],
+        "required": ["productid"],
+        "fill": {"productname": "Unknown Product", "product_condition": "Unknown",
+                 "category": "mode", "unitprice": "median", "stockquantity": 0},
+        "ranges": {"unitprice": (0, 100_000), "stockquantity": (0, 1_000_000)},
+        "casing": {"category": "title", "subcategory": "title", "product_condition": "title"},
+    },
+    "sales": {
+        "input_file": "sales_data.csv",
+        "output_file": "sales_prepared.csv",
+        "column_names": "strip",
+        "types": {"SaleAmount": "numeric"},
+        "key_columns": ["TransactionID"],
+        "required": ["TransactionID", "CustomerID", "ProductID", "SaleAmount"],
+        "fill": {"CampaignID": 0, "DiscountPercent": 0, "sales_channel": "Unknown", "PaymentType": "Unknown"},
+        "ranges": {"SaleAmount": (0, 1_000_000), "DiscountPercent": (0, 100)},
+        "casing": {"sales_channel": "title", "PaymentType": "title"},
+        "partition_by": "SaleDate",
+        "partition_dir": "sales",
+    },
+}
+
+FILL_STRATEGIES: Dict[str, Callable[[pd.Series], Any]] = {
+    # Over the numeric values only; malformed text is left for the range check to reject
+    "median": lambda s: pd.to_numeric(s, errors="coerce").median(),
+    "mean": lambda s: pd.to_numeric(s, errors="coerce").mean(),
+    "mode": lambda s: s.mode().iloc[0] if not s.mode().empty else None,
+}
+
+Step = Tuple[str, Callable[[DataScrubber], None]]
+
+
+class CleaningPlan:
+    """An ordered list of named steps that clean a DataFrame through a DataScrubber."""
+
+    def __init__(self, steps: List[Step]):
+        self.steps = steps
+        self.validation: Optional[ValidationResult] = None  # Set by the validate step on each run
+
+    def describe(self) -> List[str]:
+        """Return the step names in execution order."""
+        return [name for name, _ in self.steps]
+
+    def run(self, df: pd.DataFrame, max_workers: int = 1) -> pd.DataFrame:
+        """Run every step in order and return the cleaned DataFrame; max_workers threads transform columns."""
+        scrubber = DataScrubber(df.copy(), max_workers=max_workers)
+        for name, step in self.steps:
+            rows_before = len(scrubber.df)
+            step(scrubber)
+            logger.info(f"Step '{name}': {rows_before} -> {len(scrubber.df)} rows")
+        return scrubber.df
+
+
+def _clean_column_names(style: str) -> Step:
+    def step(scrubber: DataScrubber) -> None:
+        columns = scrubber.df.columns.str.strip()
+        if style == "snake":
+            columns = columns.str.lower().str.replace(' ', '_')
+        scrubber.df.columns = columns
+    return f"column_names:{style}", step
+
+
+def _convert_types(types: Dict[str, str]) -> Step:
+    def convert(dtype: str) -> Callable[[pd.Series], pd.Series]:
+        if dtype == "numeric":
+            return lambda series: pd.to_numeric(series, errors="coerce")
+        return lambda series: series.astype(dtype)
+
+    def step(scrubber: DataScrubber) -> None:
+        scrubber.transform_columns({column: convert(dtype) for column, dtype in types.items()})
+    return "types", step
+
+
+def _remove_duplicates(key_columns: List[str]) -> Step:
+    def step(scrubber: DataScrubber) -> None:
+        scrubber.remove_duplicates(subset=key_columns or None)
+    return "deduplicate", step
+
+
+def _fill_missing(fill: Dict[str, Any]) -> Step:
+    def step(scrubber: DataScrubber) -> None:
+        # Strategies are resolved against the current data, then applied in one fillna
+        values = {}
+        for column, rule in fill.items():
+            if column not in scrubber.df.columns:
+                raise ValueError(f"Column '{column}' not found in the DataFrame.")
+            values[column] = FILL_STRATEGIES[rule](scrubber.df[column]) if rule in FILL_STRATEGIES else rule
+        scrubber.handle_missing_data(fill_value=values)
+    return "fill", step
+
+
+def _validate_rows(plan: "CleaningPlan", validation_rules: List[Dict[str, Any]]) -> Step:
+    def step(scrubber: DataScrubber) -> None:
+        result = validate(scrubber.df, validation_rules)
+        for name, count in result.counts().items():
+            if count:
+                logger.info(f"Validation rule '{name}' rejected {count} rows")
+        plan.validation = result
+        scrubber.df = result.valid_rows()
+    return "validate", step
+
+
+def _apply_casing(casing: Dict[str, str]) -> Step:
+    def step(scrubber: DataScrubber) -> None:
+        scrubber.df = scrubber.df.copy()  # Avoid writing into a filtered view
+        scrubber.format_column_strings(casing)
+    return "casing", step
+
+
+def compile_rules(rules: Dict[str, Any]) -> CleaningPlan:
+    """
+    Compile a table's declarative rules into an executable CleaningPlan.
+
+    Steps run in a fixed order: column names, types, duplicates, fills,
+    validation, casing. Rule kinds that are not declared are skipped.
+
+    Raises:
+        ValueError: If a rule uses an unknown column-name or casing style.
+    """
+    column_names = rules.get("column_names", "strip")
+    if column_names not in ("strip", "snake"):
+        raise ValueError(f"Unknown column_names style: {column_names}")
+    for column, style in rules.get("casing", {}).items():
+        if style not in ("lower", "upper", "title"):
+            raise ValueError(f"Unknown casing '{style}' for column '{column}'.")
+
+    steps: List[Step] = [_clean_column_names(column_names)]
+    plan = CleaningPlan(steps)
+    if rules.get("types"):
+        steps.append(_convert_types(rules["types"]))
+    if "key_columns" in rules:
+        steps.append(_remove_duplicates(rules["key_columns"]))
+    if rules.get("fill"):
+        steps.append(_fill_missing(rules["fill"]))
+    validation_rules = rules_from_table(rules)
+    if validation_rules:
+        steps.append(_validate_rows(plan, validation_rules))
+    if rules.get("casing"):
+        steps.append(_apply_casing(rules["casing"]))
+    return plan
@@ -0,0 +1,276 @@
+"""
+utils/columnar_reader.py
+
+Streaming reader from sqlite3 cursors into typed columns.
+
+pd.read_sql_query() fetches every row as a Python tuple and only then builds
+a DataFrame, so the whole result exists twice and is converted row by row.
+This reader pulls rows with fetchmany() in large batches. Each batch is
+copied once into an object matrix and its columns are converted into
+freshly allocated typed buffers:
+- INTEGER values: int64 (float64 if the batch holds NULLs, as pandas does)
+- REAL values: float64 (NULL -> NaN)
+- TEXT values: int32 codes into a per-column dictionary that only grows,
+  so codes from earlier batches stay valid (exposed as pd.Categorical)
+- anything else (BLOBs, mixed types): object
+Callers that know a column's type can pass kinds={"col": "date"} and the like.
+
+Batches can be consumed as they arrive, before the query finishes:
+- iter_sql_frames(): pandas DataFrame chunks
+- iter_record_batches(): pyarrow RecordBatches (pyarrow is optional and only
+  imported here)
+read_sql_columnar() is a drop-in for pd.read_sql_query(sql, conn, params=...)
+that keeps only one batch of row tuples alive at a time.
+
+Example:
+    from utils.columnar_reader import iter_sql_frames, read_sql_columnar
+    for chunk in iter_sql_frames(conn, "SELECT store_id, total_revenue FROM sale_fact"):
+        totals = totals.add(chunk.groupby("store_id")["total_revenue"].sum(), fill_value=0)
+    df = read_sql_columnar(conn, "SELECT * FROM customer")
+"""
+
+import sqlite3
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+DEFAULT_BATCH_ROWS = 50_000
+
+# Column kind -> NumPy dtype of its buffer ("text" holds dictionary codes)
+KIND_DTYPES: Dict[str, Any] = {
+    "int": np.int64,
+    "float": np.float64,
+    "date": "datetime64[D]",
+    "text": np.int32,
+    "object": object,
+}
+
+
+class ColumnBatch:
+    """One fetched batch: a typed buffer per column plus the text dictionaries."""
+
+    def __init__(self, columns: List[str], kinds: List[str], buffers: List[np.ndarray], dictionaries: List[Dict[Any, int]]):
+        self.columns = columns
+        self.kinds = kinds
+        self.buffers = buffers
+        self.dictionaries = dictionaries
+
+    def __len__(self) -> int:
+        return len(self.buffers[0]) if self.buffers else 0
+
+    def column(self, index: int) -> Any:
+        """Column values as a NumPy array, or pd.Categorical for text."""
+        if self.kinds[index] == "text":
+            return pd.Categorical.from_codes(self.buffers[index], categories=list(self.dictionaries[index]))
+        return self.buffers[index]
+
+    def to_frame(self) -> pd.DataFrame:
+        return _frame(self.columns, [self.column(i) for i in range(len(self.columns))])
+
+
+def _frame(columns: List[str], values: List[Any]) -> pd.DataFrame:
+    """Build a DataFrame by position, so repeated column names (e.g. from joins) survive."""
+    df = pd.DataFrame(dict(enumerate(values)))
+    df.columns = columns
+    return df
+
+
+# pandas' inferred type of a batch (NULLs skipped) -> column kind
+_INFERRED_KINDS: Dict[str, str] = {
+    "integer": "int",
+    "floating": "float",
+    "mixed-integer-float": "float",
+    "decimal": "float",
+    "string": "text",
+    "empty": "null",
+}
+
+
+def _infer_kind(values: np.ndarray) -> str:
+    """Kind of one batch of a column; "null" if every value is NULL."""
+    kind = _INFERRED_KINDS.get(infer_dtype(values, skipna=True), "object")
+    if kind == "int" and pd.isna(values).any():
+        return "float"
+    return kind
+
+
+def _fill(values: np.ndarray, kind: str, dictionary: Dict[Any, int]) -> np.ndarray:
+    """Convert one batch of a column (an object array) into a new buffer of its kind."""
+    if kind == "text":
+        # Factorize the batch in C, then map only its distinct values onto the column dictionary
+        codes, uniques = pd.factorize(values)
+        mapping = np.fromiter((dictionary.setdefault(v, len(dictionary)) for v in uniques),
+                              dtype=np.int32, count=len(uniques))
+        return np.where(codes < 0, np.int32(-1), mapping[codes] if len(uniques) else codes).astype(np.int32)
+    if kind == "object":
+        return values.copy()  # Do not keep the whole batch matrix alive through a view
+    return values.astype(KIND_DTYPES[kind])  # NULL becomes NaN / NaT for float and date buffers
+
+
+def iter_column_batches(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    kinds: Optional[Mapping[str, str]] = None,
+) -> Iterator[ColumnBatch]:
+    """
+    Run a query and yield its rows as typed column batches.
+
+    Args:
+        conn (sqlite3.Connection): Warehouse connection.
+        sql (str): Query text.
+        params (sequence, optional): Bound parameters.
+        batch_rows (int): Rows per fetchmany() call.
+        kinds (mapping, optional): Column -> "int", "float", "date", "text" or "object";
+            other columns are inferred per batch.
+    """
+    cursor = conn.execute(sql, params or [])
+    yield from _iter_cursor(cursor, batch_rows, kinds)
+
+
+def _iter_cursor(cursor: sqlite3.Cursor, batch_rows: int, kinds: Optional[Mapping[str, str]]) -> Iterator[ColumnBatch]:
+    columns = [description[0] for description in cursor.description]
+    fixed = [(kinds or {}).get(name) for name in columns]
+    dictionaries: List[Dict[Any, int]] = [{} for _ in columns]
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            matrix = np.empty((len(rows), len(columns)), dtype=object)
+            matrix[:] = rows  # One C-level pass; no per-column tuples
+            del rows
+            batch_kinds, buffers = [], []
+            for i in range(len(columns)):
+                kind = fixed[i] or _infer_kind(matrix[:, i])
+                buffers.append(_fill(matrix[:, i], "object" if kind == "null" else kind, dictionaries[i]))
+                batch_kinds.append(kind)
+            del matrix
+            yield ColumnBatch(columns, batch_kinds, buffers, dictionaries)
+    finally:
+        cursor.close()
+
+
+def iter_sql_frames(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    kinds: Optional[Mapping[str, str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield a query's rows as DataFrame chunks of up to batch_rows rows."""
+    for batch in iter_column_batches(conn, sql, params, batch_rows, kinds):
+        yield batch.to_frame()
+
+
+def iter_record_batches(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    kinds: Optional[Mapping[str, str]] = None,
+) -> Iterator[Any]:
+    """
+    Yield a query's rows as pyarrow RecordBatches; text columns become dictionary arrays.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    import pyarrow as pa
+
+    for batch in iter_column_batches(conn, sql, params, batch_rows, kinds):
+        arrays = []
+        for i, kind in enumerate(batch.kinds):
+            buffer = batch.buffers[i]
+            if kind == "text":
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(buffer, mask=buffer < 0), pa.array(list(batch.dictionaries[i]), type=pa.string())))
+            elif kind == "float":
+                arrays.append(pa.array(buffer, from_pandas=True))  # NaN -> null
+            else:
+                arrays.append(pa.array(buffer))
+        yield pa.RecordBatch.from_arrays(arrays, names=batch.columns)
+
+
+def _combine(pieces: List[Tuple[str, np.ndarray]], dictionary: Dict[Any, int]) -> Any:
+    """Concatenate one column's batches, promoting to a common kind."""
+    kinds = {kind for kind, _ in pieces} - {"null"}
+    if kinds <= {"int", "float"} and kinds:
+        dtype = np.int64 if kinds == {"int"} and all(kind == "int" for kind, _ in pieces) else np.float64
+        return np.concatenate([np.full(len(b), np.nan) if kind == "null" else b for kind, b in pieces]).astype(dtype)
+    if kinds == {"date"}:
+        return np.concatenate([b.astype("datetime64[D]") if kind == "null" else b for kind, b in pieces])
+    if kinds == {"text"}:
+        codes = np.concatenate([np.full(len(b), -1, dtype=np.int32) if kind == "null" else b for kind, b in pieces])
+        return pd.Categorical.from_codes(codes, categories=list(dictionary))
+    # Mixed or untyped: fall back to Python objects
+    values = list(dictionary)
+    decoded = [
+        np.array([None if c < 0 else values[c] for c in b], dtype=object) if kind == "text" else b.astype(object)
+        for kind, b in pieces
+    ]
+    return np.concatenate(decoded) if decoded else np.empty(0, dtype=object)
+
+
+def _read_columns(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Optional[Sequence[Any]],
+    batch_rows: int,
+    kinds: Optional[Mapping[str, str]],
+) -> Tuple[List[str], List[Any]]:
+    """Stream a whole result and return (column names, combined column values)."""
+    cursor = conn.execute(sql, params or [])
+    columns = [description[0] for description in cursor.description]
+    pieces: List[List[Tuple[str, np.ndarray]]] = [[] for _ in columns]
+    dictionaries: List[Dict[Any, int]] = [{} for _ in columns]
+    for batch in _iter_cursor(cursor, batch_rows, kinds):
+        dictionaries = batch.dictionaries
+        for i, kind in enumerate(batch.kinds):
+            pieces[i].append((kind, batch.buffers[i]))
+
+    values = []
+    for i, name in enumerate(columns):
+        if pieces[i]:
+            values.append(_combine(pieces[i], dictionaries[i]))
+            continue
+        kind = (kinds or {}).get(name, "object")  # No rows: empty column of the hinted kind
+        values.append(pd.Categorical([]) if kind == "text" else np.empty(0, dtype=KIND_DTYPES[kind]))
+    return columns, values
+
+
+def read_sql_columns(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    kinds: Optional[Mapping[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Read a whole query result as one typed array per column.
+
+    Returns:
+        dict: Column name -> NumPy array, or pd.Categorical for text columns.
+    """
+    columns, values = _read_columns(conn, sql, params, batch_rows, kinds)
+    return dict(zip(columns, values))
+
+
+def read_sql_columnar(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    kinds: Optional[Mapping[str, str]] = None,
+) -> pd.DataFrame:
+    """
+    Read a whole query result into a DataFrame of typed columns.
+
+    Text columns are categoricals; a column whose batches disagree on type
+    (e.g. text and numbers) is returned as object.
+    """
+    columns, values = _read_columns(conn, sql, params, batch_rows, kinds)
+    return _frame(columns, values)
@@ -0,0 +1,254 @@
+"""
+utils/customer_analytics.py
+
+Customer RFM scores and join-month cohort retention stored in the data warehouse.
+
+Purchase history is kept per customer and calendar month in the
+customer_activity table (sale count, revenue, first and last sale date).
+scripts/etl_to_dw.py adds every loaded chunk of sales into it: the chunk is
+sorted once by customer, month and date, and each run of equal keys is
+reduced with NumPy (summarize_customer_activity()). Sales without a
+parseable date are left out.
+
+At the end of the load, refresh_customer_tables() derives two small tables
+from customer_activity and the customer dimension, without reading sales:
+- customer_rfm: per customer with sales, recency (days before the latest
+  sale in the warehouse), frequency (sales) and monetary value (revenue),
+  their 1-5 quintile scores (5 = most recent, most frequent, highest spend)
+  and the combined rfm_code (e.g. "545"), with the customer's segment,
+  region, loyalty points and join month
+- customer_cohort: per segment, join month and months since joining, the
+  cohort size, active customers and revenue. Every month from joining up to
+  the latest sale has a row, so cohorts can be summed across segments.
+  Purchases dated before the join month are not part of the cohort matrix.
+
+The rfm_segments and cohort_retention aggregates in utils/olap_queries.py
+read these tables.
+
+Example:
+    from utils.customer_analytics import apply_customer_activity, summarize_customer_activity
+    apply_customer_activity(cursor, summarize_customer_activity(customer_ids, sale_dates, revenue))
+    refresh_customer_tables(conn)
+"""
+
+import sqlite3
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.columnar_reader import read_sql_columnar
+from utils.measures import PREPARED_DATE_FORMAT
+
+CUSTOMER_ANALYTICS_SQL: List[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS customer_activity (
+        customer_id INTEGER NOT NULL,
+        activity_month TEXT NOT NULL,
+        first_sale_date TEXT NOT NULL,
+        last_sale_date TEXT NOT NULL,
+        sale_count INTEGER NOT NULL,
+        total_revenue REAL NOT NULL,
+        PRIMARY KEY (customer_id, activity_month)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS customer_rfm (
+        customer_id INTEGER PRIMARY KEY,
+        customer_segment TEXT,
+        region TEXT,
+        loyalty_points INTEGER,
+        join_month TEXT,
+        first_sale_date TEXT,
+        last_sale_date TEXT,
+        recency_days INTEGER,
+        frequency INTEGER,
+        monetary REAL,
+        r_score INTEGER,
+        f_score INTEGER,
+        m_score INTEGER,
+        rfm_code TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS customer_cohort (
+        customer_segment TEXT,
+        cohort_month TEXT NOT NULL,
+        months_since_join INTEGER NOT NULL,
+        cohort_size INTEGER NOT NULL,
+        active_customers INTEGER NOT NULL,
+        total_revenue REAL NOT NULL
+    )
+    """,
+]
+
+ACTIVITY_COLUMNS: List[str] = [
+    "customer_id", "activity_month", "first_sale_date", "last_sale_date", "sale_count", "total_revenue",
+]
+RFM_COLUMNS: List[str] = [
+    "customer_id", "customer_segment", "region", "loyalty_points", "join_month", "first_sale_date",
+    "last_sale_date", "recency_days", "frequency", "monetary", "r_score", "f_score", "m_score", "rfm_code",
+]
+COHORT_COLUMNS: List[str] = [
+    "customer_segment", "cohort_month", "months_since_join", "cohort_size", "active_customers", "total_revenue",
+]
+
+
+def _run_starts(*sorted_keys: np.ndarray) -> np.ndarray:
+    """Start positions of the runs of equal keys in arrays sorted by those keys."""
+    n = len(sorted_keys[0])
+    boundary = np.zeros(n, dtype=bool)
+    if n:
+        boundary[0] = True
+        for key in sorted_keys:
+            boundary[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(boundary)
+
+
+def summarize_customer_activity(customer_ids: pd.Series, sale_dates: pd.Series, revenue: pd.Series) -> pd.DataFrame:
+    """
+    Reduce a chunk of sales to one row per customer and month.
+
+    Args:
+        customer_ids (pd.Series): Customer of each sale.
+        sale_dates (pd.Series): ISO sale dates (missing for unparseable dates).
+        revenue (pd.Series): Revenue of each sale.
+
+    Returns:
+        pd.DataFrame: ACTIVITY_COLUMNS rows.
+    """
+    dates = pd.to_datetime(sale_dates, errors="coerce")
+    ids = pd.to_numeric(customer_ids, errors="coerce")
+    keep = (dates.notna() & ids.notna()).to_numpy()
+    customer = ids.to_numpy()[keep].astype(np.int64)
+    day = dates.to_numpy()[keep].astype("datetime64[D]")
+    month = day.astype("datetime64[M]")
+    amount = pd.to_numeric(revenue, errors="coerce").fillna(0).to_numpy(dtype=np.float64)[keep]
+
+    order = np.lexsort((day, month, customer))  # Last key is the primary sort key
+    customer, month, day, amount = customer[order], month[order], day[order], amount[order]
+    starts = _run_starts(customer, month)
+    ends = np.append(starts[1:], len(customer)) - 1
+    return pd.DataFrame({
+        "customer_id": customer[starts],
+        "activity_month": np.datetime_as_string(month[starts], unit="M"),
+        "first_sale_date": np.datetime_as_string(day[starts], unit="D"),
+        "last_sale_date": np.datetime_as_string(day[ends], unit="D"),
+        "sale_count": np.diff(np.append(starts, len(customer))),
+        "total_revenue": np.add.reduceat(amount, starts) if len(starts) else np.empty(0),
+    }, columns=ACTIVITY_COLUMNS)
+
+
+def apply_customer_activity(cursor: sqlite3.Cursor, activity_df: pd.DataFrame) -> None:
+    """Add a chunk's customer-month rows into customer_activity inside the caller's transaction."""
+    cursor.executemany(
+        f"INSERT INTO customer_activity ({', '.join(ACTIVITY_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in ACTIVITY_COLUMNS)}) "
+        "ON CONFLICT (customer_id, activity_month) DO UPDATE SET "
+        "first_sale_date = MIN(first_sale_date, excluded.first_sale_date), "
+        "last_sale_date = MAX(last_sale_date, excluded.last_sale_date), "
+        "sale_count = sale_count + excluded.sale_count, "
+        "total_revenue = total_revenue + excluded.total_revenue",
+        activity_df[ACTIVITY_COLUMNS].astype(object).itertuples(index=False, name=None),
+    )
+
+
+def quintile_scores(values: pd.Series, higher_is_better: bool = True) -> pd.Series:
+    """Score values 1-5 by quintile of their rank; equal values share a score."""
+    ranks = (values if higher_is_better else -values).rank(method="average", pct=True)
+    return np.ceil(ranks * 5).clip(1, 5).astype("int64")
+
+
+def _month_number(months: np.ndarray) -> np.ndarray:
+    return months.astype("datetime64[M]").astype(np.int64)
+
+
+def build_customer_tables(activity_df: pd.DataFrame, customers_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Derive the customer_rfm and customer_cohort rows.
+
+    Args:
+        activity_df (pd.DataFrame): customer_activity rows.
+        customers_df (pd.DataFrame): customer_id, customer_segment, region, loyalty_points, join_date.
+
+    Returns:
+        tuple: (customer_rfm rows, customer_cohort rows)
+    """
+    customers = customers_df.drop_duplicates("customer_id").set_index("customer_id")
+    # join_date is stored as in the prepared file (e.g. 2/25/2024); other layouts become unknown join months
+    join_dates = pd.to_datetime(customers["join_date"], format=PREPARED_DATE_FORMAT, errors="coerce")
+    join_month = join_dates.to_numpy().astype("datetime64[M]")
+
+    activity = activity_df.sort_values(["customer_id", "activity_month"], kind="stable")
+    customer = activity["customer_id"].to_numpy(dtype=np.int64)
+    starts = _run_starts(customer)
+    ends = np.append(starts[1:], len(customer)) - 1
+    last = activity["last_sale_date"].to_numpy().astype("datetime64[D]")
+    first = activity["first_sale_date"].to_numpy().astype("datetime64[D]")
+    as_of = last.max() if len(last) else np.datetime64("NaT", "D")
+
+    # Months are sorted inside each customer, so the first and last rows bound the sale dates
+    rfm = pd.DataFrame({
+        "customer_id": customer[starts],
+        "first_sale_date": np.datetime_as_string(first[starts], unit="D"),
+        "last_sale_date": np.datetime_as_string(last[ends], unit="D"),
+        "recency_days": (as_of - last[ends]).astype(np.int64),
+        "frequency": np.add.reduceat(activity["sale_count"].to_numpy(dtype=np.int64), starts) if len(starts) else [],
+        "monetary": np.add.reduceat(activity["total_revenue"].to_numpy(dtype=np.float64), starts) if len(starts) else [],
+    })
+    rfm["r_score"] = quintile_scores(rfm["recency_days"], higher_is_better=False)
+    rfm["f_score"] = quintile_scores(rfm["frequency"])
+    rfm["m_score"] = quintile_scores(rfm["monetary"])
+    rfm["rfm_code"] = rfm["r_score"].astype(str) + rfm["f_score"].astype(str) + rfm["m_score"].astype(str)
+    profile = pd.DataFrame({
+        "customer_segment": customers["customer_segment"],
+        "region": customers["region"],
+        "loyalty_points": customers["loyalty_points"],
+        "join_month": pd.Series(np.datetime_as_string(join_month, unit="M"), index=customers.index).where(~np.isnat(join_month)),
+        "join_month_value": join_month,
+    })
+    rfm = rfm.join(profile, on="customer_id")
+
+    # Cohorts: every (segment, join month) from month 0 up to the month of the latest sale
+    known = profile.dropna(subset=["join_month"])
+    sizes = known.groupby(["customer_segment", "join_month"], dropna=False).size().rename("cohort_size").reset_index()
+    spans = np.ones(len(sizes), dtype=np.int64)
+    if not np.isnat(as_of):
+        spans += np.maximum(_month_number(as_of) - _month_number(sizes["join_month"].to_numpy()), 0)
+    grid = sizes.loc[sizes.index.repeat(spans)].reset_index(drop=True)
+    grid["months_since_join"] = np.arange(len(grid)) - np.repeat(np.cumsum(spans) - spans, spans)
+
+    joined = activity.join(known[["customer_segment", "join_month", "join_month_value"]], on="customer_id", how="inner")
+    joined["months_since_join"] = (_month_number(joined["activity_month"].to_numpy().astype("datetime64[M]"))
+                                   - _month_number(joined["join_month_value"].to_numpy()))
+    joined = joined[joined["months_since_join"] >= 0]
+    # Each customer has one activity row per month, so counting rows counts distinct customers
+    active = (joined.groupby(["customer_segment", "join_month", "months_since_join"], dropna=False)
+              .agg(active_customers=("customer_id", "size"), total_revenue=("total_revenue", "sum"))
+              .reset_index())
+    cohort = grid.merge(active, on=["customer_segment", "join_month", "months_since_join"], how="left")
+    cohort = cohort.fillna({"active_customers": 0, "total_revenue": 0.0}).rename(columns={"join_month": "cohort_month"})
+    cohort["active_customers"] = cohort["active_customers"].astype("int64")
+    return rfm[RFM_COLUMNS], cohort[COHORT_COLUMNS]
+
+
+def refresh_customer_tables(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """
+    Rewrite customer_rfm and customer_cohort from customer_activity inside the caller's transaction.
+
+    Returns:
+        tuple: (customer_rfm rows, customer_cohort rows)
+    """
+    activity_df = read_sql_columnar(conn, f"SELECT {', '.join(ACTIVITY_COLUMNS)} FROM customer_activity",
+                                    kinds={"activity_month": "object", "first_sale_date": "object",
+                                           "last_sale_date": "object"})
+    customers_df = pd.read_sql_query(
+        "SELECT customer_id, customer_segment, region, loyalty_points, join_date FROM customer", conn)
+    rfm, cohort = build_customer_tables(activity_df, customers_df)
+    for table, frame in (("customer_rfm", rfm), ("customer_cohort", cohort)):
+        conn.execute(f"DELETE FROM {table}")
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(frame.columns)}) VALUES ({', '.join('?' for _ in frame.columns)})",
+            frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None),
+        )
+    return len(rfm), len(cohort)
@@ -13,6 +13,22 @@ This class provides methods for:
 - Formatting strings
 - Parsing date fields
 
+String formatting works on distinct values only: each column is factorized
+into integer codes plus its unique values, the string operation runs on the
+unique values (or the categories of a categorical column), and the results
+are mapped back by code. A column with millions of rows but ten distinct
+values costs about as much to normalize as those ten values. Columns whose
+values are mostly distinct (judged from a sample) are transformed directly,
+since factorizing them would only add work.
+
+Per-column transformations (convert_column_types(), format_column_strings())
+can run concurrently: with max_workers > 1 each column is transformed on a
+thread pool, reading only its own column, and the results are assigned back
+to the DataFrame in column order once all of them are done. The result is
+the same as with sequential processing; the NumPy/pandas kernels doing the
+work release the GIL for much of it, so wide tables are cleaned in less wall
+time.
+
 Use this class to perform similar cleaning operations across multiple files.  
 You are not required to use this class, but it shows how we can organize 
 reusable data cleaning logic - or you can use the logic examples in your own code.
@@ -21,15 +37,106 @@ Example:
     from utils.data_scrubber import DataScrubber
     scrubber = DataScrubber(df)
     df = scrubber.remove_duplicates().handle_missing_data(fill_value="N/A")
+    df = DataScrubber(df, max_workers=8).format_column_strings({"Region": "title", "Channel": "lower"})
 """
 
+import concurrent.futures
 import io
+import numpy as np
 import pandas as pd
-from typing import Dict, Tuple, Union, List
+from typing import Callable, Dict, Tuple, Union, List, Optional
+
+DISTINCT_SAMPLE_ROWS = 10_000  # Rows sampled to estimate a column's cardinality
+MOSTLY_DISTINCT_RATIO = 0.5  # Above this share of distinct values, map_unique_values() skips factorizing
+
+
+def _mostly_distinct(series: pd.Series) -> bool:
+    """Estimate from an evenly spaced sample whether most values of a column are distinct."""
+    step = max(1, len(series) // DISTINCT_SAMPLE_ROWS)
+    sample = series.iloc[::step].dropna()
+    return len(sample) > 0 and sample.nunique() / len(sample) > MOSTLY_DISTINCT_RATIO
+
+
+def map_unique_values(series: pd.Series, func: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Apply a vectorized Series transform to the distinct values of a column only.
+
+    Categorical columns stay categorical (categories that become equal are
+    merged); other columns come back as object dtype. Missing values stay missing.
+    When a sample shows most values are distinct (e.g. ids or free text),
+    factorizing saves nothing, so the transform runs on the values directly.
+
+    Args:
+        series (pd.Series): Column to transform.
+        func (callable): Transform for a Series of values, e.g. lambda s: s.str.strip().str.title().
+
+    Returns:
+        pd.Series: The transformed column, same index and name.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        transformed = func(pd.Series(series.cat.categories, dtype=object))
+        new_codes, new_categories = pd.factorize(transformed, use_na_sentinel=True)
+        remapped = np.where(codes >= 0, new_codes[codes] if len(new_codes) else -1, -1)
+        return pd.Series(pd.Categorical.from_codes(remapped, categories=new_categories), index=series.index, name=series.name)
+
+    if _mostly_distinct(series):
+        values = series.to_numpy(dtype=object).copy()
+        present = series.notna().to_numpy()
+        values[present] = func(pd.Series(values[present], dtype=object)).to_numpy(dtype=object)
+        return pd.Series(values, index=series.index, name=series.name, dtype=object)
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if len(uniques) == 0:
+        return series.astype(object)  # Empty or all missing: nothing to transform
+    transformed = func(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+    values = transformed.take(codes)
+    missing = codes < 0
+    if missing.any():
+        values[missing] = series.to_numpy(dtype=object)[missing]  # Keep None / NaN as they were
+    return pd.Series(values, index=series.index, name=series.name, dtype=object)
+
+
+# String formats for format_column_strings(): style -> transform of the distinct values
+STRING_FORMATS: Dict[str, Callable[[pd.Series], pd.Series]] = {
+    "lower": lambda s: s.str.lower().str.strip(),
+    "upper": lambda s: s.str.upper().str.strip(),
+    "title": lambda s: s.str.strip().str.title(),
+}
+
 
 class DataScrubber:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, max_workers: int = 1):
         self.df = df
+        self.max_workers = max_workers  # Threads for per-column transforms; 1 runs them in sequence
+
+    def transform_columns(self, transforms: Dict[str, Callable[[pd.Series], pd.Series]]) -> pd.DataFrame:
+        """
+        Replace each column with a transform of itself, concurrently when max_workers > 1.
+
+        Every transform gets only its own column, so transforms never share
+        data; the DataFrame is written on the calling thread once all are done.
+
+        Args:
+            transforms (dict): Column -> function from the column to its new values.
+
+        Returns:
+            pd.DataFrame: The updated DataFrame.
+        """
+        for column in transforms:
+            if column not in self.df.columns:
+                raise ValueError(f"Column '{column}' not found in the DataFrame.")
+        columns = {column: self.df[column] for column in transforms}
+        workers = min(self.max_workers, len(transforms))
+        if workers > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrubber") as pool:
+                futures = {column: pool.submit(func, columns[column]) for column, func in transforms.items()}
+                results = {column: future.result() for column, future in futures.items()}
+        else:
+            results = {column: func(columns[column]) for column, func in transforms.items()}
+        for column, values in results.items():
+            self.df[column] = values
+        return self.df
 
     def check_data_consistency_before_cleaning(self) -> Dict[str, Union[pd.Series, int]]:
         null_counts = self.df.isnull().sum()
@@ -65,18 +172,35 @@ class DataScrubber:
     def format_column_strings_to_lower_and_trim(self, column: str) -> pd.DataFrame:
         if column not in self.df.columns:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
-        self.df[column] = self.df[column].str.lower().str.strip()
+        self.df[column] = map_unique_values(self.df[column], STRING_FORMATS["lower"])
         return self.df
 
     def format_column_strings_to_upper_and_trim(self, column: str) -> pd.DataFrame:
         if column not in self.df.columns:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
-        self.df[column] = self.df[column].str.upper().str.strip()
+        self.df[column] = map_unique_values(self.df[column], STRING_FORMATS["upper"])
+        return self.df
+
+    def format_column_strings_to_title_and_trim(self, column: str) -> pd.DataFrame:
+        if column not in self.df.columns:
+            raise ValueError(f"Column name '{column}' not found in the DataFrame.")
+        self.df[column] = map_unique_values(self.df[column], STRING_FORMATS["title"])
         return self.df
 
-    def handle_missing_data(self, drop: bool = False, fill_value: Union[None, float, int, str] = None) -> pd.DataFrame:
+    def format_column_strings(self, styles: Dict[str, str]) -> pd.DataFrame:
+        """Trim and recase several columns at once; styles maps column -> "lower", "upper" or "title"."""
+        for column, style in styles.items():
+            if style not in STRING_FORMATS:
+                raise ValueError(f"Unknown string format '{style}' for column '{column}'.")
+        return self.transform_columns({
+            column: lambda series, func=STRING_FORMATS[style]: map_unique_values(series, func)
+            for column, style in styles.items()
+        })
+
+    def handle_missing_data(self, drop: bool = False, fill_value: Union[None, float, int, str, Dict[str, object]] = None,
+                            subset: Optional[List[str]] = None) -> pd.DataFrame:
         if drop:
-            self.df = self.df.dropna()
+            self.df = self.df.dropna(subset=subset)
         elif fill_value is not None:
             self.df = self.df.fillna(fill_value)
         return self.df
@@ -94,8 +218,8 @@ class DataScrubber:
         self.df['StandardDateTime'] = pd.to_datetime(self.df[column])
         return self.df
 
-    def remove_duplicates(self) -> pd.DataFrame:
-        self.df = self.df.drop_duplicates()
+    def remove_duplicates(self, subset: Optional[List[str]] = None) -> pd.DataFrame:
+        self.df = self.df.drop_duplicates(subset=subset)
         return self.df
 
     def rename_columns(self, column_mapping: Dict[str, str]) -> pd.DataFrame:
@@ -117,8 +241,6 @@ class DataScrubber:
         return self.df
 
     def convert_column_types(self, column_types: Dict[str, type]) -> pd.DataFrame:
-        for col, dtype in column_types.items():
-            if col not in self.df.columns:
-                raise ValueError(f"Column '{col}' not found in the DataFrame.")
-            self.df[col] = self.df[col].astype(dtype)
-        return self.df
+        return self.transform_columns({
+            col: lambda series, dtype=dtype: series.astype(dtype) for col, dtype in column_types.items()
+        })
@@ -0,0 +1,171 @@
+"""
+utils/fact_query.py
+
+Column-pruned, filtered reads of row-level sales from the data warehouse.
+
+Analysis scripts that need individual sales (not a named aggregate from
+utils/olap_queries.py) describe what they want instead of writing SQL:
+- columns: only these are selected, and the customer / product tables are
+  only joined when a requested column or filter needs them
+- filters: segment, region, category, channel, year, quarter, store,
+  campaign, a start / end sale date range and "dated" (drop sales without a parseable
+  date). They become WHERE predicates with bound parameters, so rows that
+  would be filtered out are never transferred.
+
+Rows are streamed by utils/columnar_reader.py, which converts each
+fetchmany() batch straight into typed NumPy arrays:
+- ids: int64
+- numbers: float64 (NULL -> NaN)
+- dates: datetime64[D] (NULL -> NaT)
+- text: dictionary-encoded as a pd.Categorical (NULL -> missing)
+
+Only one batch of Python row tuples exists at a time; no object-dtype
+DataFrame is built.
+
+Text filters match case-insensitively, as in utils/olap_queries.py. A list
+value matches any of its items.
+
+Example:
+    from utils.fact_query import read_fact_frame
+    df = read_fact_frame(conn, ["sale_date", "sale_amount", "segment"], {"segment": "Regular", "dated": True})
+"""
+
+import sqlite3
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.columnar_reader import read_sql_columns
+from utils.olap_queries import FILTER_COLUMNS, RANGE_FILTERS, _iso_date
+from utils.query_cache import QueryCache, database_identity
+from utils.warehouse import read_cache_stamp
+
+FETCH_BATCH_ROWS = 10_000
+
+# Column name -> (SQL expression, kind). Kinds: id, number, date, text
+FACT_COLUMNS: Dict[str, Tuple[str, str]] = {
+    "sale_id": ("f.sale_id", "id"),
+    "customer_id": ("f.customer_id", "id"),
+    "product_id": ("f.product_id", "id"),
+    "store_id": ("f.store_id", "number"),
+    "campaign_id": ("f.campaign_id", "number"),
+    "sale_date": ("f.sale_date_iso", "date"),
+    "sale_year": ("f.sale_year", "number"),
+    "sale_quarter": ("f.sale_quarter", "number"),
+    "sale_month": ("f.sale_month", "number"),
+    "sale_dow": ("f.sale_dow", "number"),
+    "sale_amount": ("f.sale_amount", "number"),
+    "discount_percent": ("f.discount_percent", "number"),
+    "total_revenue": ("f.total_revenue", "number"),
+    "total_cost": ("f.total_cost", "number"),
+    "profit": ("f.profit", "number"),
+    "profit_margin": ("f.profit_margin", "number"),
+    "payment_type": ("f.payment_type", "text"),
+    "channel": ("COALESCE(f.sales_channel, 'Unknown')", "text"),
+    "segment": ("c.customer_segment", "text"),
+    "region": ("c.region", "text"),
+    "membership_status": ("c.membership_status", "text"),
+    "category": ("p.category", "text"),
+    "subcategory": ("p.subcategory", "text"),
+    "product_name": ("p.product_name", "text"),
+}
+
+_JOINS: Dict[str, str] = {
+    "c": "JOIN customer c ON c.customer_id = f.customer_id",
+    "p": "JOIN product p ON p.product_id = f.product_id",
+}
+
+# Fact column kind -> column kind of utils/columnar_reader.py
+_READER_KINDS: Dict[str, str] = {"id": "int", "number": "float", "date": "date", "text": "text"}
+
+Column = Union[np.ndarray, pd.Categorical]
+
+
+def build_fact_query(columns: Sequence[str], filters: Optional[Mapping[str, Any]] = None) -> Tuple[str, List[Any]]:
+    """
+    Build the SQL text and parameters that select only the requested columns and rows.
+
+    Raises:
+        ValueError: If a column or filter is unknown, or a filter value is invalid.
+    """
+    if not columns:
+        raise ValueError("At least one column must be requested.")
+    unknown = [c for c in columns if c not in FACT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+
+    clauses: List[str] = []
+    params: List[Any] = []
+    for key, raw_value in sorted((filters or {}).items()):
+        if key == "dated":
+            if raw_value:
+                clauses.append("f.sale_date_iso IS NOT NULL")
+            continue
+        if key in RANGE_FILTERS:
+            expression, operator = RANGE_FILTERS[key]
+            clauses.append(f"{expression} {operator} ?")
+            params.append(_iso_date(key, raw_value))
+            continue
+        if key not in FILTER_COLUMNS:
+            raise ValueError(f"Unsupported filter: {key}")
+        expression, value_type = FILTER_COLUMNS[key]
+        raw_values = list(raw_value) if isinstance(raw_value, (list, tuple, set)) else [raw_value]
+        try:
+            values = [value_type(v) for v in raw_values]
+        except (TypeError, ValueError):
+            raise ValueError(f"Filter '{key}' expects {value_type.__name__} values, got {raw_value!r}.")
+        collate = " COLLATE NOCASE" if value_type is str else ""
+        if len(values) == 1:
+            clauses.append(f"{expression}{collate} = ?")
+        else:
+            clauses.append(f"{expression}{collate} IN ({', '.join('?' for _ in values)})")
+        params.extend(values)
+
+    expressions = [FACT_COLUMNS[c][0] for c in columns]
+    used_text = " ".join(expressions + clauses)
+    joins = [join for alias, join in _JOINS.items() if f"{alias}." in used_text]
+    sql = f"SELECT {', '.join(f'{e} AS {c}' for e, c in zip(expressions, columns))} FROM sale_fact f"
+    if joins:
+        sql += " " + " ".join(joins)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    return sql, params
+
+
+def fetch_fact_columns(
+    conn: sqlite3.Connection,
+    columns: Sequence[str],
+    filters: Optional[Mapping[str, Any]] = None,
+    batch_rows: int = FETCH_BATCH_ROWS,
+) -> Dict[str, Column]:
+    """
+    Stream the selected sales into one typed array per column.
+
+    Returns:
+        dict: Column name -> NumPy array, or pd.Categorical for text columns.
+    """
+    sql, params = build_fact_query(columns, filters)
+    kinds = {name: _READER_KINDS[FACT_COLUMNS[name][1]] for name in columns}
+    return read_sql_columns(conn, sql, params, batch_rows=batch_rows, kinds=kinds)
+
+
+def read_fact_frame(
+    conn: sqlite3.Connection,
+    columns: Sequence[str],
+    filters: Optional[Mapping[str, Any]] = None,
+    cache: Optional[QueryCache] = None,
+) -> pd.DataFrame:
+    """
+    Read the selected sales as a DataFrame of typed columns.
+
+    With a cache, the result is reused until the warehouse version changes
+    (see utils/query_cache.py).
+    """
+    def compute() -> pd.DataFrame:
+        return pd.DataFrame(fetch_fact_columns(conn, columns, filters))
+
+    if cache is None:
+        return compute()
+    sql, params = build_fact_query(columns, filters)
+    return cache.get_or_compute(sql, params, read_cache_stamp(conn), compute, database=database_identity(conn))
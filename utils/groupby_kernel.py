@@ -0,0 +1,189 @@
+"""
+utils/groupby_kernel.py
+
+Per-group sums and counts without pandas groupby.
+
+pandas groupby().agg() hashes the key values (Python string objects for text
+keys) on every call. This kernel does the work on integers instead:
+1. Each key column is factorized once into small integer codes. The codes
+   are sorted, so groups come out in key order, as with groupby(sort=True).
+2. The codes are combined into one cell index per row (mixed radix, like
+   np.ravel_multi_index). When the key space is too large to index densely,
+   the combined index is compressed with np.unique instead.
+3. Each measure is summed per cell with np.bincount(cells, weights=values).
+   When numba is installed, all measures are summed in one compiled pass.
+
+A GroupIndex can be reused for several aggregations over the same keys.
+Aggregating an already aggregated frame again (fine cells -> coarser
+rollups) only touches the cells, not the original rows.
+
+Missing keys: rows with a missing key are dropped (dropna=True, as in
+pandas). With dropna=False, missing values form their own group, sorted
+last. Missing measure values count as 0, as in pandas sum(). Sums of integer
+columns are returned as int64 (exact while totals stay below 2**53).
+
+Example:
+    from utils.groupby_kernel import group_sums
+    df = group_sums(sales_df, ["Year", "Region"], {"Total_Revenue": "Total_Revenue"}, count="Sale_Count")
+"""
+
+import math
+from typing import Any, Callable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DENSE_CELL_LIMIT = 1 << 24  # Largest key space indexed directly (bincount buffers of this length)
+
+_numba_sums: Any = None  # Compiled kernel, False if numba is not installed, None until first use
+
+
+def _compiled_sums() -> Optional[Callable[[np.ndarray, np.ndarray, int], np.ndarray]]:
+    """Return the numba kernel that sums a (rows x measures) matrix per cell, or None without numba."""
+    global _numba_sums
+    if _numba_sums is None:
+        try:
+            import numba
+        except ImportError:
+            _numba_sums = False
+        else:
+            @numba.njit(nogil=True)
+            def sums(cells: np.ndarray, matrix: np.ndarray, n_cells: int) -> np.ndarray:
+                out = np.zeros((n_cells, matrix.shape[1]))
+                for i in range(cells.shape[0]):
+                    for j in range(matrix.shape[1]):
+                        value = matrix[i, j]
+                        if value == value:  # Skip NaN
+                            out[cells[i], j] += value
+                return out
+
+            _numba_sums = sums
+    return _numba_sums or None
+
+
+class GroupIndex:
+    """The rows of a frame mapped to the dense, sorted ids of their key combinations."""
+
+    def __init__(self, df: pd.DataFrame, keys: Sequence[str], dropna: bool = True):
+        if not keys:
+            raise ValueError("At least one key column is required.")
+        self.keys = list(keys)
+        self.uniques: List[Any] = []
+        codes: List[np.ndarray] = []
+        keep = np.ones(len(df), dtype=bool)
+        for key in self.keys:
+            key_codes, uniques = pd.factorize(df[key], sort=True, use_na_sentinel=False)
+            missing = np.flatnonzero(pd.isna(uniques))
+            if dropna and len(missing):
+                keep &= key_codes != missing[0]
+            codes.append(key_codes.astype(np.int64, copy=False))
+            self.uniques.append(uniques)
+
+        # Rows kept, or None when every row is kept (saves a copy of each measure)
+        self.rows: Optional[np.ndarray] = None if keep.all() else keep
+        if self.rows is not None:
+            codes = [key_codes[keep] for key_codes in codes]
+        sizes = [len(uniques) for uniques in self.uniques]
+        space = math.prod(sizes)
+        n_rows = len(codes[0])
+
+        if space <= min(DENSE_CELL_LIMIT, 4 * n_rows + 1024):
+            combined = np.ravel_multi_index(codes, sizes) if n_rows else np.empty(0, dtype=np.int64)
+            counts = np.bincount(combined, minlength=space)
+            observed = np.flatnonzero(counts)
+            dense_ids = np.full(space, -1, dtype=np.int64)
+            dense_ids[observed] = np.arange(len(observed))
+            self.cells = dense_ids[combined]
+            self.cell_codes = list(np.unravel_index(observed, sizes))
+            self.counts = counts[observed]
+        else:
+            combined = np.zeros(n_rows, dtype=np.int64)
+            combined_space = 1
+            for key_codes, size in zip(codes, sizes):
+                if combined_space * size >= 2 ** 62:  # Renumber before the mixed-radix index overflows
+                    combined = np.unique(combined, return_inverse=True)[1].astype(np.int64)
+                    combined_space = int(combined.max()) + 1 if n_rows else 1
+                combined = combined * size + key_codes
+                combined_space *= size
+            _, first_rows, self.cells = np.unique(combined, return_index=True, return_inverse=True)
+            self.cell_codes = [key_codes[first_rows] for key_codes in codes]
+            self.counts = np.bincount(self.cells, minlength=len(first_rows))
+        self.n_cells = len(self.counts)
+
+    def key_frame(self) -> pd.DataFrame:
+        """One row per cell with its key values, in key order."""
+        return pd.DataFrame({
+            key: uniques.take(cell_codes)
+            for key, uniques, cell_codes in zip(self.keys, self.uniques, self.cell_codes)
+        })
+
+    def _measure(self, values: Any) -> np.ndarray:
+        values = np.asarray(values)
+        if values.dtype.kind not in "biuf":
+            values = pd.to_numeric(values, errors="coerce").astype(np.float64)
+        return values if self.rows is None else values[self.rows]
+
+    def sum(self, values: Any) -> np.ndarray:
+        """Sum one measure column (aligned with the frame's rows) per cell."""
+        values = self._measure(values)
+        if values.dtype.kind == "f":
+            return np.bincount(self.cells, weights=np.where(np.isnan(values), 0.0, values), minlength=self.n_cells)
+        return np.rint(np.bincount(self.cells, weights=values, minlength=self.n_cells)).astype(np.int64)
+
+    def aggregate(
+        self,
+        df: pd.DataFrame,
+        sums: Mapping[str, str],
+        count: Optional[str] = None,
+        engine: str = "auto",
+    ) -> pd.DataFrame:
+        """
+        Sum measures of the indexed frame per cell.
+
+        Args:
+            df (pd.DataFrame): The frame the index was built from.
+            sums (mapping): Output column -> input column to sum.
+            count (str, optional): Name of an output column with the rows per cell.
+            engine (str): "numpy" (np.bincount), "numba" (compiled loop) or
+                "auto" (numba when installed and summing several measures).
+
+        Returns:
+            pd.DataFrame: Key columns, then the sums (and count), one row per cell in key order.
+        """
+        result = self.key_frame()
+        kernel = _compiled_sums() if engine in ("auto", "numba") else None
+        if engine == "numba" and kernel is None:
+            raise ImportError("The numba engine requires numba to be installed.")
+        if kernel is not None and (engine == "numba" or len(sums) > 1):
+            measures = [self._measure(df[column]) for column in sums.values()]
+            totals = kernel(self.cells, np.column_stack(measures).astype(np.float64), self.n_cells)
+            for i, (name, values) in enumerate(zip(sums, measures)):
+                result[name] = totals[:, i] if values.dtype.kind == "f" else np.rint(totals[:, i]).astype(np.int64)
+        else:
+            for name, column in sums.items():
+                result[name] = self.sum(df[column])
+        if count is not None:
+            result[count] = self.counts
+        return result
+
+
+def group_sums(
+    df: pd.DataFrame,
+    keys: Sequence[str],
+    sums: Mapping[str, str],
+    count: Optional[str] = None,
+    dropna: bool = True,
+    engine: str = "auto",
+) -> pd.DataFrame:
+    """
+    Equivalent of df.groupby(keys).agg(**{out: (column, "sum")}).reset_index() on the kernel.
+
+    Args:
+        df (pd.DataFrame): Rows to aggregate.
+        keys (sequence): Key columns.
+        sums (mapping): Output column -> input column to sum.
+        count (str, optional): Name of an output column with the rows per group.
+        dropna (bool): Drop rows with a missing key (True) or group them last (False).
+        engine (str): See GroupIndex.aggregate().
+    """
+    return GroupIndex(df, keys, dropna=dropna).aggregate(df, sums, count=count, engine=engine)
@@ -0,0 +1,158 @@
+"""
+utils/ingest.py
+
+Shared raw-data ingestion for the pipeline.
+
+All scripts that read files from data/raw/ should use read_raw_data() from
+here instead of keeping their own copy.
+
+- CSVs are read with the multi-threaded pyarrow CSV engine when pyarrow is
+  installed, and with the pandas C engine otherwise.
+- Each file is read with an explicit schema (column -> dtype). On first read
+  the schema is inferred and cached next to the file as
+  <file name>.schema.json, keyed by the header line and file size. Later
+  reads skip type inference. A changed header or size triggers re-inference.
+- read_csv_directory() reads a directory of partitioned files (e.g. daily
+  sales extracts) concurrently and returns one table.
+
+Example:
+    from utils.ingest import read_raw_data, read_csv_directory
+    customers_df = read_raw_data("customers_data.csv")
+    sales_df = read_csv_directory(RAW_DATA_DIR / "sales_daily", pattern="sales_*.csv")
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import pathlib
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from utils.logger import logger
+
+try:
+    import pyarrow  # noqa: F401  (enables pandas' multi-threaded "pyarrow" CSV engine)
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+PROJECT_ROOT: pathlib.Path = pathlib.Path(__file__).resolve().parent.parent
+RAW_DATA_DIR: pathlib.Path = PROJECT_ROOT / "data" / "raw"
+SCHEMA_SUFFIX = ".schema.json"
+
+PathLike = Union[str, pathlib.Path]
+
+
+def schema_path_for(file_path: PathLike) -> pathlib.Path:
+    """Return the sidecar schema cache path for a data file."""
+    file_path = pathlib.Path(file_path)
+    return file_path.with_name(file_path.name + SCHEMA_SUFFIX)
+
+
+def _file_signature(file_path: pathlib.Path) -> Dict[str, Union[str, int]]:
+    """Identify a file's layout by a hash of its header line and its size."""
+    with open(file_path, "rb") as f:
+        header = f.readline().rstrip(b"\r\n")
+    return {
+        "header_sha256": hashlib.sha256(header).hexdigest(),
+        "size_bytes": file_path.stat().st_size,
+    }
+
+
+def load_cached_schema(file_path: PathLike) -> Optional[Dict[str, str]]:
+    """Return the cached dtypes for a file, or None if missing or out of date."""
+    file_path = pathlib.Path(file_path)
+    path = schema_path_for(file_path)
+    if not path.exists():
+        return None
+    try:
+        cached = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    signature = _file_signature(file_path)
+    if any(cached.get(key) != value for key, value in signature.items()):
+        return None
+    return cached.get("dtypes")
+
+
+def save_schema(file_path: PathLike, df: pd.DataFrame) -> Dict[str, str]:
+    """Record the dtypes of a freshly read file in its schema cache."""
+    file_path = pathlib.Path(file_path)
+    dtypes = {}
+    for column, dtype in df.dtypes.items():
+        # Date/time parsing stays with the cleaning step; keep such columns as text
+        dtypes[str(column)] = "object" if pd.api.types.is_datetime64_any_dtype(dtype) else str(dtype)
+    payload = {**_file_signature(file_path), "dtypes": dtypes}
+    schema_path_for(file_path).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return dtypes
+
+
+def read_csv_fast(file_path: PathLike, use_schema_cache: bool = True) -> pd.DataFrame:
+    """
+    Read one CSV with the fastest available engine and a cached explicit schema.
+
+    Args:
+        file_path (PathLike): CSV file to read.
+        use_schema_cache (bool): Read and maintain the sidecar schema cache.
+
+    Returns:
+        pd.DataFrame: The file contents.
+    """
+    file_path = pathlib.Path(file_path)
+    dtypes = load_cached_schema(file_path) if use_schema_cache else None
+    if dtypes is not None:
+        try:
+            return pd.read_csv(file_path, engine=CSV_ENGINE, dtype=dtypes)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Cached schema no longer fits {file_path} ({e}); re-inferring.")
+    df = pd.read_csv(file_path, engine=CSV_ENGINE)
+    if use_schema_cache:
+        save_schema(file_path, df)
+    return df
+
+
+def read_raw_data(file_name: str, raw_dir: PathLike = RAW_DATA_DIR) -> pd.DataFrame:
+    """
+    Read a raw CSV from the data/raw directory.
+
+    Returns an empty DataFrame (and logs the error) if the file is missing
+    or cannot be parsed, so callers can decide whether to continue.
+    """
+    file_path = pathlib.Path(raw_dir).joinpath(file_name)
+    try:
+        logger.info(f"READING: {file_path} (engine={CSV_ENGINE}).")
+        return read_csv_fast(file_path)
+    except FileNotFoundError:
+        logger.error(f"File not found: {file_path}")
+        return pd.DataFrame()  # Return an empty DataFrame if the file is not found
+    except Exception as e:
+        logger.error(f"Error reading {file_path}: {e}")
+        return pd.DataFrame()  # Return an empty DataFrame if any other error occurs
+
+
+def read_csv_directory(directory: PathLike, pattern: str = "*.csv", max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Read every matching CSV in a directory concurrently and concatenate them.
+
+    Files are combined in sorted name order, so daily files named by date come
+    out in date order. Each file uses its own cached schema.
+
+    Args:
+        directory (PathLike): Directory holding the partitioned files.
+        pattern (str): Glob pattern selecting the files.
+        max_workers (int, optional): Reader threads; defaults to min(8, CPU count).
+
+    Returns:
+        pd.DataFrame: All rows from all files (empty if no files match).
+    """
+    files: List[pathlib.Path] = sorted(pathlib.Path(directory).glob(pattern))
+    if not files:
+        logger.warning(f"No files matching '{pattern}' in {directory}.")
+        return pd.DataFrame()
+    workers = max_workers or min(8, os.cpu_count() or 1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="csv-reader") as pool:
+        frames = list(pool.map(read_csv_fast, files))
+    logger.info(f"Read {len(files)} files from {directory} ({sum(len(f) for f in frames)} rows).")
+    return pd.concat(frames, ignore_index=True)
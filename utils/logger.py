@@ -5,6 +5,9 @@ File: utils/logger.py
 This script provides logging functions for the project. Logging is an essential way to
 track events and issues during software execution. This logger setup uses Loguru to log
 messages and errors both to a file and to the console.
+
+Importing this module has no file-system side effects: the log file (and the
+logs folder) are only created when the first message is written.
 """
 
 # Imports from Python Standard Library
@@ -19,11 +22,9 @@ PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent  # Navigate to the
 LOG_FOLDER: pathlib.Path = PROJECT_ROOT.joinpath("logs")  # Directory where logs will be stored
 LOG_FILE: pathlib.Path = LOG_FOLDER.joinpath("project_log.log")  # Path to the log file
 
-# Ensure the log folder exists or create it
-LOG_FOLDER.mkdir(exist_ok=True)
-
-# Configure Loguru to write to the log file
-logger.add(LOG_FILE, level="INFO")
+# Configure Loguru to write to the log file; delay=True defers opening the file
+# (and creating the log folder) until the first message is logged
+logger.add(LOG_FILE, level="INFO", delay=True)
 
 # Optionally, add console output for logging (Uncomment the following line if needed)
 # logger.add(sys.stderr, level="DEBUG")
@@ -0,0 +1,244 @@
+"""
+utils/maintenance.py
+
+Size reporting, query plan checks and routine maintenance for the smart_sales.db warehouse.
+
+Full reloads delete and re-insert every sale. Each reload leaves free pages
+behind, so the file grows and fragments, and the planner statistics go
+stale. This module covers both problems:
+- database_report() / table_report(): file, WAL and free-page sizes, plus
+  row counts, pages and bytes for each table and its indexes (from the
+  dbstat virtual table when SQLite provides it)
+- explain_hot_queries(): EXPLAIN QUERY PLAN for every registered hot query
+  (the OLAP aggregates and typical fact reads; more can be added with
+  register_hot_query()). Full scans of the fact tables (sale and
+  sale_measure, also when reached through the sale_fact view) are flagged.
+- run_maintenance(): ANALYZE, PRAGMA optimize and an incremental VACUUM,
+  then a WAL checkpoint. Incremental vacuum needs auto_vacuum=INCREMENTAL,
+  which new warehouses get from connect_writer(). A warehouse created
+  before that is converted once, by a full VACUUM on its first run.
+- maintenance_due(): the time of the last run is stored in dw_meta, so a
+  frequent cron or Task Scheduler entry can call inspect_db.py
+  --maintain --every-hours 24 and only run maintenance once a day.
+
+Maintenance does not change data, so the warehouse version stamp is left alone.
+
+Example:
+    from utils.maintenance import explain_hot_queries, run_maintenance
+    result = run_maintenance(DB_PATH)
+    with contextlib.closing(connect_reader(DB_PATH)) as conn:
+        flagged = [plan for plan in explain_hot_queries(conn) if plan["full_scans"]]
+"""
+
+import datetime
+import functools
+import pathlib
+import re
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.olap_queries import AGGREGATES, build_query
+from utils.warehouse import PathLike, connect_writer, ensure_meta_table
+
+FACT_TABLES: Tuple[str, ...] = ("sale", "sale_measure")
+AUTO_VACUUM_MODES: Dict[int, str] = {0: "none", 1: "full", 2: "incremental"}
+LAST_MAINTENANCE_KEY = "last_maintenance"
+
+# Hot query name -> function returning (SQL, parameters)
+QueryBuilder = Callable[[], Tuple[str, Sequence[Any]]]
+HOT_QUERIES: Dict[str, QueryBuilder] = {
+    **{f"aggregate:{name}": functools.partial(build_query, name, {}) for name in AGGREGATES},
+    "aggregate:profit?year&region": functools.partial(build_query, "profit", {"year": 2025, "region": "East"}),
+    # Row-level reads as utils/fact_query.py builds them (written out, since it imports pandas)
+    "fact:revenue_by_date_range": lambda: (
+        "SELECT f.sale_date_iso AS sale_date, f.total_revenue AS total_revenue FROM sale_fact f "
+        "WHERE f.sale_date_iso <= ? AND f.sale_date_iso >= ?", ["2025-03-31", "2025-01-01"]),
+    "fact:store_sales": lambda: (
+        "SELECT f.sale_id AS sale_id, f.sale_amount AS sale_amount FROM sale_fact f WHERE f.store_id = ?", [401]),
+}
+
+_TABLE_REFERENCE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?", re.IGNORECASE)
+_SQL_KEYWORDS = {"on", "where", "join", "left", "inner", "cross", "group", "order", "limit", "using", "natural", "union"}
+
+
+def register_hot_query(name: str, sql: str, params: Sequence[Any] = ()) -> None:
+    """Add a query whose plan explain_hot_queries() should check."""
+    HOT_QUERIES[name] = lambda: (sql, params)
+
+
+def _pragma(conn: sqlite3.Connection, name: str) -> Any:
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def read_last_maintenance(conn: sqlite3.Connection) -> Optional[datetime.datetime]:
+    """Return when run_maintenance() last finished (UTC), or None if it never ran."""
+    try:
+        row = conn.execute("SELECT value FROM dw_meta WHERE key = ?", (LAST_MAINTENANCE_KEY,)).fetchone()
+    except sqlite3.OperationalError:
+        return None  # dw_meta does not exist yet
+    return datetime.datetime.fromisoformat(row[0]) if row else None
+
+
+def maintenance_due(conn: sqlite3.Connection, every_hours: float) -> bool:
+    """True if maintenance never ran or last ran at least every_hours ago."""
+    last = read_last_maintenance(conn)
+    if last is None:
+        return True
+    return datetime.datetime.now(datetime.timezone.utc) - last >= datetime.timedelta(hours=every_hours)
+
+
+def database_report(conn: sqlite3.Connection, db_path: PathLike) -> Dict[str, Any]:
+    """
+    Summarize the warehouse file.
+
+    Returns:
+        dict: file_bytes, wal_bytes, page_size, page_count, freelist_count,
+        free_percent, auto_vacuum and last_maintenance.
+    """
+    db_path = pathlib.Path(db_path)
+    wal_path = db_path.with_name(db_path.name + "-wal")
+    page_count = _pragma(conn, "page_count")
+    freelist_count = _pragma(conn, "freelist_count")
+    last = read_last_maintenance(conn)
+    return {
+        "file_bytes": db_path.stat().st_size,
+        "wal_bytes": wal_path.stat().st_size if wal_path.exists() else 0,
+        "page_size": _pragma(conn, "page_size"),
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "free_percent": freelist_count / page_count * 100 if page_count else 0.0,
+        "auto_vacuum": AUTO_VACUUM_MODES.get(_pragma(conn, "auto_vacuum"), "unknown"),
+        "last_maintenance": last.isoformat(timespec="seconds") if last else None,
+    }
+
+
+def table_report(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """
+    Row count and storage of every table, with its indexes.
+
+    Returns:
+        list: One dict per table, largest first: table, rows, pages, bytes and
+        indexes (a list of dicts with index, pages and bytes). pages and bytes
+        are None when SQLite was built without the dbstat virtual table.
+    """
+    try:
+        storage = {name: (pages, size) for name, pages, size in conn.execute(
+            "SELECT name, COUNT(*), SUM(pgsize) FROM dbstat GROUP BY name")}
+    except sqlite3.OperationalError:
+        storage = {}
+    tables = [name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+    report = []
+    for table in tables:
+        pages, size = storage.get(table, (None, None))
+        indexes = []
+        for (index,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? ORDER BY name", (table,)):
+            index_pages, index_size = storage.get(index, (None, None))
+            indexes.append({"index": index, "pages": index_pages, "bytes": index_size})
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        report.append({"table": table, "rows": rows, "pages": pages, "bytes": size, "indexes": indexes})
+    return sorted(report, key=lambda entry: -(entry["bytes"] or 0))
+
+
+def _table_aliases(conn: sqlite3.Connection, sql: str) -> Dict[str, str]:
+    """Map the names and aliases a query can show in its plan to tables, looking inside views."""
+    views = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'view'").fetchall())
+    aliases: Dict[str, str] = {}
+    pending, seen = [sql], set()
+    while pending:
+        text = pending.pop()
+        for table, alias in _TABLE_REFERENCE.findall(text):
+            if table in views and table not in seen:
+                seen.add(table)
+                pending.append(views[table])
+            aliases.setdefault(table, table)
+            if alias and alias.lower() not in _SQL_KEYWORDS:
+                aliases.setdefault(alias, table)
+    return aliases
+
+
+def full_scans(conn: sqlite3.Connection, sql: str, plan: Sequence[str],
+               tables: Sequence[str] = FACT_TABLES) -> List[str]:
+    """Return the plan steps that scan a whole fact table (or a whole index of one)."""
+    aliases = _table_aliases(conn, sql)
+    flagged = []
+    for detail in plan:
+        match = re.match(r"SCAN (\w+)", detail)
+        if match and aliases.get(match.group(1), match.group(1)) in tables:
+            flagged.append(detail)
+    return flagged
+
+
+def explain_hot_queries(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """
+    Run EXPLAIN QUERY PLAN for every registered hot query.
+
+    Returns:
+        list: One dict per query: name, plan (list of plan steps),
+        full_scans (steps scanning a whole fact table) and error (set when
+        the query cannot be planned, e.g. a table this warehouse does not have).
+    """
+    results = []
+    for name, builder in HOT_QUERIES.items():
+        sql, params = builder()
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", list(params))]
+        except sqlite3.Error as e:
+            results.append({"name": name, "plan": [], "full_scans": [], "error": str(e)})
+            continue
+        results.append({"name": name, "plan": plan, "full_scans": full_scans(conn, sql, plan), "error": None})
+    return results
+
+
+def run_maintenance(db_path: PathLike, vacuum_pages: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Refresh planner statistics and return free pages to the file system.
+
+    Steps: ANALYZE, PRAGMA optimize, incremental VACUUM (a full VACUUM the
+    first time, to switch the file to auto_vacuum=INCREMENTAL), and a WAL
+    checkpoint that truncates the -wal file. Readers keep working in WAL
+    mode; a concurrent load waits up to the busy timeout.
+
+    Args:
+        db_path (PathLike): Warehouse file.
+        vacuum_pages (int, optional): Free at most this many pages; all free pages by default.
+
+    Returns:
+        dict: file_bytes_before, file_bytes_after, freelist_before,
+        freelist_after and full_vacuum (True when the file was converted).
+    """
+    db_path = pathlib.Path(db_path)
+    if not db_path.exists():
+        raise FileNotFoundError(f"Warehouse database not found: {db_path}")
+    file_bytes_before = db_path.stat().st_size
+    conn = connect_writer(db_path)
+    try:
+        freelist_before = _pragma(conn, "freelist_count")
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+        ensure_meta_table(conn)
+        conn.execute(
+            "INSERT INTO dw_meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (LAST_MAINTENANCE_KEY, datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")),
+        )
+        conn.commit()
+        # Vacuum last, so the pages the statistics and dw_meta writes freed are returned too
+        full_vacuum = _pragma(conn, "auto_vacuum") != 2
+        if full_vacuum:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        else:
+            # sqlite3's execute() steps this pragma once, freeing a single page; executescript() runs it to the end
+            conn.executescript(f"PRAGMA incremental_vacuum({int(vacuum_pages or 0)});")
+        freelist_after = _pragma(conn, "freelist_count")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    finally:
+        conn.close()
+    return {
+        "file_bytes_before": file_bytes_before,
+        "file_bytes_after": db_path.stat().st_size,
+        "freelist_before": freelist_before,
+        "freelist_after": freelist_after,
+        "full_vacuum": full_vacuum,
+    }
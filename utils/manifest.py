@@ -0,0 +1,203 @@
+"""
+utils/manifest.py
+
+Sidecar data-profile manifests for files written by the pipeline.
+
+Every stage that saves a CSV can call write_manifest() right after writing it.
+The manifest is stored next to the file as <file name>.manifest.json and records:
+- Row count
+- Column dtypes, null counts and min/max values
+- An approximate distinct count per column (KMV sketch)
+- File size and SHA-256 content hash
+
+Tools that only need counts (e.g. scripts/counts_raw_prepare_data.py) call
+count_rows(), which reads the manifest when one exists and is current, and
+otherwise falls back to a fast newline-counting scan of the file.
+
+Example:
+    from utils.manifest import write_manifest, count_rows
+    df.to_csv(file_path, index=False)
+    write_manifest(df, file_path)
+    rows, source = count_rows(file_path)
+"""
+
+import datetime
+import hashlib
+import json
+import pathlib
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# numpy and pandas are imported inside the functions that build manifests, so
+# count_rows() and read_manifest() stay cheap to import for command-line tools.
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+KMV_SIZE = 256  # Number of minimum hash values kept by the distinct-count sketch
+READ_CHUNK_BYTES = 1 << 20
+
+PathLike = Union[str, pathlib.Path]
+
+
+def manifest_path_for(file_path: PathLike) -> pathlib.Path:
+    """Return the sidecar manifest path for a data file."""
+    file_path = pathlib.Path(file_path)
+    return file_path.with_name(file_path.name + MANIFEST_SUFFIX)
+
+
+def file_sha256(file_path: PathLike) -> str:
+    """Hash a file's contents in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def estimate_distinct(series: "pd.Series", k: int = KMV_SIZE) -> int:
+    """
+    Estimate the number of distinct non-null values with a K-Minimum-Values sketch.
+
+    The count is exact when the column has at most k distinct values.
+    """
+    import numpy as np
+    import pandas as pd
+
+    values = series.dropna()
+    if values.empty:
+        return 0
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+    # Grow the candidate window until it holds k distinct hashes (or the whole column)
+    window = min(len(hashes), 4 * k)
+    while True:
+        smallest = np.unique(np.partition(hashes, window - 1)[:window])
+        if len(smallest) >= k or window == len(hashes):
+            break
+        window = min(len(hashes), window * 2)
+
+    if len(smallest) < k:
+        return int(len(smallest))
+    kth_fraction = (float(smallest[k - 1]) + 1.0) / 2.0**64
+    return int(round((k - 1) / kth_fraction))
+
+
+def _to_json_scalar(value: Any) -> Any:
+    """Convert numpy/pandas scalars into JSON-serializable values."""
+    import numpy as np
+    import pandas as pd
+
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _column_profile(series: "pd.Series") -> Dict[str, Any]:
+    """Profile a single column: dtype, nulls, min/max and distinct estimate."""
+    non_null = series.dropna()
+    min_value = max_value = None
+    if not non_null.empty:
+        try:
+            min_value, max_value = non_null.min(), non_null.max()
+        except TypeError:
+            # Mixed types (e.g. numbers and strings) have no natural ordering
+            pass
+    return {
+        "dtype": str(series.dtype),
+        "null_count": int(series.isna().sum()),
+        "min": _to_json_scalar(min_value),
+        "max": _to_json_scalar(max_value),
+        "distinct_estimate": estimate_distinct(series),
+    }
+
+
+def build_manifest(df: "pd.DataFrame", file_path: PathLike) -> Dict[str, Any]:
+    """Build the manifest dictionary for a DataFrame that was saved to file_path."""
+    file_path = pathlib.Path(file_path)
+    return {
+        "manifest_version": MANIFEST_VERSION,
+        "file_name": file_path.name,
+        "row_count": int(len(df)),
+        "column_count": int(len(df.columns)),
+        "size_bytes": file_path.stat().st_size,
+        "sha256": file_sha256(file_path),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "columns": {str(col): _column_profile(df[col]) for col in df.columns},
+    }
+
+
+def write_manifest(df: "pd.DataFrame", file_path: PathLike) -> pathlib.Path:
+    """
+    Write the sidecar manifest for a DataFrame that was just saved to file_path.
+
+    Args:
+        df (pd.DataFrame): The DataFrame that was written.
+        file_path (PathLike): Path of the written data file.
+
+    Returns:
+        pathlib.Path: Path of the manifest file.
+    """
+    manifest = build_manifest(df, file_path)
+    path = manifest_path_for(file_path)
+    path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return path
+
+
+def read_manifest(file_path: PathLike, verify_hash: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Read the manifest for a data file.
+
+    Returns None when there is no manifest, it cannot be parsed, or it no longer
+    matches the file (size check, plus a content hash check when verify_hash=True).
+    """
+    file_path = pathlib.Path(file_path)
+    path = manifest_path_for(file_path)
+    if not path.exists() or not file_path.exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("size_bytes") != file_path.stat().st_size:
+        return None
+    if verify_hash and manifest.get("sha256") != file_sha256(file_path):
+        return None
+    return manifest
+
+
+def count_csv_rows(file_path: PathLike, header: bool = True) -> int:
+    """
+    Count data rows in a CSV by counting newlines in binary chunks.
+
+    Quoted fields containing embedded newlines are counted as extra rows;
+    the pipeline's CSVs do not contain them.
+    """
+    newlines = 0
+    last_byte = b""
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_BYTES), b""):
+            newlines += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+    if not last_byte:
+        return 0
+    lines = newlines if last_byte == b"\n" else newlines + 1
+    return max(lines - 1, 0) if header else lines
+
+
+def count_rows(file_path: PathLike) -> Tuple[int, str]:
+    """
+    Return (row_count, source) for a data file.
+
+    source is "manifest" when the count came from a current manifest,
+    otherwise "scan".
+    """
+    manifest = read_manifest(file_path)
+    if manifest is not None:
+        return int(manifest["row_count"]), "manifest"
+    return count_csv_rows(file_path), "scan"
@@ -0,0 +1,92 @@
+"""
+utils/measures.py
+
+Derived sales measures shared by the pandas pipeline and the data warehouse.
+
+The cost model and discount handling live here so that scripts/data_prep.py
+and scripts/etl_to_dw.py compute Total_Cost, Profit and Profit_Margin the same way.
+
+Assumptions:
+- sale_amount is the net amount charged, after discount_percent was applied.
+- No cost column exists in the source data, so cost is a fixed share of revenue.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Meaning 70% of revenue is cost, 30% is profit
+ASSUMED_COST_PERCENTAGE = 0.70
+
+# Date format of SaleDate and JoinDate in the prepared files (e.g. 5/4/2025)
+PREPARED_DATE_FORMAT = '%m/%d/%Y'
+
+# Columns written to the warehouse sale_measure table, in order
+SALE_MEASURE_COLUMNS = [
+    'sale_id', 'sale_date_iso', 'sale_year', 'sale_quarter', 'sale_month', 'sale_dow',
+    'total_revenue', 'gross_amount', 'discount_amount', 'total_cost', 'profit', 'profit_margin',
+]
+
+
+def compute_profit_measures(revenue: pd.Series, discount_percent: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Compute revenue, discount, cost and profit measures for a revenue column.
+
+    Args:
+        revenue (pd.Series): Net sale amount per row (coerced to numeric, NaN -> 0).
+        discount_percent (pd.Series, optional): Discount applied per row, 0-100.
+
+    Returns:
+        pd.DataFrame: Total_Revenue, Gross_Amount, Discount_Amount, Total_Cost,
+        Profit and Profit_Margin columns aligned to the input index.
+    """
+    total_revenue = pd.to_numeric(revenue, errors='coerce').fillna(0)
+    if discount_percent is not None:
+        discount = pd.to_numeric(discount_percent, errors='coerce').fillna(0).clip(0, 99.99)
+        gross_amount = total_revenue / (1 - discount / 100)
+    else:
+        gross_amount = total_revenue.copy()
+    total_cost = total_revenue * ASSUMED_COST_PERCENTAGE
+    profit = total_revenue - total_cost
+    profit_margin = np.where(total_revenue > 0, profit / total_revenue.where(total_revenue > 0, 1) * 100, 0.0)
+    return pd.DataFrame({
+        'Total_Revenue': total_revenue,
+        'Gross_Amount': gross_amount,
+        'Discount_Amount': gross_amount - total_revenue,
+        'Total_Cost': total_cost,
+        'Profit': profit,
+        'Profit_Margin': profit_margin,
+    }, index=revenue.index)
+
+
+def build_sale_measures(sales_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build rows for the warehouse sale_measure table from warehouse-named sales columns.
+
+    Dates that cannot be parsed are stored as NULL instead of being dropped,
+    so every sale keeps its measures.
+
+    Args:
+        sales_df (pd.DataFrame): Sales with sale_id, sale_date, sale_amount and discount_percent.
+
+    Returns:
+        pd.DataFrame: One row per sale with the SALE_MEASURE_COLUMNS.
+    """
+    measures = compute_profit_measures(sales_df['sale_amount'], sales_df.get('discount_percent'))
+    sale_dates = pd.to_datetime(sales_df['sale_date'], format=PREPARED_DATE_FORMAT, errors='coerce')
+    result = pd.DataFrame({
+        'sale_id': sales_df['sale_id'],
+        'sale_date_iso': sale_dates.dt.strftime('%Y-%m-%d'),
+        'sale_year': sale_dates.dt.year.astype('Int64'),
+        'sale_quarter': sale_dates.dt.quarter.astype('Int64'),
+        'sale_month': sale_dates.dt.month.astype('Int64'),
+        'sale_dow': sale_dates.dt.dayofweek.astype('Int64'),
+        'total_revenue': measures['Total_Revenue'],
+        'gross_amount': measures['Gross_Amount'],
+        'discount_amount': measures['Discount_Amount'],
+        'total_cost': measures['Total_Cost'],
+        'profit': measures['Profit'],
+        'profit_margin': measures['Profit_Margin'],
+    })
+    return result[SALE_MEASURE_COLUMNS]
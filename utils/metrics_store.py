@@ -0,0 +1,272 @@
+"""
+utils/metrics_store.py
+
+Incrementally maintained sales metrics for BI growth reporting.
+
+The store keeps running sums per (Year, Quarter, ProductCategory, Region,
+sales_channel) bucket: revenue, profit, units and sale count. Loading a new
+batch of processed sales only adds into the buckets that batch touches;
+historical sales are never re-read. Every BI aggregate that scripts/data_prep.py
+writes, plus YoY, QoQ and rolling 4-quarter growth, is derived from the
+buckets, so the work is proportional to the number of buckets, not to the
+number of sales.
+
+Batches carry an id. Applying the same id twice is a no-op, so a retried
+daily load cannot double count. The store also records the sale date range
+each batch covered (the requested --start/--end range, else the batch's
+first and last sale date). A batch whose range overlaps coverage already in
+the store is rejected with a ValueError, so a batch of dates a full rebuild
+already counted cannot be added a second time. Sales without a SaleDate
+column cover the whole of each quarter they fall in.
+
+The store is saved as data/processed/metrics_store/buckets.csv plus
+applied_batches.json and coverage.json.
+
+Example:
+    from utils.metrics_store import MetricsStore
+    store = MetricsStore.load(METRICS_STORE_DIR)
+    store.apply_batch(processed_df, batch_id="2025-06-01", start="2025-06-01", end="2025-06-01")
+    store.save(METRICS_STORE_DIR)
+    growth_df = store.quarterly_growth(["ProductCategory"])
+"""
+
+import json
+import os
+import pathlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.groupby_kernel import group_sums
+
+BUCKET_COLUMNS: List[str] = ["Year", "Quarter", "ProductCategory", "Region", "sales_channel"]
+MEASURE_COLUMNS: List[str] = ["Total_Revenue", "Total_Profit", "Units_Sold", "Sale_Count"]
+BUCKETS_FILE_NAME = "buckets.csv"
+BATCHES_FILE_NAME = "applied_batches.json"
+COVERAGE_FILE_NAME = "coverage.json"
+
+PathLike = Union[str, pathlib.Path]
+BucketKey = Tuple
+DateLike = Union[str, pd.Timestamp, None]
+
+
+def _sale_date_range(df: pd.DataFrame) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    """First and last sale day of processed rows; whole quarters when there is no SaleDate column."""
+    if "SaleDate" in df.columns:
+        dates = pd.to_datetime(df["SaleDate"], errors="coerce").dropna()
+        if dates.empty:
+            return None, None
+        return dates.min().normalize(), dates.max().normalize()
+    if df.empty:
+        return None, None
+    quarters = df["Year"].astype(int) * 4 + df["Quarter"].astype(int) - 1
+    first, last = int(quarters.min()), int(quarters.max())
+    start = pd.Timestamp(year=first // 4, month=first % 4 * 3 + 1, day=1)
+    end = pd.Timestamp(year=last // 4, month=last % 4 * 3 + 1, day=1) + pd.offsets.QuarterEnd(0)
+    return start, end
+
+
+def _growth_percent(current: pd.Series, previous: pd.Series) -> pd.Series:
+    """Percent change; 0 where there is no previous value (same as the original YoY output)."""
+    return ((current - previous) / previous.replace(0, np.nan) * 100).fillna(0)
+
+
+class MetricsStore:
+    """Running per-bucket sums of sales measures, updated batch by batch."""
+
+    def __init__(self):
+        self._buckets: Dict[BucketKey, np.ndarray] = {}
+        self.applied_batches: List[str] = []
+        # Sale date ranges already counted: {"batch_id", "start", "end"} with ISO dates
+        self.coverage: List[Dict[str, Any]] = []
+
+    # ---- Maintenance ----
+
+    def overlapping(self, start: DateLike, end: DateLike) -> List[Dict[str, Any]]:
+        """Return the recorded coverage entries that share a day with start..end."""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        return [entry for entry in self.coverage
+                if pd.Timestamp(entry["start"]) <= end and start <= pd.Timestamp(entry["end"])]
+
+    def _check_coverage(self, batch_id: Optional[str], start: pd.Timestamp, end: pd.Timestamp) -> None:
+        overlaps = self.overlapping(start, end)
+        if overlaps:
+            covered = ", ".join(f"{entry['start']}..{entry['end']}" for entry in overlaps)
+            raise ValueError(f"Batch '{batch_id}' covers {start.date()}..{end.date()}, "
+                             f"which overlaps sales already in the metrics store ({covered}).")
+
+    def apply_batch(
+        self,
+        batch: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        batch_id: Optional[str] = None,
+        start: DateLike = None,
+        end: DateLike = None,
+    ) -> int:
+        """
+        Add a batch of processed sales (output of merge_and_process_data) into the store.
+
+        The batch is summed in full before the store changes, so a rejected
+        batch leaves the store as it was.
+
+        Args:
+            batch (pd.DataFrame or iterable): Processed sales rows, or chunks of
+                them (e.g. from stream_processed_data()) applied as one batch.
+            batch_id (str, optional): Identifies the batch; a batch already applied is skipped.
+            start (str, optional): First sale date the batch covers; defaults to its first sale.
+            end (str, optional): Last sale date the batch covers; defaults to its last sale.
+
+        Returns:
+            int: Number of buckets the batch changed.
+
+        Raises:
+            ValueError: If a column is missing, or the batch covers dates already in the store.
+        """
+        if batch_id is not None and batch_id in self.applied_batches:
+            return 0
+        if start is not None and end is not None:
+            self._check_coverage(batch_id, pd.Timestamp(start), pd.Timestamp(end))  # Before reading any chunk
+        frames = [batch] if isinstance(batch, pd.DataFrame) else batch
+        staged: Dict[BucketKey, np.ndarray] = {}
+        first: Optional[pd.Timestamp] = None
+        last: Optional[pd.Timestamp] = None
+        for df in frames:
+            missing = [c for c in BUCKET_COLUMNS + ["Total_Revenue", "Profit", "Units_Sold"] if c not in df.columns]
+            if missing:
+                raise ValueError(f"Batch is missing columns: {', '.join(missing)}")
+            valid = df[(df["Year"] > 0) & (df["Quarter"] > 0)]
+            chunk_first, chunk_last = _sale_date_range(valid)
+            if chunk_first is not None:
+                first = chunk_first if first is None else min(first, chunk_first)
+                last = chunk_last if last is None else max(last, chunk_last)
+            batch_sums = group_sums(
+                valid, BUCKET_COLUMNS,
+                {"Total_Revenue": "Total_Revenue", "Total_Profit": "Profit", "Units_Sold": "Units_Sold"},
+                count="Sale_Count",
+            )
+            keys = batch_sums[BUCKET_COLUMNS].itertuples(index=False, name=None)
+            for key, values in zip(keys, batch_sums[MEASURE_COLUMNS].to_numpy(dtype=float)):
+                key = (int(key[0]), int(key[1]), *key[2:])
+                if key in staged:
+                    staged[key] += values
+                else:
+                    staged[key] = values.copy()
+
+        start = pd.Timestamp(start) if start is not None else first
+        end = pd.Timestamp(end) if end is not None else last
+        if start is not None and end is not None:
+            self._check_coverage(batch_id, start, end)
+            self.coverage.append({"batch_id": batch_id, "start": start.date().isoformat(),
+                                  "end": end.date().isoformat()})
+
+        for key, values in staged.items():
+            if key in self._buckets:
+                self._buckets[key] += values
+            else:
+                self._buckets[key] = values
+        if batch_id is not None:
+            self.applied_batches.append(batch_id)
+        return len(staged)
+
+    def buckets(self) -> pd.DataFrame:
+        """All buckets as a DataFrame with BUCKET_COLUMNS + MEASURE_COLUMNS."""
+        if not self._buckets:
+            return pd.DataFrame(columns=BUCKET_COLUMNS + MEASURE_COLUMNS)
+        df = pd.DataFrame(list(self._buckets.keys()), columns=BUCKET_COLUMNS)
+        df[MEASURE_COLUMNS] = np.vstack(list(self._buckets.values()))
+        return df.sort_values(BUCKET_COLUMNS, ignore_index=True)
+
+    # ---- Persistence ----
+
+    @classmethod
+    def load(cls, directory: PathLike) -> "MetricsStore":
+        """Load a saved store, or return an empty one if none has been saved."""
+        directory = pathlib.Path(directory)
+        store = cls()
+        buckets_path = directory / BUCKETS_FILE_NAME
+        if buckets_path.exists():
+            df = pd.read_csv(buckets_path, keep_default_na=False)
+            for row in df.itertuples(index=False):
+                key = (int(row[0]), int(row[1]), *row[2:len(BUCKET_COLUMNS)])
+                store._buckets[key] = np.array(row[len(BUCKET_COLUMNS):], dtype=float)
+        batches_path = directory / BATCHES_FILE_NAME
+        if batches_path.exists():
+            store.applied_batches = json.loads(batches_path.read_text(encoding="utf-8"))
+        coverage_path = directory / COVERAGE_FILE_NAME
+        if coverage_path.exists():
+            store.coverage = json.loads(coverage_path.read_text(encoding="utf-8"))
+        return store
+
+    def save(self, directory: PathLike) -> None:
+        """Write the buckets, applied batch ids and coverage, replacing any previous save."""
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        buckets_tmp = directory / (BUCKETS_FILE_NAME + ".tmp")
+        self.buckets().to_csv(buckets_tmp, index=False)
+        batches_tmp = directory / (BATCHES_FILE_NAME + ".tmp")
+        batches_tmp.write_text(json.dumps(self.applied_batches, indent=2), encoding="utf-8")
+        coverage_tmp = directory / (COVERAGE_FILE_NAME + ".tmp")
+        coverage_tmp.write_text(json.dumps(self.coverage, indent=2), encoding="utf-8")
+        os.replace(buckets_tmp, directory / BUCKETS_FILE_NAME)
+        os.replace(batches_tmp, directory / BATCHES_FILE_NAME)
+        os.replace(coverage_tmp, directory / COVERAGE_FILE_NAME)
+
+    # ---- Derived aggregates ----
+
+    def profit_by_category_region_quarter(self) -> pd.DataFrame:
+        """Same layout as data/processed/profit_by_category_region_quarter_agg.csv."""
+        df = self.buckets().groupby(["Year", "Quarter", "Region", "ProductCategory"], as_index=False)[
+            ["Total_Revenue", "Total_Profit", "Units_Sold"]].sum()
+        df["Units_Sold"] = df["Units_Sold"].astype(int)
+        df["Avg_Profit_Margin"] = (df["Total_Profit"] / df["Total_Revenue"] * 100).fillna(0)
+        return df
+
+    def channel_share(self) -> pd.DataFrame:
+        """Same layout as data/processed/sales_channel_share_agg.csv."""
+        df = self.buckets().groupby("sales_channel", as_index=False)[["Total_Revenue"]].sum()
+        df["Share_Percent"] = df["Total_Revenue"] / df["Total_Revenue"].sum() * 100
+        return df
+
+    def yearly_growth(self) -> pd.DataFrame:
+        """Same layout as data/processed/yoy_growth_agg.csv; the previous year is Year - 1."""
+        df = self.buckets().groupby(["Year", "ProductCategory"], as_index=False)[["Total_Revenue"]].sum()
+        previous = df.assign(Year=df["Year"] + 1).rename(columns={"Total_Revenue": "Previous_Year_Revenue"})
+        df = df.merge(previous, on=["Year", "ProductCategory"], how="left")
+        df["YoY_Growth_Percent"] = _growth_percent(df["Total_Revenue"], df["Previous_Year_Revenue"])
+        return df.sort_values(["ProductCategory", "Year"], ignore_index=True)
+
+    def quarterly_growth(self, group_by: Sequence[str] = ("ProductCategory",)) -> pd.DataFrame:
+        """
+        Quarterly revenue with QoQ, YoY and rolling 4-quarter growth per group.
+
+        Rolling_4Q_Revenue is the revenue of the quarter and the three before
+        it; its growth compares against the same window one year earlier.
+
+        Args:
+            group_by (sequence): Bucket dimensions to keep, e.g. ["ProductCategory", "Region"].
+
+        Returns:
+            pd.DataFrame: One row per group and quarter.
+        """
+        group_by = list(group_by)
+        unknown = [c for c in group_by if c not in BUCKET_COLUMNS[2:]]
+        if unknown:
+            raise ValueError(f"Cannot group metrics by: {', '.join(unknown)}")
+        df = self.buckets().groupby(["Year", "Quarter"] + group_by, as_index=False)[["Total_Revenue"]].sum()
+        df["Quarter_Index"] = df["Year"].astype(int) * 4 + df["Quarter"].astype(int) - 1
+
+        revenue = df[group_by + ["Quarter_Index", "Total_Revenue"]]
+
+        def lagged(lag: int) -> pd.Series:
+            shifted = revenue.assign(Quarter_Index=revenue["Quarter_Index"] + lag)
+            return df[group_by + ["Quarter_Index"]].merge(shifted, on=group_by + ["Quarter_Index"], how="left")["Total_Revenue"]
+
+        lags = {lag: lagged(lag) for lag in range(1, 8)}
+        df["Previous_Quarter_Revenue"] = lags[1].to_numpy()
+        df["Previous_Year_Revenue"] = lags[4].to_numpy()
+        df["Rolling_4Q_Revenue"] = df["Total_Revenue"] + sum(lags[lag].fillna(0).to_numpy() for lag in (1, 2, 3))
+        previous_window = sum(lags[lag].fillna(0).to_numpy() for lag in (4, 5, 6, 7))
+        df["QoQ_Growth_Percent"] = _growth_percent(df["Total_Revenue"], df["Previous_Quarter_Revenue"])
+        df["YoY_Growth_Percent"] = _growth_percent(df["Total_Revenue"], df["Previous_Year_Revenue"])
+        df["Rolling_4Q_Growth_Percent"] = _growth_percent(df["Rolling_4Q_Revenue"], pd.Series(previous_window, index=df.index))
+        return df.drop(columns="Quarter_Index").sort_values(group_by + ["Year", "Quarter"], ignore_index=True)
@@ -0,0 +1,432 @@
+"""
+utils/olap_queries.py
+
+Named OLAP aggregates computed inside the data warehouse.
+
+These are the same aggregates scripts/data_prep.py writes to data/processed/,
+plus the segment-by-day-of-week slice from the P6 analysis. They are computed
+in SQL over the sale_fact view (see scripts/etl_to_dw.py), so callers get
+fresh results without reading CSVs or pulling raw rows into pandas. The
+campaign and discount-band aggregates read the much smaller campaign_summary
+rollup instead (see utils/campaigns.py), and the customer aggregates read the
+customer_rfm and customer_cohort tables (see utils/customer_analytics.py).
+
+Each aggregate declares which filters it accepts. Filter values are always
+bound as SQL parameters, never formatted into the SQL text.
+
+The "start" and "end" filters bound the sale date (ISO text, inclusive).
+They are range predicates on the indexed sale_measure.sale_date_iso column,
+so SQLite only visits sales inside the requested time range.
+
+Each aggregate also declares how results computed separately on several
+warehouse shards (utils/shards.py) combine: rows with equal "keys" add up
+their "sums" columns, and merge_aggregate_rows() then recomputes the derived
+columns (margins, shares, growth) and restores the ORDER BY of the SQL.
+Customer aggregates have no merge rule: a customer's sales can be spread over
+several shards, so per-shard customer counts cannot be added.
+
+Example:
+    from utils.olap_queries import run_aggregate
+    rows = run_aggregate(conn, "profit", {"year": "2025", "region": "East"})
+"""
+
+import datetime
+import sqlite3
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Filter name -> (SQL expression, Python type used to coerce the value)
+FILTER_COLUMNS: Dict[str, Tuple[str, type]] = {
+    "year": ("f.sale_year", int),
+    "quarter": ("f.sale_quarter", int),
+    "region": ("c.region", str),
+    "category": ("p.category", str),
+    "channel": ("COALESCE(f.sales_channel, 'Unknown')", str),
+    "segment": ("c.customer_segment", str),
+    "store": ("f.store_id", int),
+    "campaign": ("f.campaign_id", int),
+}
+
+# Date range filter name -> (SQL expression, comparison operator)
+RANGE_FILTERS: Dict[str, Tuple[str, str]] = {
+    "start": ("f.sale_date_iso", ">="),
+    "end": ("f.sale_date_iso", "<="),
+}
+
+_FROM_STAR = """
+    FROM sale_fact f
+    JOIN customer c ON c.customer_id = f.customer_id
+    JOIN product p ON p.product_id = f.product_id
+"""
+
+# Aggregate name -> SQL template, the filters it accepts and how shard results merge.
+# {where} is replaced with the generated WHERE clause.
+# "order" mirrors the ORDER BY as (column, descending) pairs.
+AGGREGATES: Dict[str, Dict[str, Any]] = {
+    "profit": {
+        "description": "Profit by product category, region and quarter.",
+        "filters": ["year", "quarter", "region", "category", "channel", "store", "start", "end"],
+        "sql": """
+            SELECT
+                f.sale_year AS year,
+                f.sale_quarter AS quarter,
+                c.region AS region,
+                p.category AS category,
+                SUM(f.total_revenue) AS total_revenue,
+                SUM(f.profit) AS total_profit,
+                COUNT(*) AS sale_count,
+                COALESCE(SUM(f.profit) * 100.0 / NULLIF(SUM(f.total_revenue), 0), 0) AS avg_profit_margin
+            """ + _FROM_STAR + """
+            WHERE f.sale_year IS NOT NULL {where}
+            GROUP BY f.sale_year, f.sale_quarter, c.region, p.category
+            ORDER BY year, quarter, region, category
+        """,
+        "keys": ["year", "quarter", "region", "category"],
+        "sums": ["total_revenue", "total_profit", "sale_count"],
+        "order": [("year", False), ("quarter", False), ("region", False), ("category", False)],
+    },
+    "channel_share": {
+        "description": "Revenue share by sales channel.",
+        "filters": ["year", "quarter", "region", "category", "store", "start", "end"],
+        "sql": """
+            SELECT
+                COALESCE(f.sales_channel, 'Unknown') AS sales_channel,
+                SUM(f.total_revenue) AS total_revenue,
+                SUM(f.total_revenue) * 100.0 / SUM(SUM(f.total_revenue)) OVER () AS share_percent
+            """ + _FROM_STAR + """
+            WHERE f.sale_year IS NOT NULL {where}
+            GROUP BY COALESCE(f.sales_channel, 'Unknown')
+            ORDER BY total_revenue DESC
+        """,
+        "keys": ["sales_channel"],
+        "sums": ["total_revenue"],
+        "order": [("total_revenue", True), ("sales_channel", False)],
+    },
+    "yoy_growth": {
+        "description": "Year-over-year revenue growth by product category.",
+        "filters": ["region", "category", "channel", "store", "start", "end"],
+        "sql": """
+            WITH yearly AS (
+                SELECT
+                    f.sale_year AS year,
+                    p.category AS category,
+                    SUM(f.total_revenue) AS total_revenue
+                """ + _FROM_STAR + """
+                WHERE f.sale_year IS NOT NULL {where}
+                GROUP BY f.sale_year, p.category
+            )
+            SELECT
+                year,
+                category,
+                total_revenue,
+                LAG(total_revenue) OVER (PARTITION BY category ORDER BY year) AS previous_year_revenue,
+                COALESCE(
+                    (total_revenue - LAG(total_revenue) OVER (PARTITION BY category ORDER BY year)) * 100.0
+                    / NULLIF(LAG(total_revenue) OVER (PARTITION BY category ORDER BY year), 0),
+                    0
+                ) AS yoy_growth_percent
+            FROM yearly
+            ORDER BY category, year
+        """,
+        "keys": ["year", "category"],
+        "sums": ["total_revenue"],
+        "order": [("category", False), ("year", False)],
+    },
+    "segment_weekday": {
+        "description": "Sales by customer segment and day of week (0 = Monday).",
+        "filters": ["segment", "year", "quarter", "category", "region", "store", "start", "end"],
+        "sql": """
+            SELECT
+                c.customer_segment AS segment,
+                f.sale_dow AS day_of_week,
+                SUM(f.total_revenue) AS total_revenue,
+                COUNT(*) AS sale_count
+            """ + _FROM_STAR + """
+            WHERE f.sale_dow IS NOT NULL {where}
+            GROUP BY c.customer_segment, f.sale_dow
+            ORDER BY segment, day_of_week
+        """,
+        "keys": ["segment", "day_of_week"],
+        "sums": ["total_revenue", "sale_count"],
+        "order": [("segment", False), ("day_of_week", False)],
+    },
+    "campaign_lift": {
+        "description": "Revenue, margin and lift per campaign by store and channel (lift vs. sales without a campaign).",
+        "filters": ["year", "quarter", "store", "channel"],
+        "sql": """
+            WITH cells AS (
+                SELECT
+                    f.store_id AS store_id,
+                    f.sales_channel AS sales_channel,
+                    f.campaign_id AS campaign_id,
+                    SUM(f.sale_count) AS sale_count,
+                    SUM(f.total_revenue) AS total_revenue,
+                    SUM(f.discount_amount) AS discount_amount,
+                    SUM(f.profit) AS total_profit
+                FROM campaign_summary f
+                WHERE 1 = 1 {where}
+                GROUP BY f.store_id, f.sales_channel, f.campaign_id
+            )
+            SELECT
+                store_id,
+                sales_channel,
+                campaign_id,
+                sale_count,
+                total_revenue,
+                discount_amount,
+                total_profit,
+                total_profit * 100.0 / NULLIF(total_revenue, 0) AS margin_percent,
+                total_revenue / sale_count AS revenue_per_sale,
+                (total_revenue / sale_count) * 100.0 / NULLIF(
+                    MAX(CASE WHEN campaign_id = 0 THEN total_revenue / sale_count END)
+                        OVER (PARTITION BY store_id, sales_channel),
+                    0
+                ) - 100 AS lift_percent
+            FROM cells
+            ORDER BY store_id, sales_channel, campaign_id
+        """,
+        "keys": ["store_id", "sales_channel", "campaign_id"],
+        "sums": ["sale_count", "total_revenue", "discount_amount", "total_profit"],
+        "order": [("store_id", False), ("sales_channel", False), ("campaign_id", False)],
+    },
+    "discount_bands": {
+        "description": "Revenue, margin and lift per discount band by store and channel (lift vs. the lowest band).",
+        "filters": ["year", "quarter", "store", "channel", "campaign"],
+        "sql": """
+            WITH cells AS (
+                SELECT
+                    f.store_id AS store_id,
+                    f.sales_channel AS sales_channel,
+                    f.discount_floor AS discount_floor,
+                    SUM(f.sale_count) AS sale_count,
+                    SUM(f.gross_amount) AS gross_amount,
+                    SUM(f.discount_amount) AS discount_amount,
+                    SUM(f.total_revenue) AS total_revenue,
+                    SUM(f.profit) AS total_profit
+                FROM campaign_summary f
+                WHERE 1 = 1 {where}
+                GROUP BY f.store_id, f.sales_channel, f.discount_floor
+            )
+            SELECT
+                store_id,
+                sales_channel,
+                discount_floor,
+                sale_count,
+                gross_amount,
+                discount_amount,
+                total_revenue,
+                total_profit,
+                total_profit * 100.0 / NULLIF(total_revenue, 0) AS margin_percent,
+                total_revenue / sale_count AS revenue_per_sale,
+                (total_revenue / sale_count) * 100.0 / NULLIF(
+                    FIRST_VALUE(CASE WHEN discount_floor >= 0 THEN total_revenue / sale_count END)
+                        OVER (PARTITION BY store_id, sales_channel ORDER BY discount_floor < 0, discount_floor),
+                    0
+                ) - 100 AS lift_percent
+            FROM cells
+            ORDER BY store_id, sales_channel, discount_floor
+        """,
+        "keys": ["store_id", "sales_channel", "discount_floor"],
+        "sums": ["sale_count", "gross_amount", "discount_amount", "total_revenue", "total_profit"],
+        "order": [("store_id", False), ("sales_channel", False), ("discount_floor", False)],
+    },
+    "rfm_segments": {
+        "description": "Customers, spend and loyalty by segment and RFM recency / frequency score (5 = best).",
+        "filters": ["segment", "region"],
+        "sql": """
+            SELECT
+                c.customer_segment AS segment,
+                c.r_score AS recency_score,
+                c.f_score AS frequency_score,
+                COUNT(*) AS customers,
+                SUM(c.monetary) AS total_revenue,
+                AVG(c.monetary) AS avg_revenue,
+                AVG(c.recency_days) AS avg_recency_days,
+                AVG(c.loyalty_points) AS avg_loyalty_points
+            FROM customer_rfm c
+            WHERE 1 = 1 {where}
+            GROUP BY c.customer_segment, c.r_score, c.f_score
+            ORDER BY segment, recency_score DESC, frequency_score DESC
+        """,
+    },
+    "cohort_retention": {
+        "description": "Join-month cohort retention: active customers by months since joining.",
+        "filters": ["segment"],
+        "sql": """
+            SELECT
+                c.cohort_month AS cohort_month,
+                c.months_since_join AS months_since_join,
+                SUM(c.cohort_size) AS cohort_size,
+                SUM(c.active_customers) AS active_customers,
+                SUM(c.active_customers) * 100.0 / NULLIF(SUM(c.cohort_size), 0) AS retention_percent,
+                SUM(c.total_revenue) AS total_revenue
+            FROM customer_cohort c
+            WHERE 1 = 1 {where}
+            GROUP BY c.cohort_month, c.months_since_join
+            ORDER BY cohort_month, months_since_join
+        """,
+    },
+}
+
+
+def _iso_date(key: str, raw_value: Any) -> str:
+    """Validate a date filter value and return it as YYYY-MM-DD."""
+    try:
+        return datetime.date.fromisoformat(str(raw_value)).isoformat()
+    except ValueError:
+        raise ValueError(f"Filter '{key}' expects a YYYY-MM-DD date, got {raw_value!r}.")
+
+
+def build_query(name: str, filters: Mapping[str, Any]) -> Tuple[str, List[Any]]:
+    """
+    Build the SQL text and parameters for a named aggregate.
+
+    Text filters match case-insensitively because source casing is not
+    standardized in the warehouse (e.g. 'East', 'EAST', 'east').
+
+    Raises:
+        KeyError: If the aggregate name is unknown.
+        ValueError: If a filter is not accepted by the aggregate or has a bad value.
+    """
+    aggregate = AGGREGATES[name]
+    clauses: List[str] = []
+    params: List[Any] = []
+    for key, raw_value in sorted(filters.items()):
+        if key not in aggregate["filters"]:
+            raise ValueError(f"Filter '{key}' is not supported by aggregate '{name}'.")
+        if key in RANGE_FILTERS:
+            expression, operator = RANGE_FILTERS[key]
+            clauses.append(f"AND {expression} {operator} ?")
+            params.append(_iso_date(key, raw_value))
+            continue
+        expression, value_type = FILTER_COLUMNS[key]
+        try:
+            value = value_type(raw_value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Filter '{key}' expects a {value_type.__name__} value, got {raw_value!r}.")
+        collate = " COLLATE NOCASE" if value_type is str else ""
+        clauses.append(f"AND {expression} = ?{collate}")
+        params.append(value)
+    return aggregate["sql"].format(where=" ".join(clauses)), params
+
+
+def run_aggregate(conn: sqlite3.Connection, name: str, filters: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """Run a named aggregate and return its rows as dictionaries."""
+    sql, params = build_query(name, filters)
+    cursor = conn.execute(sql, params)
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+Row = Dict[str, Any]
+
+
+def _add(left: Any, right: Any) -> Any:
+    """Add two SQL SUM() results; NULL (no values) is the identity."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return left + right
+
+
+def _ratio_percent(part: Any, whole: Any) -> Optional[float]:
+    """part * 100 / whole, or None when SQL would divide by zero or NULL."""
+    if part is None or not whole:
+        return None
+    return part * 100.0 / whole
+
+
+def _finish_profit(rows: List[Row]) -> None:
+    for row in rows:
+        row["avg_profit_margin"] = _ratio_percent(row["total_profit"], row["total_revenue"]) or 0
+
+
+def _finish_channel_share(rows: List[Row]) -> None:
+    total = sum(row["total_revenue"] or 0 for row in rows)
+    for row in rows:
+        row["share_percent"] = _ratio_percent(row["total_revenue"], total)
+
+
+def _finish_yoy_growth(rows: List[Row]) -> None:
+    # Rows are already ordered by category, year, as the LAG() window requires
+    previous: Dict[Any, Any] = {}
+    for row in rows:
+        lag = previous.get(row["category"])
+        row["previous_year_revenue"] = lag
+        growth = _ratio_percent(None if lag is None or row["total_revenue"] is None else row["total_revenue"] - lag, lag)
+        row["yoy_growth_percent"] = growth or 0
+        previous[row["category"]] = row["total_revenue"]
+
+
+def _finish_lift(rows: List[Row], baseline: Callable[[List[Row]], Optional[Row]]) -> None:
+    """Recompute margin, revenue per sale and lift against the baseline row of each store and channel."""
+    groups: Dict[Tuple[Any, Any], List[Row]] = {}
+    for row in rows:
+        row["margin_percent"] = _ratio_percent(row["total_profit"], row["total_revenue"])
+        row["revenue_per_sale"] = row["total_revenue"] / row["sale_count"]
+        groups.setdefault((row["store_id"], row["sales_channel"]), []).append(row)
+    for group in groups.values():
+        base = baseline(group)
+        for row in group:
+            ratio = _ratio_percent(row["revenue_per_sale"], base["revenue_per_sale"] if base else None)
+            row["lift_percent"] = None if ratio is None else ratio - 100
+
+
+def _finish_campaign_lift(rows: List[Row]) -> None:
+    _finish_lift(rows, lambda group: next((row for row in group if row["campaign_id"] == 0), None))
+
+
+def _finish_discount_bands(rows: List[Row]) -> None:
+    _finish_lift(rows, lambda group: min((row for row in group if row["discount_floor"] >= 0),
+                                         key=lambda row: row["discount_floor"], default=None))
+
+
+_FINISHERS: Dict[str, Callable[[List[Row]], None]] = {
+    "profit": _finish_profit,
+    "channel_share": _finish_channel_share,
+    "yoy_growth": _finish_yoy_growth,
+    "campaign_lift": _finish_campaign_lift,
+    "discount_bands": _finish_discount_bands,
+}
+
+
+def _sort_value(value: Any) -> Tuple[bool, Any]:
+    """Sort key that puts NULL first, as SQLite does in ascending order."""
+    return (value is not None, value)
+
+
+def merge_aggregate_rows(name: str, partials: Iterable[List[Row]]) -> List[Row]:
+    """
+    Combine the results of one aggregate computed on several shards.
+
+    Args:
+        name (str): Aggregate name.
+        partials (iterable): One run_aggregate() result per shard.
+
+    Returns:
+        list: The rows run_aggregate() would return on the whole warehouse.
+
+    Raises:
+        ValueError: If the aggregate has no merge rule (see the module docstring).
+    """
+    aggregate = AGGREGATES[name]
+    if "keys" not in aggregate:
+        raise ValueError(f"Aggregate '{name}' cannot be merged across shards.")
+    merged: Dict[Tuple[Any, ...], Row] = {}
+    for rows in partials:
+        for row in rows:
+            key = tuple(row[column] for column in aggregate["keys"])
+            target = merged.get(key)
+            if target is None:
+                merged[key] = dict(row)
+                continue
+            for column in aggregate["sums"]:
+                target[column] = _add(target[column], row[column])
+
+    result = list(merged.values())
+    for column, descending in reversed(aggregate["order"]):  # Stable sorts, last key first
+        result.sort(key=lambda row: _sort_value(row[column]), reverse=descending)
+    finish = _FINISHERS.get(name)
+    if finish:
+        finish(result)
+    return result
@@ -0,0 +1,234 @@
+"""
+utils/olap_sketches.py
+
+Per-cell sketches stored in the warehouse for fast customer analytics.
+
+During the ETL load (scripts/etl_to_dw.py) one sketch is built per cube cell
+and saved as a blob in the sale_sketch table:
+- customers_day: HyperLogLog of customer_id per (segment, region, sale date)
+- products_quarter: SpaceSaving top products by revenue per (category, year, quarter)
+
+Queries merge the matching cells instead of scanning sales, so questions like
+"unique customers by segment and weekday" or "top 10 products in Electronics
+this quarter" read a few KB of sketches. Each query also has an exact mode
+that runs the equivalent SQL over sale_fact. Exact mode is used automatically
+when the warehouse holds no sketches (e.g. loaded by an older ETL).
+
+Text filters match case-insensitively, as in utils/olap_queries.py.
+Sketches are built per warehouse file; queries on smart_sales.db raise
+RuntimeError while it is sharded (see utils/shards.py).
+
+Example:
+    from utils.olap_sketches import distinct_customers, top_products
+    rows = distinct_customers(conn, group_by=["segment", "weekday"])
+    rows = top_products(conn, category="Electronics", year=2025, quarter=2, k=10)
+"""
+
+import datetime
+import json
+import sqlite3
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import pandas as pd
+
+from utils.shards import require_single_warehouse
+from utils.sketches import HyperLogLog, SpaceSaving
+
+SKETCH_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS sale_sketch (
+        sketch_name TEXT NOT NULL,
+        cell TEXT NOT NULL,
+        sketch BLOB NOT NULL,
+        PRIMARY KEY (sketch_name, cell)
+    )
+"""
+
+# Group-by / filter name -> column of the joined sales frame used to build the cells
+CUSTOMER_DIMENSIONS: Dict[str, str] = {"segment": "customer_segment", "region": "region", "date": "sale_date_iso"}
+PRODUCT_DIMENSIONS: Dict[str, str] = {"category": "category", "year": "sale_year", "quarter": "sale_quarter"}
+
+
+def _cell_key(values: Sequence[Any]) -> str:
+    return json.dumps([v.item() if hasattr(v, "item") else v for v in values])
+
+
+def build_sale_sketches(fact_df: pd.DataFrame) -> List[tuple]:
+    """
+    Build one sketch per cube cell from joined sales.
+
+    Args:
+        fact_df (pd.DataFrame): Sales with customer_id, product_id, total_revenue
+            and the columns in CUSTOMER_DIMENSIONS and PRODUCT_DIMENSIONS.
+
+    Returns:
+        list: (sketch_name, cell, blob) rows for the sale_sketch table.
+    """
+    rows = []
+    customer_columns = list(CUSTOMER_DIMENSIONS.values())
+    dated = fact_df.dropna(subset=["sale_date_iso", "customer_id"])
+    for cell, group in dated.groupby(customer_columns, dropna=False, observed=True):
+        sketch = HyperLogLog().add(group["customer_id"].astype("int64"))
+        rows.append(("customers_day", _cell_key(cell), sketch.to_bytes()))
+
+    product_columns = list(PRODUCT_DIMENSIONS.values())
+    # Year and quarter arrive as floats when undated sales are in the same column; cells use ints
+    dated = fact_df.dropna(subset=["sale_year", "product_id"]).astype({"sale_year": "int64", "sale_quarter": "int64"})
+    for cell, group in dated.groupby(product_columns, dropna=False, observed=True):
+        sketch = SpaceSaving().add(group["product_id"].astype("int64"), group["total_revenue"])
+        rows.append(("products_quarter", _cell_key(cell), sketch.to_bytes()))
+    return rows
+
+
+def _load_cells(conn: sqlite3.Connection, sketch_name: str) -> Optional[List[tuple]]:
+    """Return (cell values, blob) pairs, or None if the warehouse has no such sketches."""
+    try:
+        rows = conn.execute("SELECT cell, sketch FROM sale_sketch WHERE sketch_name = ?", (sketch_name,)).fetchall()
+    except sqlite3.OperationalError:
+        return None  # Warehouse created before sale_sketch existed
+    return [(json.loads(cell), blob) for cell, blob in rows] or None
+
+
+def _matches(value: Any, wanted: Any) -> bool:
+    if isinstance(value, str) and isinstance(wanted, str):
+        return value.casefold() == wanted.casefold()
+    return value == wanted
+
+
+def distinct_customers(
+    conn: sqlite3.Connection,
+    group_by: Sequence[str] = ("segment", "weekday"),
+    filters: Optional[Mapping[str, Any]] = None,
+    exact: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Count distinct customers per group.
+
+    Args:
+        conn (sqlite3.Connection): Warehouse connection.
+        group_by (sequence): Any of "segment", "region", "date", "weekday" (0 = Monday).
+        filters (mapping, optional): "segment", "region", "start" and/or "end" (YYYY-MM-DD).
+        exact (bool): Count with SQL over sale_fact instead of merging sketches.
+
+    Returns:
+        list: Rows with the group-by keys and "customers".
+    """
+    group_by = list(group_by)
+    filters = dict(filters or {})
+    unknown = [g for g in group_by if g not in ("segment", "region", "date", "weekday")]
+    unknown += [f for f in filters if f not in ("segment", "region", "start", "end")]
+    if unknown:
+        raise ValueError(f"Unsupported group-by or filter: {', '.join(unknown)}")
+    require_single_warehouse(conn)
+
+    cells = None if exact else _load_cells(conn, "customers_day")
+    if cells is None:
+        return _distinct_customers_exact(conn, group_by, filters)
+
+    merged: Dict[tuple, HyperLogLog] = {}
+    for (segment, region, date), blob in cells:
+        values = {"segment": segment, "region": region, "date": date,
+                  "weekday": datetime.date.fromisoformat(date).weekday()}
+        if any(not _matches(values[key], filters[key]) for key in ("segment", "region") if key in filters):
+            continue
+        if "start" in filters and date < filters["start"] or "end" in filters and date > filters["end"]:
+            continue
+        key = tuple(values[g] for g in group_by)
+        sketch = HyperLogLog.from_bytes(blob)
+        if key in merged:
+            merged[key].merge(sketch)
+        else:
+            merged[key] = sketch
+    return [
+        {**dict(zip(group_by, key)), "customers": round(sketch.estimate())}
+        for key, sketch in sorted(merged.items(), key=lambda item: [str(v) for v in item[0]])
+    ]
+
+
+def _distinct_customers_exact(conn: sqlite3.Connection, group_by: List[str], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    expressions = {"segment": "c.customer_segment", "region": "c.region", "date": "f.sale_date_iso", "weekday": "f.sale_dow"}
+    clauses, params = ["f.sale_date_iso IS NOT NULL"], []
+    for key in ("segment", "region"):
+        if key in filters:
+            clauses.append(f"{expressions[key]} = ? COLLATE NOCASE")
+            params.append(filters[key])
+    if "start" in filters:
+        clauses.append("f.sale_date_iso >= ?")
+        params.append(filters["start"])
+    if "end" in filters:
+        clauses.append("f.sale_date_iso <= ?")
+        params.append(filters["end"])
+    select = [f"{expressions[g]} AS {g}" for g in group_by]
+    sql = f"""
+        SELECT {', '.join(select + ['COUNT(DISTINCT f.customer_id) AS customers'])}
+        FROM sale_fact f
+        JOIN customer c ON c.customer_id = f.customer_id
+        WHERE {' AND '.join(clauses)}
+        {'GROUP BY ' + ', '.join(expressions[g] for g in group_by) if group_by else ''}
+        {'ORDER BY ' + ', '.join(group_by) if group_by else ''}
+    """
+    cursor = conn.execute(sql, params)
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def top_products(
+    conn: sqlite3.Connection,
+    category: Optional[str] = None,
+    year: Optional[int] = None,
+    quarter: Optional[int] = None,
+    k: int = 10,
+    exact: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Top products by revenue, optionally within a category, year and quarter.
+
+    Approximate results report "revenue" as an upper bound and "max_error"
+    as how much it may overstate the true revenue; exact results have
+    max_error 0.
+
+    Returns:
+        list: Rows with product_id, revenue and max_error, heaviest first.
+    """
+    require_single_warehouse(conn)
+    cells = None if exact else _load_cells(conn, "products_quarter")
+    if cells is None:
+        return _top_products_exact(conn, category, year, quarter, k)
+
+    summary: Optional[SpaceSaving] = None
+    for (cell_category, cell_year, cell_quarter), blob in cells:
+        if category is not None and not _matches(cell_category, category):
+            continue
+        if year is not None and cell_year != int(year) or quarter is not None and cell_quarter != int(quarter):
+            continue
+        sketch = SpaceSaving.from_bytes(blob)
+        summary = sketch if summary is None else summary.merge(sketch)
+    if summary is None:
+        return []
+    return [{"product_id": item, "revenue": count, "max_error": error} for item, count, error in summary.top(k)]
+
+
+def _top_products_exact(
+    conn: sqlite3.Connection, category: Optional[str], year: Optional[int], quarter: Optional[int], k: int
+) -> List[Dict[str, Any]]:
+    clauses, params = ["f.sale_year IS NOT NULL"], []
+    if category is not None:
+        clauses.append("p.category = ? COLLATE NOCASE")
+        params.append(category)
+    if year is not None:
+        clauses.append("f.sale_year = ?")
+        params.append(int(year))
+    if quarter is not None:
+        clauses.append("f.sale_quarter = ?")
+        params.append(int(quarter))
+    sql = f"""
+        SELECT f.product_id AS product_id, SUM(f.total_revenue) AS revenue, 0 AS max_error
+        FROM sale_fact f
+        JOIN product p ON p.product_id = f.product_id
+        WHERE {' AND '.join(clauses)}
+        GROUP BY f.product_id
+        ORDER BY revenue DESC
+        LIMIT ?
+    """
+    cursor = conn.execute(sql, params + [int(k)])
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -0,0 +1,178 @@
+"""
+utils/partitions.py
+
+Date-partitioned storage for prepared tables.
+
+A table is written as Hive-style directories, one CSV per calendar month:
+
+    data/prepared/sales/
+        _partitions.json
+        year=2025/month=05/part-0.csv
+        year=2025/month=06/part-0.csv
+
+_partitions.json records each partition's row count and the min/max of the
+partition date and of every numeric column. Readers use these stats to skip
+partitions outside a requested date range before opening any file. Only
+partitions that straddle a range boundary are filtered row by row.
+
+Rows whose date cannot be parsed go to year=__unknown__/month=__unknown__.
+They are only read when no date range is given.
+
+Example:
+    from utils.partitions import read_partitioned, write_partitioned
+    write_partitioned(sales_df, PREPARED_DATA_DIR / "sales", "SaleDate")
+    q2_df = read_partitioned(PREPARED_DATA_DIR / "sales", start="2025-04-01", end="2025-06-30")
+"""
+
+import json
+import pathlib
+import shutil
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+STATS_FILE_NAME = "_partitions.json"
+PART_FILE_NAME = "part-0.csv"
+UNKNOWN_PARTITION = "__unknown__"
+
+PathLike = Union[str, pathlib.Path]
+DateLike = Union[str, pd.Timestamp, None]
+
+
+def _to_timestamp(value: DateLike) -> Optional[pd.Timestamp]:
+    return None if value is None else pd.Timestamp(value)
+
+
+def _column_stats(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Min/max of every numeric column, as plain JSON values."""
+    stats = {}
+    for column in df.select_dtypes("number").columns:
+        series = df[column].dropna()
+        if not series.empty:
+            stats[str(column)] = {"min": series.min().item(), "max": series.max().item()}
+    return stats
+
+
+def write_partitioned(df: pd.DataFrame, base_dir: PathLike, date_column: str) -> Dict[str, Any]:
+    """
+    Write a DataFrame as year/month partitions with per-partition stats.
+
+    Any previous partitions under base_dir are replaced. Rows keep their
+    original column values; the date is only parsed to choose the partition.
+
+    Args:
+        df (pd.DataFrame): Table to write.
+        base_dir (PathLike): Root directory of the partitioned table.
+        date_column (str): Column used to partition the rows.
+
+    Returns:
+        dict: The stats that were written to _partitions.json.
+    """
+    if date_column not in df.columns:
+        raise ValueError(f"Column '{date_column}' not found in the DataFrame.")
+    base_dir = pathlib.Path(base_dir)
+    if base_dir.exists():
+        shutil.rmtree(base_dir)
+    base_dir.mkdir(parents=True)
+
+    dates = pd.to_datetime(df[date_column], errors="coerce")
+    year = dates.dt.strftime("%Y").fillna(UNKNOWN_PARTITION)
+    month = dates.dt.strftime("%m").fillna(UNKNOWN_PARTITION)
+
+    partitions: List[Dict[str, Any]] = []
+    for (year_key, month_key), part_df in df.groupby([year, month], sort=True):
+        relative_path = pathlib.Path(f"year={year_key}", f"month={month_key}", PART_FILE_NAME)
+        file_path = base_dir / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        part_df.to_csv(file_path, index=False)
+        part_dates = dates.loc[part_df.index].dropna()
+        partitions.append({
+            "path": relative_path.as_posix(),
+            "year": year_key,
+            "month": month_key,
+            "row_count": len(part_df),
+            "date_min": part_dates.min().date().isoformat() if not part_dates.empty else None,
+            "date_max": part_dates.max().date().isoformat() if not part_dates.empty else None,
+            "columns": _column_stats(part_df),
+        })
+
+    stats = {"date_column": date_column, "row_count": len(df), "partitions": partitions}
+    (base_dir / STATS_FILE_NAME).write_text(json.dumps(stats, indent=2), encoding="utf-8")
+    return stats
+
+
+def read_partition_stats(base_dir: PathLike) -> Optional[Dict[str, Any]]:
+    """Return the stats of a partitioned table, or None if it has not been written."""
+    path = pathlib.Path(base_dir) / STATS_FILE_NAME
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def prune_partitions(stats: Dict[str, Any], start: DateLike = None, end: DateLike = None) -> List[Dict[str, Any]]:
+    """
+    Select the partitions that can hold rows dated within [start, end].
+
+    Args:
+        stats (dict): Table stats from read_partition_stats().
+        start, end: Inclusive date bounds; None leaves that side open.
+
+    Returns:
+        list: Stats entries of the partitions to read.
+    """
+    start_ts, end_ts = _to_timestamp(start), _to_timestamp(end)
+    if start_ts is None and end_ts is None:
+        return list(stats["partitions"])
+    selected = []
+    for partition in stats["partitions"]:
+        if partition["date_min"] is None:
+            continue  # Undated rows cannot match a date range
+        if start_ts is not None and pd.Timestamp(partition["date_max"]) < start_ts.normalize():
+            continue
+        if end_ts is not None and pd.Timestamp(partition["date_min"]) > end_ts:
+            continue
+        selected.append(partition)
+    return selected
+
+
+def read_partitioned(base_dir: PathLike, start: DateLike = None, end: DateLike = None) -> pd.DataFrame:
+    """
+    Read the rows of a partitioned table dated within [start, end].
+
+    Partitions are pruned on their stats first. Rows are only filtered
+    inside partitions that extend past a range boundary.
+
+    Args:
+        base_dir (PathLike): Root directory of the partitioned table.
+        start, end: Inclusive date bounds; None leaves that side open.
+
+    Returns:
+        pd.DataFrame: Matching rows (empty if no partition matches).
+
+    Raises:
+        FileNotFoundError: If base_dir holds no partition stats.
+    """
+    base_dir = pathlib.Path(base_dir)
+    stats = read_partition_stats(base_dir)
+    if stats is None:
+        raise FileNotFoundError(f"No partition stats found in {base_dir}")
+    start_ts, end_ts = _to_timestamp(start), _to_timestamp(end)
+    date_column = stats["date_column"]
+
+    frames = []
+    for partition in prune_partitions(stats, start_ts, end_ts):
+        part_df = pd.read_csv(base_dir / partition["path"])
+        inside_start = start_ts is None or pd.Timestamp(partition["date_min"]) >= start_ts
+        inside_end = end_ts is None or pd.Timestamp(partition["date_max"]) <= end_ts
+        if not (inside_start and inside_end):
+            dates = pd.to_datetime(part_df[date_column], errors="coerce")
+            keep = pd.Series(True, index=part_df.index)
+            if start_ts is not None:
+                keep &= dates >= start_ts
+            if end_ts is not None:
+                keep &= dates <= end_ts
+            part_df = part_df[keep]
+        frames.append(part_df)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
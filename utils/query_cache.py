@@ -0,0 +1,256 @@
+"""
+utils/query_cache.py
+
+Two-tier cache for warehouse query results.
+
+Results are keyed by the database they came from, the normalized SQL text,
+the bound parameters and the warehouse version stamp that the ETL bumps on
+every commit (see utils/warehouse.py). A reload therefore invalidates every
+cached result without any explicit purge. read_sql_cached() keys on
+read_cache_stamp(), the version plus the random id of the load that set it,
+so a warehouse file that is deleted and rebuilt (its version restarting at
+1) does not match results cached from the previous build. The database is part of the key
+because the disk tier is shared: two warehouses at the same version (a test
+copy and the live file, or a single file and a shard set) must not serve
+each other's results. read_sql_cached() uses the resolved file path of the
+connection (database_identity()); callers caching results of a shard set pass
+the path of its manifest.
+
+Tiers:
+- Memory: an LRU of DataFrames, bounded by total in-memory size in bytes.
+- Disk (optional): one columnar file per result (Parquet when pyarrow is
+  installed, pickle otherwise), bounded by total file size. The least
+  recently used files are evicted first.
+
+Hit, miss and eviction counters are available from QueryCache.stats().
+
+Example:
+    from utils.query_cache import QueryCache, read_sql_cached
+    cache = QueryCache(disk_dir=pathlib.Path("data/cache/query_results"))
+    df = read_sql_cached(conn, "SELECT * FROM sale WHERE store_id = ?", (401,), cache=cache)
+"""
+
+import collections
+import hashlib
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+import pandas as pd
+
+from utils.columnar_reader import read_sql_columnar
+from utils.warehouse import read_cache_stamp
+
+try:
+    import pyarrow  # noqa: F401  (only needed for the Parquet disk format)
+    DISK_FORMAT = "parquet"
+except ImportError:
+    DISK_FORMAT = "pkl"
+
+DEFAULT_MEMORY_LIMIT_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_LIMIT_BYTES = 512 * 1024 * 1024
+
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_LINE_COMMENT = re.compile(r"--[^\n]*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Normalize SQL text for use in a cache key.
+
+    Comments and runs of whitespace outside string literals are collapsed and
+    a trailing semicolon is dropped, so formatting changes do not miss the cache.
+    """
+    parts = _STRING_LITERAL.split(sql)
+    for i in range(0, len(parts), 2):  # Even indexes are outside string literals
+        parts[i] = _WHITESPACE.sub(" ", _LINE_COMMENT.sub(" ", parts[i]))
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def make_cache_key(sql: str, params: Optional[Sequence[Any]], version: Union[int, str], database: str = "") -> str:
+    """Hash the database identity, normalized SQL, parameters and warehouse version stamp into a cache key."""
+    payload = repr((database, normalize_sql(sql), tuple(params or ()), str(version)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def database_identity(conn: sqlite3.Connection) -> str:
+    """
+    Identify the database a connection reads: its resolved file path.
+
+    In-memory and temporary databases have no file, so they are identified
+    by the connection itself and never share cached results.
+    """
+    for _, name, file_name in conn.execute("PRAGMA database_list"):
+        if name == "main" and file_name:
+            return str(pathlib.Path(file_name).resolve())
+    return f"memory:{id(conn)}"
+
+
+class QueryCache:
+    """LRU memory tier plus an optional size-bounded on-disk tier for query results."""
+
+    def __init__(
+        self,
+        memory_limit_bytes: int = DEFAULT_MEMORY_LIMIT_BYTES,
+        disk_dir: Optional[pathlib.Path] = None,
+        disk_limit_bytes: int = DEFAULT_DISK_LIMIT_BYTES,
+    ):
+        self.memory_limit_bytes = memory_limit_bytes
+        self.disk_limit_bytes = disk_limit_bytes
+        self.disk_dir = pathlib.Path(disk_dir) if disk_dir is not None else None
+        self._memory: "collections.OrderedDict[str, pd.DataFrame]" = collections.OrderedDict()
+        self._memory_sizes: Dict[str, int] = {}
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self._counters = collections.Counter()
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    # ---- Public API ----
+
+    def get(
+        self, sql: str, params: Optional[Sequence[Any]], version: Union[int, str], database: str = "",
+    ) -> Optional[pd.DataFrame]:
+        """Return a cached result, or None on a miss."""
+        key = make_cache_key(sql, params, version, database)
+        with self._lock:
+            df = self._memory.get(key)
+            if df is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return df.copy()
+            df = self._read_disk(key)
+            if df is not None:
+                self._counters["disk_hits"] += 1
+                self._put_memory(key, df)
+                return df.copy()
+            self._counters["misses"] += 1
+            return None
+
+    def put(
+        self, sql: str, params: Optional[Sequence[Any]], version: Union[int, str], df: pd.DataFrame, database: str = "",
+    ) -> None:
+        """Store a result in memory and, when configured, on disk."""
+        key = make_cache_key(sql, params, version, database)
+        with self._lock:
+            self._put_memory(key, df.copy())
+            self._write_disk(key, df)
+
+    def get_or_compute(
+        self,
+        sql: str,
+        params: Optional[Sequence[Any]],
+        version: Union[int, str],
+        compute: Callable[[], pd.DataFrame],
+        database: str = "",
+    ) -> pd.DataFrame:
+        """Return the cached result, or run compute() and cache what it returns."""
+        df = self.get(sql, params, version, database)
+        if df is None:
+            df = compute()
+            self.put(sql, params, version, df, database)
+        return df
+
+    def clear(self) -> None:
+        """Drop every cached result from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_sizes.clear()
+            self._memory_bytes = 0
+            for path in self._disk_files():
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current tier sizes."""
+        with self._lock:
+            stats = {name: self._counters[name] for name in
+                     ("memory_hits", "disk_hits", "misses", "memory_evictions", "disk_evictions")}
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+            stats["disk_bytes"] = sum(path.stat().st_size for path in self._disk_files())
+            return stats
+
+    # ---- Memory tier ----
+
+    def _put_memory(self, key: str, df: pd.DataFrame) -> None:
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.memory_limit_bytes:
+            return  # Larger than the whole tier; keep it on disk only
+        if key in self._memory:
+            self._memory_bytes -= self._memory_sizes[key]
+        self._memory[key] = df
+        self._memory.move_to_end(key)
+        self._memory_sizes[key] = size
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_limit_bytes:
+            evicted_key, _ = self._memory.popitem(last=False)
+            self._memory_bytes -= self._memory_sizes.pop(evicted_key)
+            self._counters["memory_evictions"] += 1
+
+    # ---- Disk tier ----
+
+    def _disk_path(self, key: str) -> pathlib.Path:
+        return self.disk_dir / f"{key}.{DISK_FORMAT}"
+
+    def _disk_files(self):
+        if self.disk_dir is None:
+            return []
+        return list(self.disk_dir.glob(f"*.{DISK_FORMAT}"))
+
+    def _read_disk(self, key: str) -> Optional[pd.DataFrame]:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        try:
+            df = pd.read_parquet(path) if DISK_FORMAT == "parquet" else pd.read_pickle(path)
+        except Exception:
+            path.unlink(missing_ok=True)  # Corrupt or partial file; treat as a miss
+            return None
+        os.utime(path)  # Refresh recency for LRU eviction
+        return df
+
+    def _write_disk(self, key: str, df: pd.DataFrame) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        if DISK_FORMAT == "parquet":
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        files = sorted(self._disk_files(), key=lambda p: p.stat().st_mtime_ns)
+        total = sum(path.stat().st_size for path in files)
+        while files and total > self.disk_limit_bytes:
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+            self._counters["disk_evictions"] += 1
+
+
+def read_sql_cached(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    cache: Optional[QueryCache] = None,
+) -> pd.DataFrame:
+    """
+    Run a warehouse query through the cache.
+
+    The current warehouse stamp is read from the same connection, so a
+    result is never served from before the latest ETL commit, from an
+    earlier build of the file, nor from another database.
+    """
+    if cache is None:
+        return read_sql_columnar(conn, sql, params)
+    return cache.get_or_compute(sql, params, read_cache_stamp(conn), lambda: read_sql_columnar(conn, sql, params),
+                                database=database_identity(conn))
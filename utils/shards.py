@@ -0,0 +1,221 @@
+"""
+utils/shards.py
+
+Store-sharded data warehouses.
+
+A sharded warehouse splits the sales fact table across several SQLite files
+by contiguous store_id ranges, so loads are not limited by a single writer:
+- Every shard is a complete warehouse (schema, customer and product
+  dimensions, the sales of its stores, sketches and version stamp). It is
+  built by scripts/etl_to_dw.py in its own process, with its own WAL writer
+  and staging database.
+- Store ranges are balanced by sales rows (plan_store_ranges()). The first
+  range is open below and also holds sales without a store id; the last is
+  open above.
+- The shard manifest (smart_sales.shards.json next to smart_sales.db) lists
+  each shard file and its store range. It is only written once every shard
+  has been published, and while it exists, readers use the shards instead of
+  smart_sales.db. A sharded load does not update smart_sales.db, so readers
+  that only understand one warehouse file call require_single_warehouse()
+  and fail instead of reading a stale or missing file.
+
+ShardedWarehouse fans a named aggregate out to all shards on a thread pool,
+with one reader pool per shard, and merges the partial results with
+utils/olap_queries.merge_aggregate_rows(). A "store" filter only queries the
+shard that holds the store. The version of a sharded warehouse is the sum of
+its shard versions, so it changes whenever any shard is reloaded.
+
+Example:
+    from utils.shards import ShardedWarehouse, read_shard_manifest
+    manifest = read_shard_manifest(DB_PATH)
+    if manifest:
+        with ShardedWarehouse(manifest) as warehouse:
+            rows = warehouse.run_aggregate("profit", {"year": "2025"})
+"""
+
+import concurrent.futures
+import json
+import os
+import pathlib
+import re
+import sqlite3
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Union
+
+from utils.olap_queries import AGGREGATES, merge_aggregate_rows, run_aggregate
+from utils.warehouse import DB_PATH, DEFAULT_POOL_SIZE, ConnectionPool, PathLike, read_version
+
+MANIFEST_SUFFIX = ".shards.json"
+
+
+class StoreRange(NamedTuple):
+    """Store ids low <= store_id < high; None leaves that end open."""
+    low: Optional[int]
+    high: Optional[int]
+
+    def holds(self, store_id: float) -> bool:
+        return (self.low is None or store_id >= self.low) and (self.high is None or store_id < self.high)
+
+
+def manifest_path_for(db_path: PathLike = DB_PATH) -> pathlib.Path:
+    """Return the shard manifest of a warehouse."""
+    db_path = pathlib.Path(db_path)
+    return db_path.with_name(db_path.stem + MANIFEST_SUFFIX)
+
+
+def shard_path_for(db_path: PathLike, index: int) -> pathlib.Path:
+    """Return the file of shard `index` (smart_sales.shard-00.db, ...)."""
+    db_path = pathlib.Path(db_path)
+    return db_path.with_name(f"{db_path.stem}.shard-{index:02d}{db_path.suffix}")
+
+
+def plan_store_ranges(store_counts: Mapping[int, int], shard_count: int) -> List[StoreRange]:
+    """
+    Split store ids into at most shard_count contiguous ranges with similar sales counts.
+
+    Args:
+        store_counts (mapping): Store id -> number of sales rows.
+        shard_count (int): Number of shards wanted.
+
+    Returns:
+        list: StoreRange per shard, in store id order. There are fewer
+            ranges than requested when there are fewer stores.
+    """
+    if shard_count < 1:
+        raise ValueError("shard_count must be at least 1.")
+    stores = sorted(store_counts)
+    total = sum(store_counts.values())
+    starts: List[int] = []
+    done = 0
+    for store in stores:
+        # Start the next shard at the store whose middle row crosses that shard's share of the rows
+        if not starts or (len(starts) < shard_count
+                          and done + store_counts[store] / 2 >= total * len(starts) / shard_count):
+            starts.append(store)
+        done += store_counts[store]
+    if not starts:
+        return [StoreRange(None, None)]
+    bounds: List[Optional[int]] = [None] + [int(s) for s in starts[1:]] + [None]
+    return [StoreRange(low, high) for low, high in zip(bounds[:-1], bounds[1:])]
+
+
+def write_shard_manifest(db_path: PathLike, shard_paths: Sequence[PathLike], ranges: Sequence[StoreRange]) -> pathlib.Path:
+    """Atomically write the manifest that switches readers to the given shards."""
+    path = manifest_path_for(db_path)
+    shards = [
+        {"path": pathlib.Path(shard).name, "store_low": store_range.low, "store_high": store_range.high}
+        for shard, store_range in zip(shard_paths, ranges)
+    ]
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_text(json.dumps({"shards": shards}, indent=2), encoding="utf-8")
+    os.replace(temporary, path)
+    return path
+
+
+def read_shard_manifest(db_path: PathLike = DB_PATH) -> Optional[List[Dict[str, Any]]]:
+    """
+    Return the shards of a warehouse, or None if it is not sharded.
+
+    Returns:
+        list: One dict per shard with "path" (absolute) and "range" (StoreRange).
+    """
+    path = manifest_path_for(db_path)
+    if not path.exists():
+        return None
+    shards = json.loads(path.read_text(encoding="utf-8"))["shards"]
+    return [
+        {"path": path.parent / shard["path"], "range": StoreRange(shard["store_low"], shard["store_high"])}
+        for shard in shards
+    ]
+
+
+def require_single_warehouse(target: Union[PathLike, sqlite3.Connection] = DB_PATH) -> None:
+    """
+    Fail if a warehouse is sharded, for readers that can only read one warehouse file.
+
+    Args:
+        target (PathLike or sqlite3.Connection): Warehouse file, or a connection to it.
+
+    Raises:
+        RuntimeError: If a shard manifest exists next to the warehouse file.
+    """
+    if isinstance(target, sqlite3.Connection):
+        files = [file_name for _, name, file_name in target.execute("PRAGMA database_list") if name == "main"]
+        if not files or not files[0]:
+            return  # In-memory database
+        target = files[0]
+    manifest = manifest_path_for(target)
+    if manifest.exists():
+        raise RuntimeError(
+            f"{pathlib.Path(target).name} is sharded ({manifest.name}); the last load did not update it. "
+            "This report reads a single warehouse: reload without --shards to use it."
+        )
+
+
+def remove_shards(db_path: PathLike = DB_PATH, keep: Sequence[PathLike] = ()) -> None:
+    """Delete shard files (and their WAL, shared-memory and staging files) except `keep`; with no shards kept, the manifest too."""
+    db_path = pathlib.Path(db_path)
+    if not keep:
+        manifest_path_for(db_path).unlink(missing_ok=True)
+    kept = {pathlib.Path(path).name for path in keep}
+    pattern = re.compile(re.escape(db_path.stem) + r"\.shard-(\d+)\.")
+    for path in db_path.parent.glob(f"{db_path.stem}.shard-*"):
+        match = pattern.match(path.name)
+        if match and shard_path_for(db_path, int(match.group(1))).name not in kept:
+            path.unlink(missing_ok=True)
+
+
+class ShardedWarehouse:
+    """Run named aggregates over all shards in parallel and merge the results."""
+
+    def __init__(self, shards: Sequence[Mapping[str, Any]], pool_size: int = DEFAULT_POOL_SIZE):
+        if not shards:
+            raise ValueError("A sharded warehouse needs at least one shard.")
+        self.shards = list(shards)
+        self.pools = [ConnectionPool(shard["path"], max_size=pool_size) for shard in self.shards]
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(self.shards) * pool_size, thread_name_prefix="olap-shard")
+
+    def __enter__(self) -> "ShardedWarehouse":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the fan-out threads and close every shard's connections."""
+        self.executor.shutdown(wait=True)
+        for pool in self.pools:
+            pool.close()
+
+    def _on_shard(self, index: int, func: Any, *args: Any) -> Any:
+        with self.pools[index].connection() as conn:
+            return func(conn, *args)
+
+    def _fan_out(self, indexes: Sequence[int], func: Any, *args: Any) -> List[Any]:
+        futures = [self.executor.submit(self._on_shard, i, func, *args) for i in indexes]
+        return [future.result() for future in futures]
+
+    def _shards_for(self, filters: Mapping[str, Any]) -> List[int]:
+        """Shards that can hold matching sales (all of them unless a store is given)."""
+        indexes = list(range(len(self.shards)))
+        try:
+            store = int(filters["store"])
+        except (KeyError, TypeError, ValueError):
+            return indexes  # Bad store values are reported by the query itself
+        return [i for i in indexes if self.shards[i]["range"].holds(store)]
+
+    def run_aggregate(self, name: str, filters: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Run a named aggregate on the shards in parallel and return the merged rows.
+
+        Raises:
+            ValueError: If a filter is invalid or the aggregate cannot be merged across shards.
+        """
+        if "keys" not in AGGREGATES[name]:
+            raise ValueError(f"Aggregate '{name}' is not available on a sharded warehouse: "
+                             "its per-shard results cannot be combined. Reload without --shards to use it.")
+        return merge_aggregate_rows(name, self._fan_out(self._shards_for(filters), run_aggregate, name, filters))
+
+    def read_version(self) -> int:
+        """Return the combined version stamp (sum of the shard versions)."""
+        return sum(self._fan_out(range(len(self.shards)), read_version))
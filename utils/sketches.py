@@ -0,0 +1,175 @@
+"""
+utils/sketches.py
+
+Mergeable approximate-count sketches with a compact binary form.
+
+- HyperLogLog: distinct-count estimate in fixed memory (2**precision bytes;
+  about 1.6% standard error at the default precision of 12). Two sketches
+  merge by taking the register-wise maximum, so per-day sketches can be
+  rolled up to weeks, weekdays or whole segments without the raw rows.
+- SpaceSaving: heavy hitters (top-K by count or weight) in fixed memory.
+  Every reported total is an upper bound; the matching error is how much
+  it may overstate the true value. Merging follows Agarwal et al.,
+  "Mergeable Summaries" (2012).
+
+Values are hashed with pandas' vectorized 64-bit hash, so adding a whole
+column is a handful of numpy operations.
+
+Example:
+    from utils.sketches import HyperLogLog
+    hll = HyperLogLog()
+    hll.add(customer_ids)
+    blob = hll.to_bytes()
+    HyperLogLog.from_bytes(blob).merge(other).estimate()
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_HLL_PRECISION = 12
+DEFAULT_TOPK_CAPACITY = 64
+
+
+def hash_values(values: Iterable[Any]) -> np.ndarray:
+    """Hash values to uint64 with pandas' stable vectorized hash."""
+    array = np.asarray(values if isinstance(values, (np.ndarray, pd.Series)) else list(values))
+    if array.dtype.kind == "O" or array.dtype.kind == "U":
+        array = array.astype(str).astype(object)
+    return pd.util.hash_array(array)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Exact bit length of each uint64 value (0 for 0)."""
+    x = values.copy()
+    lengths = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= np.uint64(1 << shift)
+        lengths[high] += shift
+        x[high] >>= np.uint64(shift)
+    return lengths + (x > 0)
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2**precision one-byte registers."""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 18, got {precision}.")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values: Iterable[Any]) -> "HyperLogLog":
+        """Add values (any hashable scalars) to the sketch."""
+        return self.add_hashes(hash_values(values))
+
+    def add_hashes(self, hashes: np.ndarray) -> "HyperLogLog":
+        """Add pre-hashed uint64 values to the sketch."""
+        if len(hashes) == 0:
+            return self
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << (64 - p)) - 1)
+        rank = (64 - p) - _bit_length(remainder) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precisions.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        """Estimated number of distinct values added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return float(m * np.log(m / zeros))  # Linear counting for small cardinalities
+        return float(raw)
+
+    def to_bytes(self) -> bytes:
+        """Serialize as one precision byte followed by the registers."""
+        return bytes([self.precision]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "HyperLogLog":
+        sketch = cls(blob[0])
+        sketch.registers = np.frombuffer(blob, dtype=np.uint8, offset=1).copy()
+        return sketch
+
+
+class SpaceSaving:
+    """Top-K heavy hitters tracking at most `capacity` items."""
+
+    def __init__(self, capacity: int = DEFAULT_TOPK_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[Any, float] = {}
+        self.errors: Dict[Any, float] = {}
+
+    def add(self, items: Iterable[Any], weights: Optional[Iterable[float]] = None) -> "SpaceSaving":
+        """
+        Add items, each counted once or with the matching weight.
+
+        Items are totalled exactly within the call first, then offered to the
+        summary heaviest first, which keeps the overestimate small.
+        """
+        series = pd.Series(list(weights) if weights is not None else 1.0, index=list(items), dtype=float)
+        totals = series.groupby(level=0, sort=False).sum().sort_values(ascending=False)
+        for item, weight in totals.items():
+            self._offer(item.item() if hasattr(item, "item") else item, float(weight))
+        return self
+
+    def _offer(self, item: Any, weight: float) -> None:
+        if item in self.counts:
+            self.counts[item] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0.0
+        else:
+            smallest = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(smallest)
+            self.errors.pop(smallest)
+            self.counts[item] = floor + weight
+            self.errors[item] = floor
+
+    def _floor(self) -> float:
+        """Largest amount an untracked item may have (0 while the summary is not full)."""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0.0
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Fold another summary into this one, keeping the `capacity` heaviest items."""
+        own_floor, other_floor = self._floor(), other._floor()
+        counts: Dict[Any, float] = {}
+        errors: Dict[Any, float] = {}
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = self.counts.get(item, own_floor) + other.counts.get(item, other_floor)
+            errors[item] = self.errors.get(item, own_floor) + other.errors.get(item, other_floor)
+        kept = sorted(counts, key=counts.get, reverse=True)[:self.capacity]
+        self.counts = {item: counts[item] for item in kept}
+        self.errors = {item: errors[item] for item in kept}
+        return self
+
+    def top(self, k: int) -> List[Tuple[Any, float, float]]:
+        """The k heaviest items as (item, total upper bound, max overestimate)."""
+        ranked = sorted(self.counts.items(), key=lambda pair: pair[1], reverse=True)[:k]
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def to_bytes(self) -> bytes:
+        payload = {"capacity": self.capacity, "items": [[i, c, self.errors[i]] for i, c in self.counts.items()]}
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "SpaceSaving":
+        payload = json.loads(blob.decode("utf-8"))
+        sketch = cls(payload["capacity"])
+        for item, count, error in payload["items"]:
+            sketch.counts[item] = count
+            sketch.errors[item] = error
+        return sketch
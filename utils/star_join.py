@@ -0,0 +1,240 @@
+"""
+utils/star_join.py
+
+External-memory (Grace hash) join of the sales fact with its dimension tables.
+
+star_join() joins fact CSV files to one or more dimension CSV files without
+holding any of them in memory at once:
+1. Each dimension is read in chunks and spilled to local disk, split into
+   N partitions by the hash of its key.
+2. The fact is read in chunks and spilled by the hash of the first
+   dimension's key, into the same N partitions.
+3. Worker processes each join one fact partition with the matching dimension
+   slice. If another dimension follows, the worker spills its output again,
+   by that dimension's key, for the next pass.
+4. The partitions of the last pass are yielded one at a time as they finish,
+   so the caller can aggregate them as a stream.
+
+Joins are left joins with pandas merge semantics. A fact row with a missing
+or unknown key keeps NaN for that dimension's columns. N is chosen from
+memory_budget_bytes. A worker holds about JOIN_HEADROOM times its partition
+(fact partition, dimension slice and merged result), and every worker must
+fit in the budget together, so memory stays capped no matter how large the
+fact is. Output row order is not preserved.
+
+Example:
+    from utils.star_join import DimensionJoin, star_join
+    dimensions = [
+        DimensionJoin(PREPARED_DATA_DIR / "products_prepared.csv", "ProductID", "productid", ("category",)),
+        DimensionJoin(PREPARED_DATA_DIR / "customers_prepared.csv", "CustomerID", "CustomerID", ("Region",)),
+    ]
+    for joined_df in star_join([PREPARED_DATA_DIR / "sales_prepared.csv"], dimensions, memory_budget_bytes=64 * 2**20):
+        store.apply_batch(process(joined_df))
+"""
+
+import concurrent.futures
+import math
+import os
+import pathlib
+import shutil
+import tempfile
+from typing import Iterator, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+PathLike = Union[str, pathlib.Path]
+
+DEFAULT_MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+JOIN_HEADROOM = 3  # A worker holds its fact partition, the dimension slice and the merged copy
+SAMPLE_ROWS = 10_000  # Fact rows sampled to estimate bytes per row
+
+
+class DimensionJoin(NamedTuple):
+    """One dimension of the star: the fact's foreign key and the dimension columns to bring in."""
+    path: PathLike
+    fact_key: str
+    dim_key: str
+    columns: Tuple[str, ...]
+
+
+def partition_ids(keys: pd.Series, num_partitions: int) -> np.ndarray:
+    """
+    Assign every key to a partition.
+
+    Numeric keys are hashed by value, so 1000 and 1000.0 land in the same
+    partition whichever table (int or float column) they come from.
+    """
+    numeric = pd.to_numeric(keys, errors="coerce")
+    by_value = pd.util.hash_array(numeric.to_numpy(dtype="float64") + 0.0)  # + 0.0 turns -0.0 into 0.0
+    by_text = pd.util.hash_array(keys.astype(str).to_numpy(dtype=object))
+    hashes = np.where(numeric.notna().to_numpy() | keys.isna().to_numpy(), by_value, by_text)
+    return (hashes % np.uint64(num_partitions)).astype(np.int64)
+
+
+def _spill(df: pd.DataFrame, key: str, num_partitions: int, directory: pathlib.Path, tag: str) -> None:
+    """Split a frame by key hash and write each piece as <directory>/part-NNNNN/<tag>.pkl."""
+    if df.empty:
+        return
+    for partition, piece in df.groupby(partition_ids(df[key], num_partitions), sort=False):
+        part_dir = directory / f"part-{partition:05d}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        piece.to_pickle(part_dir / f"{tag}.pkl")
+
+
+def _read_partition(directory: pathlib.Path) -> Optional[pd.DataFrame]:
+    """Concatenate the spilled pieces of one partition, or None if it is empty."""
+    pieces = sorted(directory.glob("*.pkl")) if directory.exists() else []
+    if not pieces:
+        return None
+    return pd.concat([pd.read_pickle(piece) for piece in pieces], ignore_index=True)
+
+
+def _join_partition(
+    fact_dir: str,
+    dim_dir: str,
+    fact_key: str,
+    columns: Tuple[str, ...],
+    next_key: Optional[str],
+    num_partitions: int,
+    output_dir: str,
+    tag: str,
+) -> Optional[str]:
+    """
+    Join one fact partition with its dimension slice (runs in a worker process).
+
+    Returns:
+        str: Path of the joined partition for the last pass; None otherwise or if the partition is empty.
+    """
+    fact_df = _read_partition(pathlib.Path(fact_dir))
+    if fact_df is None:
+        return None
+    dim_df = _read_partition(pathlib.Path(dim_dir))
+    if dim_df is None:
+        joined = fact_df
+        for column in columns:
+            joined[column] = np.nan
+    else:
+        joined = fact_df.merge(dim_df, on=fact_key, how="left")
+    del fact_df, dim_df
+
+    if next_key is not None:
+        _spill(joined, next_key, num_partitions, pathlib.Path(output_dir), tag)
+        return None
+    output_path = pathlib.Path(output_dir) / f"{tag}.pkl"
+    joined.to_pickle(output_path)
+    return str(output_path)
+
+
+def estimate_partitions(
+    fact_paths: Sequence[PathLike],
+    memory_budget_bytes: int,
+    max_workers: int,
+    usecols: Optional[Sequence[str]] = None,
+) -> Tuple[int, int]:
+    """
+    Size the spill partitions and read chunks for a memory budget.
+
+    The in-memory bytes per row are measured on a sample of the first fact
+    file and scaled to the total size of all fact files on disk.
+
+    Returns:
+        tuple: (number of partitions, rows per read chunk)
+    """
+    first = pathlib.Path(fact_paths[0])
+    sample = pd.read_csv(first, nrows=SAMPLE_ROWS, usecols=usecols)
+    if sample.empty:
+        return 1, SAMPLE_ROWS
+    with open(first, "rb") as handle:
+        lines = [handle.readline() for _ in range(len(sample) + 1)]
+    disk_bytes_per_row = max(sum(len(line) for line in lines[1:]) / len(sample), 1.0)
+    memory_bytes_per_row = max(sample.memory_usage(deep=True, index=False).sum() / len(sample), 1.0)
+
+    total_rows = sum(os.path.getsize(path) for path in fact_paths) / disk_bytes_per_row
+    worker_budget = memory_budget_bytes / max_workers
+    num_partitions = max(1, math.ceil(total_rows * memory_bytes_per_row * JOIN_HEADROOM / worker_budget))
+    chunk_rows = max(1, int(memory_budget_bytes / (JOIN_HEADROOM * memory_bytes_per_row)))
+    return num_partitions, chunk_rows
+
+
+def star_join(
+    fact_paths: Sequence[PathLike],
+    dimensions: Sequence[DimensionJoin],
+    memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES,
+    max_workers: Optional[int] = None,
+    spill_dir: Optional[PathLike] = None,
+    fact_columns: Optional[Sequence[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Left-join fact CSV files with dimension CSV files out of core.
+
+    Args:
+        fact_paths (sequence): Fact CSV files; read in chunks.
+        dimensions (sequence): DimensionJoin per dimension, joined in order.
+        memory_budget_bytes (int): Approximate cap on memory used by the join (all workers together).
+        max_workers (int, optional): Join processes; defaults to the CPU count.
+        spill_dir (PathLike, optional): Where spill files go; defaults to the system temp dir.
+        fact_columns (sequence, optional): Fact columns to read; all by default.
+
+    Yields:
+        pd.DataFrame: One joined partition at a time, with the fact columns plus
+        each dimension's columns.
+    """
+    if not dimensions:
+        raise ValueError("star_join needs at least one dimension.")
+    fact_paths = [pathlib.Path(path) for path in fact_paths]
+    if not fact_paths:
+        return
+    max_workers = max_workers or os.cpu_count() or 1
+    num_partitions, chunk_rows = estimate_partitions(fact_paths, memory_budget_bytes, max_workers, fact_columns)
+
+    with tempfile.TemporaryDirectory(prefix="star-join-", dir=spill_dir) as tmp:
+        root = pathlib.Path(tmp)
+
+        for index, dimension in enumerate(dimensions):
+            usecols = [dimension.dim_key, *dimension.columns]
+            reader = pd.read_csv(dimension.path, usecols=usecols, chunksize=chunk_rows)
+            for chunk_number, chunk in enumerate(reader):
+                chunk = chunk.rename(columns={dimension.dim_key: dimension.fact_key})
+                _spill(chunk, dimension.fact_key, num_partitions, root / f"dim-{index}", f"chunk-{chunk_number:06d}")
+
+        first_key = dimensions[0].fact_key
+        for file_number, path in enumerate(fact_paths):
+            for chunk_number, chunk in enumerate(pd.read_csv(path, usecols=fact_columns, chunksize=chunk_rows)):
+                _spill(chunk, first_key, num_partitions, root / "fact-0", f"file-{file_number:04d}-{chunk_number:06d}")
+
+        result_dir = root / "result"
+        result_dir.mkdir()
+        workers = min(max_workers, num_partitions)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            for index, dimension in enumerate(dimensions):
+                last = index == len(dimensions) - 1
+                next_key = None if last else dimensions[index + 1].fact_key
+                output_dir = result_dir if last else root / f"fact-{index + 1}"
+                futures = [
+                    pool.submit(
+                        _join_partition,
+                        str(root / f"fact-{index}" / f"part-{partition:05d}"),
+                        str(root / f"dim-{index}" / f"part-{partition:05d}"),
+                        dimension.fact_key,
+                        tuple(dimension.columns),
+                        next_key,
+                        num_partitions,
+                        str(output_dir),
+                        f"part-{partition:05d}",
+                    )
+                    for partition in range(num_partitions)
+                ]
+                if not last:
+                    for future in concurrent.futures.as_completed(futures):
+                        future.result()
+                    shutil.rmtree(root / f"fact-{index}", ignore_errors=True)
+                    shutil.rmtree(root / f"dim-{index}", ignore_errors=True)
+                    continue
+                for future in concurrent.futures.as_completed(futures):
+                    output_path = future.result()
+                    if output_path is None:
+                        continue
+                    joined = pd.read_pickle(output_path)
+                    os.remove(output_path)
+                    yield joined
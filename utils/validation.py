@@ -0,0 +1,158 @@
+"""
+utils/validation.py
+
+Bulk data validation with per-row violation bitmasks.
+
+All rules for a table are evaluated with vectorized column operations. The
+result is a single uint64 mask per row, with bit i set when the row violates
+rule i. No filtered copy is made per rule. Per-rule violation counts come
+from a popcount-style reduction over the mask. Failing rows can be split off
+and written to a reject file together with the names of the rules they broke.
+
+Rules are plain dictionaries:
+    {"name": "price_in_range", "column": "unitprice", "check": "range", "min": 0, "max": 10000}
+    {"name": "segment_allowed", "column": "CustomerSegment", "check": "allowed", "values": ["Regular", "VIP"]}
+    {"name": "id_not_null", "column": "CustomerID", "check": "not_null"}
+    {"name": "name_format", "column": "Name", "check": "pattern", "pattern": r"^[A-Za-z .'-]+$"}
+
+Range checks compare values as numbers; a value that is missing or not a
+number violates the rule.
+
+rules_from_table() derives these from the "required", "ranges" and
+"allowed_values" entries of utils/cleaning_rules.py, plus any extra rules
+listed under "validations".
+
+Example:
+    from utils.validation import validate, write_rejects
+    result = validate(df, rules)
+    write_rejects(result, "data/prepared/rejects/products_rejects.csv")
+    df = result.valid_rows()
+"""
+
+import pathlib
+from typing import Any, Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+MAX_RULES = 64
+COUNT_CHUNK_ROWS = 1 << 20  # Rows unpacked at a time when counting per-rule violations
+VIOLATIONS_COLUMN = "violations"
+
+
+def _violations(df: pd.DataFrame, rule: Dict[str, Any]) -> np.ndarray:
+    """Return a boolean array that is True where the row violates the rule."""
+    column = rule["column"]
+    if column not in df.columns:
+        raise ValueError(f"Column '{column}' not found in the DataFrame.")
+    series = df[column]
+    check = rule["check"]
+    if check == "not_null":
+        return series.isna().to_numpy()
+    if check == "range":
+        lower = rule.get("min", -np.inf)
+        upper = rule.get("max", np.inf)
+        # Text that is not a number (e.g. "n/a" in a raw CSV) becomes NaN and fails the rule
+        return ~pd.to_numeric(series, errors="coerce").between(lower, upper).to_numpy()
+    if check == "allowed":
+        return ~series.isin(rule["values"]).to_numpy()
+    if check == "pattern":
+        return ~series.astype("string").str.fullmatch(rule["pattern"]).fillna(False).to_numpy(dtype=bool)
+    raise ValueError(f"Unknown validation check '{check}' in rule '{rule.get('name')}'.")
+
+
+class ValidationResult:
+    """The violation bitmask for a DataFrame, with helpers to count and split rows."""
+
+    def __init__(self, df: pd.DataFrame, rule_names: List[str], mask: np.ndarray):
+        self.df = df
+        self.rule_names = rule_names
+        self.mask = mask
+
+    def invalid(self) -> np.ndarray:
+        """Boolean array, True for rows that violate at least one rule."""
+        return self.mask != 0
+
+    def violations_per_row(self) -> np.ndarray:
+        """Number of rules each row violates."""
+        if hasattr(np, "bitwise_count"):
+            return np.bitwise_count(self.mask)
+        return _per_bit_matrix(self.mask).sum(axis=1, dtype=np.int64)
+
+    def counts(self) -> Dict[str, int]:
+        """Violation count per rule, computed in bounded-memory chunks."""
+        totals = np.zeros(MAX_RULES, dtype=np.int64)
+        for start in range(0, len(self.mask), COUNT_CHUNK_ROWS):
+            totals += _per_bit_matrix(self.mask[start:start + COUNT_CHUNK_ROWS]).sum(axis=0, dtype=np.int64)
+        return {name: int(totals[bit]) for bit, name in enumerate(self.rule_names)}
+
+    def valid_rows(self) -> pd.DataFrame:
+        """Rows that passed every rule."""
+        return self.df[~self.invalid()]
+
+    def rejected_rows(self) -> pd.DataFrame:
+        """Rows that failed any rule, with a column naming the rules they failed."""
+        invalid = self.invalid()
+        rejected = self.df[invalid].copy()
+        rejected_mask = self.mask[invalid]
+        labels = np.full(len(rejected), "", dtype=object)
+        for bit, name in enumerate(self.rule_names):
+            hit = ((rejected_mask >> np.uint64(bit)) & np.uint64(1)) == 1
+            labels[hit] = [f"{label};{name}" if label else name for label in labels[hit]]
+        rejected[VIOLATIONS_COLUMN] = labels
+        return rejected
+
+
+def _per_bit_matrix(mask: np.ndarray) -> np.ndarray:
+    """Unpack a uint64 mask into an (n, 64) matrix of 0/1 values, lowest bit first."""
+    as_bytes = np.ascontiguousarray(mask, dtype="<u8").view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(as_bytes, axis=1, bitorder="little")
+
+
+def validate(df: pd.DataFrame, rules: List[Dict[str, Any]]) -> ValidationResult:
+    """
+    Evaluate all rules against a DataFrame and build the violation bitmask.
+
+    Args:
+        df (pd.DataFrame): Data to validate.
+        rules (list): Rule dictionaries; at most 64.
+
+    Returns:
+        ValidationResult: Mask, per-rule counts and row splits.
+    """
+    if len(rules) > MAX_RULES:
+        raise ValueError(f"At most {MAX_RULES} rules fit in a uint64 bitmask, got {len(rules)}.")
+    mask = np.zeros(len(df), dtype=np.uint64)
+    for bit, rule in enumerate(rules):
+        mask |= _violations(df, rule).astype(np.uint64) << np.uint64(bit)
+    return ValidationResult(df, [rule["name"] for rule in rules], mask)
+
+
+def rules_from_table(table_rules: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Derive validation rules from a utils/cleaning_rules.py table entry."""
+    rules: List[Dict[str, Any]] = []
+    for column in table_rules.get("required", []):
+        rules.append({"name": f"{column}_not_null", "column": column, "check": "not_null"})
+    for column, (lower, upper) in table_rules.get("ranges", {}).items():
+        rules.append({"name": f"{column}_in_range", "column": column, "check": "range", "min": lower, "max": upper})
+    for column, values in table_rules.get("allowed_values", {}).items():
+        rules.append({"name": f"{column}_allowed", "column": column, "check": "allowed", "values": values})
+    rules.extend(table_rules.get("validations", []))
+    return rules
+
+
+def write_rejects(result: ValidationResult, file_path: Union[str, pathlib.Path]) -> int:
+    """
+    Write rejected rows to CSV and return how many were written.
+
+    When no row failed, a reject file left by an earlier run is deleted, so
+    an existing file always describes the latest run.
+    """
+    rejected = result.rejected_rows()
+    file_path = pathlib.Path(file_path)
+    if rejected.empty:
+        file_path.unlink(missing_ok=True)
+        return 0
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    rejected.to_csv(file_path, index=False)
+    return len(rejected)
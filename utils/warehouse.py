@@ -0,0 +1,297 @@
+"""
+utils/warehouse.py
+
+Shared access layer for the smart_sales.db SQLite data warehouse.
+
+All scripts should get their warehouse connections from here instead of
+calling sqlite3.connect() with their own paths:
+- connect_writer() opens the single loader connection in WAL mode.
+- ConnectionPool hands out read-only connections that can be shared
+  across threads for dashboard and OLAP queries.
+
+Reader connections are opened in read-only URI mode with memory-mapped I/O,
+a larger page cache and a per-connection prepared-statement cache. Because
+pooled connections are long-lived, repeated queries reuse their compiled
+statements. With WAL enabled, readers keep serving queries while the loader writes.
+
+Loads are built in a separate staging file (create_staging()) and published
+with publish_staging(), which copies the finished staging database into the
+live file in a single write transaction. Readers see either the old or the
+new warehouse, never a partial load. Renaming the file over a WAL database
+that readers have open is not safe: a stale -wal file could be applied to
+the new file. This is why the copy goes through SQLite's backup API.
+
+Example:
+    from utils.warehouse import get_reader_pool
+    with get_reader_pool().connection() as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM sale").fetchall()
+"""
+
+import contextlib
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import uuid
+from typing import Dict, Iterator, Optional, Union
+
+# Constants (Paths)
+PROJECT_ROOT: pathlib.Path = pathlib.Path(__file__).resolve().parent.parent
+DW_DIR: pathlib.Path = PROJECT_ROOT / "data" / "dw"
+DB_PATH: pathlib.Path = DW_DIR / "smart_sales.db"
+
+# Connection tuning
+MMAP_SIZE_BYTES = 256 * 1024 * 1024  # Memory-map up to 256 MiB of the database file
+CACHE_SIZE_KIB = 64 * 1024  # 64 MiB page cache per connection
+STATEMENT_CACHE_SIZE = 256  # Compiled statements kept per connection
+BUSY_TIMEOUT_SECONDS = 30.0
+DEFAULT_POOL_SIZE = 4
+STAGING_SUFFIX = ".staging"
+
+PathLike = Union[str, pathlib.Path]
+
+
+def _apply_read_pragmas(conn: sqlite3.Connection) -> None:
+    """Apply the page cache and mmap settings shared by all connections."""
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+
+
+def connect_writer(db_path: PathLike = DB_PATH) -> sqlite3.Connection:
+    """
+    Open the read-write loader connection, creating the database if needed.
+
+    The database is switched to WAL journaling so readers are not blocked
+    while a load is in progress. New databases are created with
+    auto_vacuum=INCREMENTAL, so utils/maintenance.py can return the pages
+    freed by reloads without rebuilding the file.
+    """
+    db_path = pathlib.Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")  # Only takes effect before the first table is created
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    _apply_read_pragmas(conn)
+    return conn
+
+
+def connect_reader(db_path: PathLike = DB_PATH, immutable: bool = False) -> sqlite3.Connection:
+    """
+    Open a read-only connection that may be shared across threads.
+
+    Args:
+        db_path (PathLike): Warehouse file to open.
+        immutable (bool): Open with immutable=1 for snapshot files that no
+            process will modify. SQLite then skips all locking, so never use
+            this on a database the loader is still writing.
+
+    Returns:
+        sqlite3.Connection: A connection that rejects writes.
+    """
+    db_path = pathlib.Path(db_path).resolve()
+    if not db_path.exists():
+        raise FileNotFoundError(f"Warehouse database not found: {db_path}")
+    uri = f"{db_path.as_uri()}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    conn = sqlite3.connect(
+        uri,
+        uri=True,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    conn.execute("PRAGMA query_only = ON")
+    _apply_read_pragmas(conn)
+    return conn
+
+
+class ConnectionPool:
+    """
+    A small, thread-safe pool of read-only warehouse connections.
+
+    Connections are created lazily up to max_size and handed out one thread
+    at a time; callers block until a connection is free.
+    """
+
+    def __init__(self, db_path: PathLike = DB_PATH, max_size: int = DEFAULT_POOL_SIZE, immutable: bool = False):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.db_path = pathlib.Path(db_path)
+        self.max_size = max_size
+        self.immutable = immutable
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self, timeout: Optional[float]) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed.")
+            if self._created < self.max_size:
+                conn = connect_reader(self.db_path, immutable=self.immutable)
+                self._created += 1
+                return conn
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No warehouse connection became free within {timeout} seconds.")
+
+    @contextlib.contextmanager
+    def connection(self, timeout: Optional[float] = BUSY_TIMEOUT_SECONDS) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of a with-block."""
+        conn = self._acquire(timeout)
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def close(self) -> None:
+        """Close all idle connections; borrowed ones are closed when returned."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def ensure_meta_table(conn: sqlite3.Connection) -> None:
+    """Create the dw_meta key/value table that holds the warehouse version stamp."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS dw_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+
+
+def bump_version(conn: sqlite3.Connection) -> int:
+    """
+    Increment the warehouse version stamp inside the caller's transaction.
+
+    Loaders call this just before commit so caches keyed on the version
+    are invalidated exactly when the new data becomes visible. A new random
+    load id is written with it: the version restarts at 1 when the file is
+    deleted and rebuilt, the load id does not repeat.
+    """
+    ensure_meta_table(conn)
+    version = read_version(conn) + 1
+    conn.executemany(
+        "INSERT INTO dw_meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        [("version", str(version)), ("load_id", uuid.uuid4().hex)],
+    )
+    return version
+
+
+def read_version(conn: sqlite3.Connection) -> int:
+    """Return the warehouse version stamp, or 0 if it was never set."""
+    try:
+        row = conn.execute("SELECT value FROM dw_meta WHERE key = 'version'").fetchone()
+    except sqlite3.OperationalError:
+        return 0  # dw_meta does not exist yet
+    return int(row[0]) if row else 0
+
+
+def read_cache_stamp(conn: sqlite3.Connection) -> str:
+    """
+    Return "<load id>:<version>", the stamp result caches key on.
+
+    Unlike the version alone, it differs between two builds of the same file.
+    Warehouses loaded before load ids existed have an empty load id.
+    """
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM dw_meta WHERE key IN ('version', 'load_id')").fetchall())
+    except sqlite3.OperationalError:
+        meta = {}  # dw_meta does not exist yet
+    return f"{meta.get('load_id', '')}:{meta.get('version', 0)}"
+
+
+_pools: Dict[pathlib.Path, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_reader_pool(db_path: PathLike = DB_PATH, max_size: int = DEFAULT_POOL_SIZE) -> ConnectionPool:
+    """Return the process-wide reader pool for a warehouse file, creating it on first use."""
+    key = pathlib.Path(db_path).resolve()
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(key, max_size=max_size)
+            _pools[key] = pool
+        return pool
+
+
+def close_reader_pools() -> None:
+    """Close every pool created through get_reader_pool()."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def staging_path_for(db_path: PathLike = DB_PATH) -> pathlib.Path:
+    """Return the staging file used to build the next version of a warehouse."""
+    db_path = pathlib.Path(db_path)
+    return db_path.with_name(db_path.stem + STAGING_SUFFIX + db_path.suffix)
+
+
+def create_staging(db_path: PathLike = DB_PATH) -> sqlite3.Connection:
+    """
+    Start a new staging database as a consistent copy of the live warehouse.
+
+    Any previous staging file is discarded. If the live warehouse does not
+    exist yet, the staging database starts empty.
+
+    Returns:
+        sqlite3.Connection: Writer connection to the staging database.
+    """
+    db_path = pathlib.Path(db_path)
+    discard_staging(db_path)
+    staging = connect_writer(staging_path_for(db_path))
+    if db_path.exists():
+        source = connect_reader(db_path)
+        try:
+            source.backup(staging)
+        finally:
+            source.close()
+    return staging
+
+
+def publish_staging(staging: sqlite3.Connection, db_path: PathLike = DB_PATH) -> None:
+    """
+    Replace the live warehouse contents with the committed staging database.
+
+    The copy runs as one write transaction on the live file, so concurrent
+    readers switch from the old version to the new one atomically. The
+    staging connection is closed and its files are removed.
+    """
+    db_path = pathlib.Path(db_path)
+    live = connect_writer(db_path)
+    try:
+        staging.backup(live)
+    finally:
+        live.close()
+        staging.close()
+    discard_staging(db_path)
+
+
+def discard_staging(db_path: PathLike = DB_PATH) -> None:
+    """Delete the staging file of a warehouse and its WAL side files, if any."""
+    staging_path = staging_path_for(db_path)
+    for path in (staging_path, staging_path.with_name(staging_path.name + "-wal"),
+                 staging_path.with_name(staging_path.name + "-shm")):
+        if path.exists():
+            os.remove(path)